@@ -1,9 +1,10 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, users, professors, search, matching
+from app.api.v1.endpoints import auth, users, professors, search, matching, diagnostics
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(professors.router, prefix="/professors", tags=["professors"])
 api_router.include_router(search.router, prefix="/search", tags=["search"])
-api_router.include_router(matching.router, prefix="/matching", tags=["matching"])
\ No newline at end of file
+api_router.include_router(matching.router, prefix="/matching", tags=["matching"])
+api_router.include_router(diagnostics.router, prefix="/diagnostics", tags=["diagnostics"])
\ No newline at end of file
@@ -0,0 +1,54 @@
+from typing import Any
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.api import deps
+from app.utils.model_registry import model_registry
+from app.utils.executor import cpu_executor
+from app.utils.cache import embedding_cache, search_cache
+
+router = APIRouter()
+
+@router.get("/models")
+def get_model_stats(
+    *,
+    current_user = Depends(deps.get_current_active_user),
+) -> Any:
+    """Load time and memory of the embedding models loaded in this worker"""
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    return {"models": model_registry.stats()}
+
+
+@router.get("/search-cache")
+def get_search_cache_stats(
+    *,
+    current_user = Depends(deps.get_current_active_user),
+) -> Any:
+    """Hit/miss counters of the search result cache"""
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    return search_cache.stats()
+
+@router.get("/embedding-cache")
+def get_embedding_cache_stats(
+    *,
+    current_user = Depends(deps.get_current_active_user),
+) -> Any:
+    """Size and hit/miss counters of this worker's embedding cache"""
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    return embedding_cache.stats()
+
+@router.get("/executor")
+def get_executor_stats(
+    *,
+    current_user = Depends(deps.get_current_active_user),
+) -> Any:
+    """Load of this worker's CPU executor"""
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    return cpu_executor.stats()
@@ -6,11 +6,12 @@ from app.api import deps
 from app.core.database import get_db
 from app.schemas.search import MatchRequest, MatchResult
 from app.services.matching_service import MatchingService
+from app.utils.executor import cpu_executor, ExecutorBusy
 
 router = APIRouter()
 
 @router.post("/", response_model=MatchResult)
-def find_matches(
+async def find_matches(
     *,
     db: Session = Depends(get_db),
     match_request: MatchRequest,
@@ -21,36 +22,38 @@ def find_matches(
     if match_request.user_id != current_user.id and not current_user.is_superuser:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    matching_service = MatchingService(db)
-    
     try:
-        matches = matching_service.find_matches(
-            user_id=match_request.user_id,
-            filters=match_request.filters,
-            top_k=match_request.top_k or 50
+        # Building the service may load a newly published index, so it runs off the event loop too
+        matches = await cpu_executor.run(
+            lambda: MatchingService(db).find_matches(
+                user_id=match_request.user_id,
+                filters=match_request.filters,
+                top_k=match_request.top_k or 50
+            )
         )
         return matches
+    except ExecutorBusy:
+        raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/me", response_model=MatchResult)
-def find_my_matches(
+async def find_my_matches(
     *,
     db: Session = Depends(get_db),
     top_k: int = 50,
     current_user = Depends(deps.get_current_active_user),
 ) -> Any:
-    """Find matches for current user"""
-    matching_service = MatchingService(db)
-    
+    """Find matches for current user, from the stored list when it is up to date"""
     try:
-        matches = matching_service.find_matches(
-            user_id=current_user.id,
-            top_k=top_k
+        matches = await cpu_executor.run(
+            lambda: MatchingService(db).get_user_matches(user_id=current_user.id, top_k=top_k)
         )
         return matches
+    except ExecutorBusy:
+        raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -1,12 +1,12 @@
 from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from app.api import deps
 from app.core.database import get_db
 from app.crud.professor import professor as crud_professor
 from app.schemas.professor import Professor
-from app.services.openalex_service import OpenAlexService
+from app.services.sync_runner import SyncJobRunner
 
 router = APIRouter()
 
@@ -52,22 +52,28 @@ def get_professor(
     prof_dict['institution_name'] = professor.institution.name if professor.institution else None
     return Professor(**prof_dict)
 
-@router.post("/sync")
+@router.post("/sync", status_code=202)
 async def sync_professors(
     *,
-    db: Session = Depends(get_db),
+    background_tasks: BackgroundTasks,
     institution_ror: str = Query(..., description="ROR ID of institution to sync"),
+    restart: bool = Query(False, description="Ignore the checkpoint of an unfinished sync"),
+    incremental: bool = Query(False, description="Only fetch authors updated since the last completed sync"),
     current_user = Depends(deps.get_current_active_user),
 ) -> Any:
-    """Sync professors from OpenAlex for a specific institution"""
+    """Start syncing professors from OpenAlex for a specific institution
+    
+    The sync runs in the background like scripts/load_professors.py, with
+    its own database sessions and a checkpoint to resume from.
+    """
     if not current_user.is_superuser:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    openalex_service = OpenAlexService(db)
-    result = await openalex_service.sync_professors_by_institution(institution_ror)
+    background_tasks.add_task(
+        SyncJobRunner().run, [institution_ror], restart=restart, incremental=incremental
+    )
     
     return {
-        "message": f"Synced {result['synced_count']} professors",
-        "synced_count": result["synced_count"],
-        "updated_count": result["updated_count"]
+        "message": f"Sync of {institution_ror} started",
+        "institution_ror": institution_ror
     }
@@ -6,26 +6,31 @@ from app.api import deps
 from app.core.database import get_db
 from app.schemas.search import SearchQuery, SearchResult
 from app.services.search_service import SearchService
+from app.utils.executor import cpu_executor, ExecutorBusy
 
 router = APIRouter()
 
 @router.post("/", response_model=SearchResult)
-def search_professors(
+async def search_professors(
     *,
     db: Session = Depends(get_db),
     search_query: SearchQuery,
     current_user = Depends(deps.get_current_active_user),
 ) -> Any:
     """Search professors using natural language query and filters"""
-    search_service = SearchService(db)
-    
     try:
-        results = search_service.search(
-            query=search_query.query,
-            filters=search_query.filters,
-            limit=search_query.limit,
-            offset=search_query.offset
+        # Building the service (which may load a new index version), encoding
+        # and FAISS search all run off the event loop
+        results = await cpu_executor.run(
+            lambda: SearchService(db).search(
+                query=search_query.query,
+                filters=search_query.filters,
+                limit=search_query.limit,
+                offset=search_query.offset
+            )
         )
         return results
+    except ExecutorBusy:
+        raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -1,10 +1,12 @@
 from typing import Any, List
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from app.api import deps
 from app.core.database import get_db
 from app.crud.user import user as crud_user
+from app.crud.user_match import user_match as crud_user_match
 from app.models.user import User
 from app.schemas.user import User as UserSchema, UserUpdate
 from app.services.file_service import FileService
@@ -12,6 +14,9 @@ from app.services.user_service import UserService
 
 router = APIRouter()
 
+# Profile fields the stored match list depends on
+MATCH_PROFILE_FIELDS = {"research_interests", "field_of_study"}
+
 @router.get("/me", response_model=UserSchema)
 def read_user_me(
     db: Session = Depends(get_db),
@@ -29,6 +34,8 @@ def update_user_me(
 ) -> Any:
     """Update current user"""
     user = crud_user.update(db, db_obj=current_user, obj_in=user_in)
+    if MATCH_PROFILE_FIELDS & user_in.dict(exclude_unset=True).keys():
+        crud_user_match.request_refresh(db, user_id=user.id)
     return user
 
 @router.post("/upload-resume")
@@ -50,6 +57,6 @@ async def upload_resume(
     result = await file_service.upload_resume(file, current_user.id)
     
     # Update user record
-    await user_service.update_resume(current_user.id, result)
+    await run_in_threadpool(user_service.update_resume, current_user.id, result)
     
     return {"message": "Resume uploaded successfully", "file_path": result["file_path"]}
\ No newline at end of file
@@ -56,6 +56,11 @@ class Settings(BaseSettings):
     REDIS_PORT: int = 6379
     REDIS_DB: int = 0
     REDIS_PASSWORD: Optional[str] = None
+    SEARCH_CACHE_ENABLED: bool = True
+    SEARCH_CACHE_TTL_SECONDS: int = 300
+    EMBEDDING_CACHE_SIZE: int = 10000  # Texts kept in each worker's in-process cache, 0 disables it
+    EMBEDDING_CACHE_REDIS_ENABLED: bool = False  # Share cached embeddings between workers
+    EMBEDDING_CACHE_TTL_SECONDS: int = 86400
     
     # AWS Settings
     AWS_ACCESS_KEY_ID: Optional[str] = None
@@ -66,13 +71,66 @@ class Settings(BaseSettings):
     # OpenAlex API Settings
     OPENALEX_API_URL: str = "https://api.openalex.org"
     OPENALEX_API_EMAIL: Optional[EmailStr] = None  # For polite pool
+    SYNC_PIPELINE_QUEUE_SIZE: int = 4  # Pages buffered between sync stages
+    SYNC_EMBED_CONCURRENCY: int = 1  # Pages embedded in parallel (the model serialises forward passes)
+    PROFESSOR_UPSERT_BATCH_SIZE: int = 500  # Rows per INSERT ... ON CONFLICT statement
+    SYNC_CHECKPOINT_SECONDS: float = 300.0  # Interval between index publishes + cursor checkpoints
+    SYNC_MAX_CONCURRENT_INSTITUTIONS: int = 4
+    OPENALEX_REQUESTS_PER_SECOND: float = 10.0  # Shared by all concurrent syncs in a process
+    OPENALEX_MAX_RETRIES: int = 5  # For 429, 5xx and connection errors
+    OPENALEX_BACKOFF_BASE_SECONDS: float = 1.0
+    OPENALEX_BACKOFF_MAX_SECONDS: float = 60.0
+    OPENALEX_CONNECTION_LIMIT: int = 10  # Pooled keep-alive connections per sync
+    OPENALEX_KEEPALIVE_SECONDS: float = 30.0
+    OPENALEX_DNS_CACHE_SECONDS: int = 300
+    OPENALEX_REQUEST_TIMEOUT_SECONDS: float = 60.0
+    OPENALEX_FILTER_MAX_IDS: int = 50  # Ids per openalex_id: OR-filter request (API limit)
     
     # AI/ML Settings
     SENTENCE_TRANSFORMER_MODEL: str = "all-MiniLM-L6-v2"
+    PRELOAD_EMBEDDING_MODELS: List[str] = []  # Extra models loaded at startup
+    EMBEDDING_BATCHING_ENABLED: bool = True  # Share forward passes between concurrent requests
+    EMBEDDING_BATCH_MAX_SIZE: int = 64
+    EMBEDDING_BATCH_MAX_WAIT_MS: float = 5.0  # Longest a text waits for others to join its batch
+    CPU_EXECUTOR_WORKERS: int = 4  # Threads for extraction, embedding and FAISS work per worker
+    CPU_EXECUTOR_MAX_QUEUE: int = 32  # Jobs waiting beyond this are rejected with 503
     FAISS_INDEX_PATH: str = "./data/professor_embeddings.index"
-    FAISS_MAPPING_PATH: str = "./data/professor_mapping.json"
+    FAISS_MAPPING_PATH: str = "./data/professor_mapping.json"  # Legacy, read only when migrating old indexes
+    FAISS_INDEX_POINTER_PATH: str = "./data/professor_embeddings.current"
+    FAISS_RELOAD_INTERVAL_SECONDS: float = 5.0  # How often workers check for a new version
+    FAISS_WRITER_LOCK_TIMEOUT_SECONDS: float = 600.0  # Longest a writer waits for another one to publish
+    FAISS_KEEP_VERSIONS: int = 2
+    FAISS_INDEX_TYPE: str = "flat"  # flat, ivf_flat, ivf_pq or hnsw
+    FAISS_NLIST: int = 4096  # IVF lists (capped by corpus size)
+    FAISS_NPROBE: int = 16  # IVF lists scanned per query
+    FAISS_PQ_M: int = 48  # PQ sub-quantizers (must divide EMBEDDING_DIMENSION)
+    FAISS_PQ_NBITS: int = 8
+    FAISS_HNSW_M: int = 32
+    FAISS_HNSW_EF_CONSTRUCTION: int = 200
+    FAISS_HNSW_EF_SEARCH: int = 64
+    FAISS_COMPACTION_STALE_FRACTION: float = 0.2  # HNSW graphs are rebuilt once this share of vectors is replaced or deleted
+    FAISS_TRAIN_SAMPLE_SIZE: int = 100000
+    FAISS_ATTRIBUTES_PATH: str = "./data/professor_attributes.npz"  # Filter attributes, versioned with the index
+    FAISS_FILTER_EXACT_MAX: int = 20000  # Filters matching fewer professors are searched exactly
+    FAISS_FILTER_MAX_WIDENINGS: int = 3  # Times nprobe/efSearch are widened 4x before an exact search
+    VECTOR_SEARCH_BACKEND: str = "faiss"  # faiss, or mmap to scan the shared embedding store instead
+    EMBEDDING_STORE_PATH: str = "./data/professor_embeddings.store"  # Versioned with the index (mmap backend)
+    EMBEDDING_STORE_DTYPE: str = "float16"  # float16 or int8 codes scanned for candidates
+    EMBEDDING_STORE_RESCORE_FACTOR: int = 4  # Candidates re-scored in float32 per result
     EMBEDDING_DIMENSION: int = 384
+    EMBEDDING_STORAGE_DTYPE: str = "float32"  # float32 or float16 bytes in the database (changing it needs a migration)
     MAX_SEARCH_RESULTS: int = 100
+    RERANK_CANDIDATES: int = 300  # First-stage vector search results re-ranked per match request
+    RERANK_SIMILARITY_WEIGHT: float = 1.0  # Exact cosine similarity to the user's embedding
+    RERANK_H_INDEX_WEIGHT: float = 0.05
+    RERANK_CITATIONS_WEIGHT: float = 0.05
+    RERANK_WORKS_WEIGHT: float = 0.0
+    RERANK_CONCEPT_WEIGHT: float = 0.1  # Share of the user's research interests among the professor's concepts
+    CORPUS_STATS_RELOAD_SECONDS: float = 300.0  # How often workers reload keyword and concept frequencies
+    USER_MATCHES_TOP_N: int = 100  # Matches stored per user for GET /matching/me
+    USER_MATCHES_REFRESH_BATCH_SIZE: int = 50  # Users the refresh worker recomputes per database session
+    USER_MATCHES_REFRESH_INTERVAL_SECONDS: float = 10.0  # Refresh worker sleep once the backlog is cleared
+    USER_MATCHES_MAX_STALENESS_SECONDS: float = 3600.0  # How long lists computed on an older index version are still served
     
     # File Processing Settings
     MAX_FILE_SIZE_MB: int = 10
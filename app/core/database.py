@@ -25,6 +25,15 @@ redis_client = redis.Redis(
     decode_responses=True
 )
 
+# Connection returning raw bytes, for binary values such as cached embeddings
+redis_binary_client = redis.Redis(
+    host=settings.REDIS_HOST,
+    port=settings.REDIS_PORT,
+    db=settings.REDIS_DB,
+    password=settings.REDIS_PASSWORD,
+    decode_responses=False
+)
+
 def get_db():
     """Dependency to get database session"""
     db = SessionLocal()
@@ -2,12 +2,20 @@ from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
+from sqlalchemy.dialects import postgresql, sqlite
 from app.core.database import Base
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
+# Dialects whose insert() supports ON CONFLICT ... DO UPDATE
+ON_CONFLICT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+def on_conflict_insert(db: Session):
+    """The session dialect's insert() with on_conflict_do_update, None if it has none"""
+    return ON_CONFLICT_INSERTS.get(db.get_bind().dialect.name)
+
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def __init__(self, model: Type[ModelType]):
         """CRUD object with default methods to Create, Read, Update, Delete (CRUD)."""
@@ -0,0 +1,61 @@
+from typing import Dict, List, Tuple
+from sqlalchemy.orm import Session
+from app.crud.base import on_conflict_insert
+from app.models.corpus_stat import CorpusStat
+
+# Rows per INSERT statement
+STAT_BATCH_SIZE = 1000
+
+class CRUDCorpusStat:
+    def get_all(self, db: Session) -> List[Tuple[str, str, int]]:
+        """Every (kind, key, document_count) row"""
+        return db.query(CorpusStat.kind, CorpusStat.key, CorpusStat.document_count).all()
+    
+    def add_deltas(self, db: Session, *, deltas: Dict[Tuple[str, str], int]):
+        """Add to the counts without committing, so they commit with the professor rows they describe"""
+        # Sorted keys lock rows in the same order in concurrent syncs
+        rows = [
+            {"kind": kind, "key": key, "document_count": delta}
+            for (kind, key), delta in sorted(deltas.items())
+        ]
+        if not rows:
+            return
+        
+        insert = on_conflict_insert(db)
+        if insert is None:
+            self._add_deltas_orm(db, rows=rows)
+            return
+        
+        for start in range(0, len(rows), STAT_BATCH_SIZE):
+            stmt = insert(CorpusStat).values(rows[start:start + STAT_BATCH_SIZE])
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=[CorpusStat.kind, CorpusStat.key],
+                set_={"document_count": CorpusStat.document_count + stmt.excluded.document_count}
+            ))
+    
+    def _add_deltas_orm(self, db: Session, *, rows: List[Dict]):
+        """Row-by-row update for dialects without INSERT ... ON CONFLICT"""
+        for row in rows:
+            stat = db.get(CorpusStat, (row["kind"], row["key"]))
+            if stat is None:
+                db.add(CorpusStat(**row))
+            else:
+                stat.document_count += row["document_count"]
+        db.flush()
+    
+    def replace_all(self, db: Session, *, counts: Dict[Tuple[str, str], int]):
+        """Replace every count in one transaction"""
+        try:
+            db.query(CorpusStat).delete()
+            rows = [
+                {"kind": kind, "key": key, "document_count": count}
+                for (kind, key), count in counts.items() if count > 0
+            ]
+            for start in range(0, len(rows), STAT_BATCH_SIZE):
+                db.bulk_insert_mappings(CorpusStat, rows[start:start + STAT_BATCH_SIZE])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+corpus_stat = CRUDCorpusStat()
@@ -0,0 +1,44 @@
+from typing import Iterable, Optional, Set
+from sqlalchemy.orm import Session
+from app.crud.base import CRUDBase
+from app.models.institution import Institution
+from app.schemas.institution import InstitutionCreate
+
+class CRUDInstitution(CRUDBase[Institution, InstitutionCreate, InstitutionCreate]):
+    def get_by_openalex_id(self, db: Session, *, openalex_id: str) -> Optional[Institution]:
+        return db.query(Institution).filter(Institution.openalex_id == openalex_id).first()
+    
+    def get_existing_ids(self, db: Session, *, openalex_ids: Iterable[str]) -> Set[str]:
+        """The subset of the given OpenAlex ids already stored"""
+        openalex_ids = list(openalex_ids)
+        if not openalex_ids:
+            return set()
+        rows = db.query(Institution.openalex_id).filter(Institution.openalex_id.in_(openalex_ids)).all()
+        return {openalex_id for (openalex_id,) in rows}
+    
+    def get_ids_by_location(
+        self,
+        db: Session,
+        *,
+        university: Optional[str] = None,
+        country: Optional[str] = None,
+        city: Optional[str] = None
+    ) -> Optional[Set[str]]:
+        """Ids of institutions matching the location filters, None if no filter is given"""
+        if not (university or country or city):
+            return None
+        
+        query = db.query(Institution.openalex_id)
+        
+        if university:
+            query = query.filter(Institution.name.ilike(f"%{university}%"))
+        
+        if country:
+            query = query.filter(Institution.country.ilike(f"%{country}%"))
+        
+        if city:
+            query = query.filter(Institution.city.ilike(f"%{city}%"))
+        
+        return {openalex_id for (openalex_id,) in query.all()}
+
+institution = CRUDInstitution(Institution)
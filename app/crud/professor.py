@@ -1,16 +1,136 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_
-from app.crud.base import CRUDBase
+from sqlalchemy import and_, or_, case, func, literal_column
+from sqlalchemy.engine import Row
+from app.core.config import settings
+from app.crud.base import CRUDBase, on_conflict_insert
+from app.crud.corpus_stat import corpus_stat as crud_corpus_stat
 from app.models.professor import Professor
 from app.models.institution import Institution
 from app.schemas.professor import ProfessorCreate, Professor as ProfessorSchema
 from app.schemas.search import SearchFilters
+from app.utils.corpus_stats import document_deltas
 
 class CRUDProfessor(CRUDBase[Professor, ProfessorCreate, ProfessorCreate]):
     def get_by_openalex_id(self, db: Session, *, openalex_id: str) -> Optional[Professor]:
         return db.query(Professor).filter(Professor.openalex_id == openalex_id).first()
 
+    def get_content_hashes(self, db: Session, *, openalex_ids: List[str]) -> Dict[str, Optional[str]]:
+        """Stored content hash of each given professor that exists"""
+        if not openalex_ids:
+            return {}
+        rows = db.query(Professor.openalex_id, Professor.content_hash).filter(
+            Professor.openalex_id.in_(openalex_ids)
+        ).all()
+        return dict(rows)
+
+    def set_content_hashes(self, db: Session, *, hashes: Dict[str, str]):
+        """Store content hashes once the embeddings they fingerprint are in the published index"""
+        db.bulk_update_mappings(
+            Professor,
+            [{"openalex_id": openalex_id, "content_hash": content_hash} for openalex_id, content_hash in hashes.items()]
+        )
+        db.commit()
+
+    def get_corpus_fields(
+        self, db: Session, *, openalex_ids: List[str]
+    ) -> Dict[str, Tuple[Optional[List[str]], Optional[List[Dict[str, Any]]]]]:
+        """Stored (keywords, concepts) of each given professor that exists"""
+        if not openalex_ids:
+            return {}
+        rows = db.query(Professor.openalex_id, Professor.keywords, Professor.concepts).filter(
+            Professor.openalex_id.in_(openalex_ids)
+        ).all()
+        return {openalex_id: (keywords, concepts) for openalex_id, keywords, concepts in rows}
+
+    def upsert_many(
+        self,
+        db: Session,
+        *,
+        rows: List[Dict[str, Any]],
+        batch_size: Optional[int] = None
+    ) -> Tuple[int, int]:
+        """Insert or update professors in one transaction, returns (created, updated)
+        
+        On PostgreSQL and SQLite each batch of rows is a single
+        INSERT ... ON CONFLICT (openalex_id) DO UPDATE statement. Rows only
+        update the columns they contain, so rows without an embedding keep
+        the stored one. Corpus stats are updated in the same transaction.
+        """
+        # ON CONFLICT can't update the same row twice in one statement
+        rows = list({row["openalex_id"]: row for row in rows}.values())
+        if not rows:
+            return 0, 0
+        
+        try:
+            previous = self.get_corpus_fields(db, openalex_ids=[row["openalex_id"] for row in rows])
+            crud_corpus_stat.add_deltas(db, deltas=document_deltas(previous, rows))
+        except Exception:
+            db.rollback()
+            raise
+        
+        insert = on_conflict_insert(db)
+        if insert is None:
+            return self._upsert_many_orm(db, rows=rows)
+        # Only PostgreSQL tells inserted from updated rows; elsewhere rows read above existed
+        counts_inserts = db.get_bind().dialect.name == "postgresql"
+        
+        batch_size = batch_size or settings.PROFESSOR_UPSERT_BATCH_SIZE
+        # A multi-row INSERT needs the same columns in every row
+        rows_by_columns: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        for row in rows:
+            rows_by_columns.setdefault(tuple(sorted(row)), []).append(row)
+        batches = [
+            group[start:start + batch_size]
+            for group in rows_by_columns.values()
+            for start in range(0, len(group), batch_size)
+        ]
+        
+        created = 0 if counts_inserts else len(rows) - len(previous)
+        try:
+            for batch in batches:
+                stmt = insert(Professor).values(batch)
+                update_columns = {
+                    key: stmt.excluded[key] for key in batch[0] if key != "openalex_id"
+                }
+                update_columns["last_updated"] = func.now()
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[Professor.openalex_id],
+                    set_=update_columns
+                )
+                if not counts_inserts:
+                    db.execute(stmt)
+                    continue
+                # xmax is 0 only for freshly inserted row versions
+                stmt = stmt.returning(literal_column("xmax = 0"))
+                created += sum(1 for (inserted,) in db.execute(stmt) if inserted)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        
+        return created, len(rows) - created
+    
+    def _upsert_many_orm(self, db: Session, *, rows: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """Row-by-row upsert for dialects without INSERT ... ON CONFLICT"""
+        ids = [row["openalex_id"] for row in rows]
+        existing = {
+            prof.openalex_id: prof
+            for prof in db.query(Professor).filter(Professor.openalex_id.in_(ids))
+        }
+        
+        for row in rows:
+            prof = existing.get(row["openalex_id"])
+            if prof is None:
+                db.add(Professor(**row))
+            else:
+                for key, value in row.items():
+                    if key != "openalex_id":  # Don't update primary key
+                        setattr(prof, key, value)
+        
+        db.commit()
+        return len(rows) - len(existing), len(existing)
+
     def get_filtered_professors(
         self,
         db: Session,
@@ -26,40 +146,7 @@ class CRUDProfessor(CRUDBase[Professor, ProfessorCreate, ProfessorCreate]):
         if professor_ids:
             query = query.filter(Professor.openalex_id.in_(professor_ids))
         
-        # Apply filters
-        if filters:
-            if filters.university:
-                query = query.join(Institution).filter(
-                    Institution.name.ilike(f"%{filters.university}%")
-                )
-            
-            if filters.country:
-                query = query.join(Institution).filter(
-                    Institution.country.ilike(f"%{filters.country}%")
-                )
-            
-            if filters.city:
-                query = query.join(Institution).filter(
-                    Institution.city.ilike(f"%{filters.city}%")
-                )
-            
-            if filters.min_works_count:
-                query = query.filter(Professor.works_count >= filters.min_works_count)
-            
-            if filters.min_citations:
-                query = query.filter(Professor.cited_by_count >= filters.min_citations)
-            
-            if filters.concepts:
-                # Filter by research concepts (simplified)
-                concept_conditions = []
-                for concept in filters.concepts:
-                    concept_conditions.append(
-                        Professor.concepts.op('::text').ilike(f'%{concept}%')
-                    )
-                if concept_conditions:
-                    query = query.filter(or_(*concept_conditions))
-        
-        professors = query.offset(skip).limit(limit).all()
+        professors = self._apply_filters(query, filters).offset(skip).limit(limit).all()
         
         # Convert to schema with institution name
         result = []
@@ -70,6 +157,75 @@ class CRUDProfessor(CRUDBase[Professor, ProfessorCreate, ProfessorCreate]):
         
         return result
 
+    def get_rerank_candidates(
+        self,
+        db: Session,
+        *,
+        professor_ids: List[str],
+        filters: Optional[SearchFilters] = None
+    ) -> List[Row]:
+        """Columns re-ranking and match explanations need, for the given professors passing the filters
+        
+        Rows have openalex_id, embedding, h_index, cited_by_count, works_count,
+        concepts and keywords; research_summary is only read for professors
+        without stored keywords.
+        """
+        if not professor_ids:
+            return []
+        query = db.query(
+            Professor.openalex_id,
+            Professor.embedding,
+            Professor.h_index,
+            Professor.cited_by_count,
+            Professor.works_count,
+            Professor.concepts,
+            Professor.keywords,
+            case((Professor.keywords.is_(None), Professor.research_summary)).label("research_summary")
+        ).filter(Professor.openalex_id.in_(professor_ids))
+        return self._apply_filters(query, filters).all()
+
+    def _apply_filters(self, query, filters: Optional[SearchFilters]):
+        """Search filters, shared by the full-row and candidate queries"""
+        if not filters:
+            return query
+        
+        if filters.university or filters.country or filters.city:
+            # Join once, combined location filters must not repeat the join
+            query = query.join(Institution, Professor.institution_id == Institution.openalex_id)
+        
+        if filters.university:
+            query = query.filter(
+                Institution.name.ilike(f"%{filters.university}%")
+            )
+        
+        if filters.country:
+            query = query.filter(
+                Institution.country.ilike(f"%{filters.country}%")
+            )
+        
+        if filters.city:
+            query = query.filter(
+                Institution.city.ilike(f"%{filters.city}%")
+            )
+        
+        if filters.min_works_count:
+            query = query.filter(Professor.works_count >= filters.min_works_count)
+        
+        if filters.min_citations:
+            query = query.filter(Professor.cited_by_count >= filters.min_citations)
+        
+        if filters.concepts:
+            # Filter by research concepts (simplified)
+            concept_conditions = []
+            for concept in filters.concepts:
+                concept_conditions.append(
+                    Professor.concepts.op('::text').ilike(f'%{concept}%')
+                )
+            if concept_conditions:
+                query = query.filter(or_(*concept_conditions))
+        
+        return query
+
     def search_by_concepts(
         self, 
         db: Session, 
@@ -0,0 +1,76 @@
+from typing import Dict, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from app.models.sync_checkpoint import SyncCheckpoint
+
+class CRUDSyncCheckpoint:
+    def get(self, db: Session, *, institution_ror: str) -> Optional[SyncCheckpoint]:
+        return db.query(SyncCheckpoint).filter(SyncCheckpoint.institution_ror == institution_ror).first()
+    
+    def start(
+        self,
+        db: Session,
+        *,
+        institution_ror: str,
+        restart: bool = False,
+        incremental: bool = False
+    ) -> SyncCheckpoint:
+        """Checkpoint for a new run, keeping the cursor of an unfinished one unless restarting
+        
+        An incremental run only asks for authors updated since the last
+        completed run started; without one it falls back to a full sync.
+        An unfinished run resumes with its own filter, whatever ``incremental`` says.
+        """
+        checkpoint = self.get(db, institution_ror=institution_ror)
+        if checkpoint is None:
+            checkpoint = SyncCheckpoint(institution_ror=institution_ror)
+            db.add(checkpoint)
+        
+        if restart or checkpoint.status in (None, "completed"):
+            checkpoint.updated_since = checkpoint.synced_through if incremental else None
+            checkpoint.cursor = None
+            checkpoint.pages_committed = 0
+            checkpoint.synced_count = 0
+            checkpoint.updated_count = 0
+            checkpoint.started_at = func.now()
+        
+        checkpoint.status = "running"
+        checkpoint.error = None
+        db.commit()
+        db.refresh(checkpoint)
+        return checkpoint
+    
+    def save_progress(
+        self,
+        db: Session,
+        *,
+        checkpoint: SyncCheckpoint,
+        cursor: Optional[str],
+        pages: int,
+        counts: Dict[str, int]
+    ) -> SyncCheckpoint:
+        """Record that everything before ``cursor`` is stored and indexed"""
+        checkpoint.cursor = cursor
+        checkpoint.pages_committed = (checkpoint.pages_committed or 0) + pages
+        checkpoint.synced_count = (checkpoint.synced_count or 0) + counts.get("synced_count", 0)
+        checkpoint.updated_count = (checkpoint.updated_count or 0) + counts.get("updated_count", 0)
+        db.commit()
+        return checkpoint
+    
+    def complete(self, db: Session, *, checkpoint: SyncCheckpoint) -> SyncCheckpoint:
+        checkpoint.status = "completed"
+        checkpoint.cursor = None
+        checkpoint.completed_at = func.now()
+        checkpoint.synced_through = checkpoint.started_at
+        db.commit()
+        return checkpoint
+    
+    def fail(self, db: Session, *, checkpoint: SyncCheckpoint, error: str) -> SyncCheckpoint:
+        """Mark a run failed; its cursor is kept so the next run resumes there"""
+        db.rollback()
+        checkpoint.status = "failed"
+        checkpoint.error = error
+        db.commit()
+        return checkpoint
+
+sync_checkpoint = CRUDSyncCheckpoint()
@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from app.core.config import settings
+from app.crud.base import on_conflict_insert
+from app.models.user_match import UserMatch
+
+class CRUDUserMatch:
+    def get(self, db: Session, *, user_id: int) -> Optional[UserMatch]:
+        return db.query(UserMatch).filter(UserMatch.user_id == user_id).first()
+    
+    def is_fresh(self, row: UserMatch, *, index_version: int) -> bool:
+        """Whether a stored list matches its user's profile and is recent enough for the published index"""
+        if row.computed_version != row.requested_version or row.index_version is None:
+            return False
+        if row.index_version == index_version:
+            return True
+        # Checkpoints publish often, lists computed on an older version are served for a while
+        computed_at = row.computed_at
+        if computed_at is None:
+            return False
+        if computed_at.tzinfo is None:
+            computed_at = computed_at.replace(tzinfo=timezone.utc)
+        return datetime.now(timezone.utc) - computed_at < timedelta(seconds=settings.USER_MATCHES_MAX_STALENESS_SECONDS)
+    
+    def request_refresh(self, db: Session, *, user_id: int):
+        """Mark a user's stored matches stale so the refresh worker recomputes them"""
+        insert = on_conflict_insert(db)
+        if insert is None:
+            self._request_refresh_orm(db, user_id=user_id)
+            return
+        
+        # Increment in SQL so concurrent requests are never lost, and a first request never collides
+        stmt = insert(UserMatch).values(user_id=user_id, requested_version=1, computed_version=0)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[UserMatch.user_id],
+            set_={"requested_version": UserMatch.requested_version + 1, "updated_at": func.now()}
+        ))
+        db.commit()
+    
+    def _request_refresh_orm(self, db: Session, *, user_id: int):
+        """Update-then-insert for dialects without INSERT ... ON CONFLICT"""
+        updated = db.query(UserMatch).filter(UserMatch.user_id == user_id).update(
+            {UserMatch.requested_version: UserMatch.requested_version + 1},
+            synchronize_session=False
+        )
+        if not updated:
+            db.add(UserMatch(user_id=user_id, requested_version=1, computed_version=0))
+        db.commit()
+    
+    def get_due_user_ids(self, db: Session, *, index_version: int, limit: int) -> List[int]:
+        """Users whose stored matches predate their profile, or the published index by over USER_MATCHES_MAX_STALENESS_SECONDS"""
+        stale_before = datetime.now(timezone.utc) - timedelta(seconds=settings.USER_MATCHES_MAX_STALENESS_SECONDS)
+        return [
+            user_id for (user_id,) in db.query(UserMatch.user_id).filter(
+                or_(
+                    UserMatch.computed_version < UserMatch.requested_version,
+                    UserMatch.index_version.is_(None),
+                    and_(
+                        UserMatch.index_version != index_version,
+                        or_(UserMatch.computed_at.is_(None), UserMatch.computed_at < stale_before)
+                    )
+                )
+            ).order_by(UserMatch.updated_at).limit(limit)
+        ]
+    
+    def record_failure(self, db: Session, *, user_id: int):
+        """Move a list whose refresh failed behind the other due lists"""
+        db.query(UserMatch).filter(UserMatch.user_id == user_id).update(
+            {UserMatch.updated_at: func.now()},
+            synchronize_session=False
+        )
+        db.commit()
+    
+    def store(
+        self,
+        db: Session,
+        *,
+        user_id: int,
+        matches: Optional[List[Dict[str, Any]]],
+        top_k: int,
+        computed_version: int,
+        index_version: int
+    ):
+        """Store a match list (None when the user has nothing to match on) for the profile version it was computed from"""
+        values = {
+            "matches": matches,
+            "top_k": top_k,
+            "computed_version": computed_version,
+            "index_version": index_version,
+            "computed_at": func.now(),
+        }
+        insert = on_conflict_insert(db)
+        if insert is None:
+            self._store_orm(db, user_id=user_id, values=values)
+            return
+        
+        # A list stored for a user without a row yet starts at the profile version it was computed from
+        stmt = insert(UserMatch).values(user_id=user_id, requested_version=computed_version, **values)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[UserMatch.user_id],
+            set_={**values, "updated_at": func.now()}
+        ))
+        db.commit()
+    
+    def _store_orm(self, db: Session, *, user_id: int, values: Dict[str, Any]):
+        """Read-then-write for dialects without INSERT ... ON CONFLICT"""
+        row = self.get(db, user_id=user_id)
+        if row is None:
+            row = UserMatch(user_id=user_id, requested_version=values["computed_version"])
+            db.add(row)
+        for key, value in values.items():
+            setattr(row, key, value)
+        db.commit()
+
+user_match = CRUDUserMatch()
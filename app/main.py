@@ -5,13 +5,18 @@ import uvicorn
 
 from app.core.config import settings
 from app.core.database import engine
-from app.models import user, professor, institution
+from app.models import user, professor, institution, sync_checkpoint, corpus_stat, user_match
 from app.api.v1.api import api_router
+from app.utils.model_registry import model_registry
+from app.utils.vector_db import index_manager
 
 # Create database tables
 user.Base.metadata.create_all(bind=engine)
 professor.Base.metadata.create_all(bind=engine)
 institution.Base.metadata.create_all(bind=engine)
+sync_checkpoint.Base.metadata.create_all(bind=engine)
+corpus_stat.Base.metadata.create_all(bind=engine)
+user_match.Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -35,6 +40,13 @@ app.add_middleware(TrustedHostMiddleware, allowed_hosts=settings.ALLOWED_HOSTS)
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+@app.on_event("startup")
+def load_models():
+    # Load models once per worker so requests never pay initialization
+    model_registry.load_all()
+    # Likewise for the FAISS index, so the first search doesn't load it on the event loop
+    index_manager.current()
+
 @app.get("/")
 async def root():
     return {"message": "PhD Advisor Matching Platform API"}
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, Integer
+from app.core.database import Base
+
+# Kinds of counted keys; DOCUMENTS has the single key DOCUMENTS_KEY holding the corpus size
+TERM = "term"
+CONCEPT = "concept"
+DOCUMENTS = "documents"
+DOCUMENTS_KEY = "professors"
+
+class CorpusStat(Base):
+    __tablename__ = "corpus_stats"
+    
+    # term (research summary keyword), concept (OpenAlex concept id) or documents
+    kind = Column(String(16), primary_key=True)
+    key = Column(String, primary_key=True)
+    # Professors containing the key; for documents/professors the corpus size
+    document_count = Column(Integer, nullable=False, default=0)
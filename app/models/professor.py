@@ -2,6 +2,7 @@ from sqlalchemy import Column, String, JSON, Float, Integer, Text, DateTime, For
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
+from app.models.types import EmbeddingVector
 
 class Professor(Base):
     __tablename__ = "professors"
@@ -23,13 +24,16 @@ class Professor(Base):
     # Research areas (OpenAlex concepts)
     concepts = Column(JSON)  # List of concept objects with scores
     research_summary = Column(Text)
+    keywords = Column(JSON)  # Sorted unique research_summary keywords, precomputed for match explanations
     
     # Contact information (if available)
     orcid = Column(String)
     homepage_url = Column(String)
     
     # Embedding for similarity search
-    embedding = Column(JSON)  # Stored as JSON array
+    embedding = Column(EmbeddingVector())  # Stored as float32/float16 bytes
+    # Fingerprint of the embedded text and model, unchanged authors aren't re-embedded
+    content_hash = Column(String(64))
     
     # Timestamps
     last_updated = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, String, Integer, Text, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class SyncCheckpoint(Base):
+    __tablename__ = "sync_checkpoints"
+    
+    institution_ror = Column(String, primary_key=True, index=True)
+    
+    # OpenAlex cursor of the next page to fetch; None starts from the beginning
+    cursor = Column(String)
+    status = Column(String, nullable=False, default="running")  # running, completed, failed
+    error = Column(Text)
+    # from_updated_date of the current run, None for a full sync
+    updated_since = Column(DateTime(timezone=True))
+    
+    # Progress, cumulative across resumed runs
+    pages_committed = Column(Integer, default=0)
+    synced_count = Column(Integer, default=0)
+    updated_count = Column(Integer, default=0)
+    
+    # Timestamps
+    started_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    completed_at = Column(DateTime(timezone=True))
+    # Start of the last completed run; everything changed before it is stored
+    synced_through = Column(DateTime(timezone=True))
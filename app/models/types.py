@@ -0,0 +1,27 @@
+import numpy as np
+from sqlalchemy.types import LargeBinary, TypeDecorator
+from app.core.config import settings
+
+class EmbeddingVector(TypeDecorator):
+    """Embedding stored as raw float32 (or float16) bytes in a BYTEA column
+    
+    Accepts lists or arrays; loads as a read-only numpy view of the column
+    bytes (``np.frombuffer``), with no JSON parsing or per-float conversion.
+    """
+    
+    impl = LargeBinary
+    cache_ok = True
+    
+    def __init__(self, dtype: str = None, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.dtype = np.dtype(dtype or settings.EMBEDDING_STORAGE_DTYPE)
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return np.asarray(value, dtype=self.dtype).tobytes()
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return np.frombuffer(value, dtype=self.dtype)
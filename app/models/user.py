@@ -1,6 +1,7 @@
 from sqlalchemy import Column, Integer, String, DateTime, JSON, Text, Boolean
 from sqlalchemy.sql import func
 from app.core.database import Base
+from app.models.types import EmbeddingVector
 
 class User(Base):
     __tablename__ = "users"
@@ -22,7 +23,7 @@ class User(Base):
     # Resume information
     resume_file_path = Column(String)
     resume_text = Column(Text)
-    resume_embedding = Column(JSON)  # Stored as JSON array
+    resume_embedding = Column(EmbeddingVector())  # Stored as float32/float16 bytes
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, BigInteger, JSON, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class UserMatch(Base):
+    __tablename__ = "user_matches"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    
+    # Serialized MatchResult.matches, best first
+    matches = Column(JSON)
+    top_k = Column(Integer, default=0)
+    
+    # Bumped whenever the profile changes; the list is fresh while computed_version
+    # equals it and index_version is the published index version, or was computed
+    # less than USER_MATCHES_MAX_STALENESS_SECONDS ago
+    requested_version = Column(Integer, nullable=False, default=1)
+    computed_version = Column(Integer, nullable=False, default=0)
+    index_version = Column(BigInteger)
+    
+    # Timestamps
+    computed_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,24 @@
+from typing import Optional, Dict, Any
+from pydantic import BaseModel
+
+class InstitutionBase(BaseModel):
+    openalex_id: str
+    name: str
+    display_name: Optional[str] = None
+    country_code: Optional[str] = None
+    country: Optional[str] = None
+    city: Optional[str] = None
+    region: Optional[str] = None
+    type: Optional[str] = None
+    homepage_url: Optional[str] = None
+    image_url: Optional[str] = None
+    ror_id: Optional[str] = None
+    works_count: Optional[int] = 0
+    geo: Optional[Dict[str, Any]] = None
+
+class InstitutionCreate(InstitutionBase):
+    pass
+
+class Institution(InstitutionBase):
+    class Config:
+        orm_mode = True
@@ -1,5 +1,6 @@
 from typing import Optional, List
 from pydantic import BaseModel
+from app.schemas.professor import Professor
 
 class SearchFilters(BaseModel):
     university: Optional[str] = None
@@ -1,7 +1,8 @@
 import numpy as np
 from typing import List, Optional
-from sentence_transformers import SentenceTransformer
 from app.core.config import settings
+from app.utils.model_registry import model_registry
+from app.utils.cache import embedding_cache
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,28 +13,47 @@ class EmbeddingService:
         self._load_model()
     
     def _load_model(self):
-        """Load the sentence transformer model"""
+        """Get the shared sentence transformer model for this process"""
         try:
-            self.model = SentenceTransformer(settings.SENTENCE_TRANSFORMER_MODEL)
-            logger.info(f"Loaded embedding model: {settings.SENTENCE_TRANSFORMER_MODEL}")
+            self.model = model_registry.get(settings.SENTENCE_TRANSFORMER_MODEL)
         except Exception as e:
             logger.error(f"Failed to load embedding model: {e}")
             raise
     
+    @property
+    def model_name(self) -> str:
+        return self.model.name
+    
     def encode_text(self, text: str) -> List[float]:
-        """Generate embedding for a single text"""
-        if not self.model:
-            raise RuntimeError("Embedding model not loaded")
-        
-        embedding = self.model.encode([text])[0]
-        return embedding.tolist()
+        """Generate a unit-length embedding for a single text"""
+        return self.encode_batch([text])[0]
     
-    def encode_batch(self, texts: List[str]) -> List[List[float]]:
-        """Generate embeddings for multiple texts"""
+    def encode_batch(self, texts: List[str], use_cache: bool = True) -> List[List[float]]:
+        """Generate unit-length embeddings for multiple texts
+        
+        Cached embeddings are reused; only texts not seen before are encoded.
+        Bulk ingestion passes ``use_cache=False``: its one-off texts would
+        only evict hot query embeddings and fill Redis.
+        """
         if not self.model:
             raise RuntimeError("Embedding model not loaded")
         
-        embeddings = self.model.encode(texts)
+        if not use_cache:
+            return [emb.tolist() for emb in self.model.encode_normalized(texts)]
+        
+        embeddings = embedding_cache.get_many(self.model.name, texts)
+        
+        # Encode each uncached text once, even if repeated in the batch
+        missing = list(dict.fromkeys(text for text, emb in zip(texts, embeddings) if emb is None))
+        if missing:
+            encoded = self.model.encode_normalized(missing)
+            embedding_cache.set_many(self.model.name, missing, encoded)
+            encoded_by_text = dict(zip(missing, encoded))
+            embeddings = [
+                emb if emb is not None else encoded_by_text[text]
+                for text, emb in zip(texts, embeddings)
+            ]
+        
         return [emb.tolist() for emb in embeddings]
     
     def compute_similarity(self, embedding1: List[float], embedding2: List[float]) -> float:
@@ -1,13 +1,15 @@
 import os
 import uuid
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 from fastapi import UploadFile, HTTPException
+from fastapi.concurrency import run_in_threadpool
 import boto3
 from botocore.exceptions import ClientError
 import PyPDF2
 import docx
 from app.core.config import settings
 from app.services.embedding_service import EmbeddingService
+from app.utils.executor import cpu_executor, ExecutorBusy
 import logging
 
 logger = logging.getLogger(__name__)
@@ -50,20 +52,18 @@ class FileService:
             # Read file content
             content = await file.read()
             
-            # Upload to S3
+            # Upload to S3 (blocking I/O, kept off the event loop)
             s3_key = f"resumes/{unique_filename}"
-            self.s3_client.put_object(
+            await run_in_threadpool(
+                self.s3_client.put_object,
                 Bucket=settings.S3_BUCKET_NAME,
                 Key=s3_key,
                 Body=content,
                 ContentType=file.content_type
             )
             
-            # Extract text
-            text = self._extract_text_from_file(content, file_ext)
-            
-            # Generate embedding
-            embedding = self.embedding_service.encode_text(text)
+            # Extract text and generate embedding on the CPU executor
+            text, embedding = await cpu_executor.run(self._extract_and_embed, content, file_ext)
             
             return {
                 "file_path": f"s3://{settings.S3_BUCKET_NAME}/{s3_key}",
@@ -71,6 +71,8 @@ class FileService:
                 "embedding": embedding
             }
             
+        except ExecutorBusy:
+            raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
         except ClientError as e:
             logger.error(f"S3 upload error: {e}")
             raise HTTPException(status_code=500, detail="File upload failed")
@@ -78,6 +80,11 @@ class FileService:
             logger.error(f"File processing error: {e}")
             raise HTTPException(status_code=500, detail="File processing failed")
     
+    def _extract_and_embed(self, content: bytes, file_ext: str) -> Tuple[str, List[float]]:
+        """Extract resume text and embed it"""
+        text = self._extract_text_from_file(content, file_ext)
+        return text, self.embedding_service.encode_text(text)
+    
     def _extract_text_from_file(self, content: bytes, file_ext: str) -> str:
         """Extract text from file content"""
         try:
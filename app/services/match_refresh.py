@@ -0,0 +1,65 @@
+import time
+from typing import Callable
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.crud.user_match import user_match as crud_user_match
+from app.services.matching_service import MatchingService
+import logging
+
+logger = logging.getLogger(__name__)
+
+class MatchRefreshWorker:
+    """Keeps the stored per-user match lists fresh in the background.
+    
+    A list is due when the user's profile changed after it was computed, or
+    a new index version was published since and the list is older than
+    USER_MATCHES_MAX_STALENESS_SECONDS. Run a single worker; requests
+    that find a stale list compute it live in the meantime.
+    """
+    
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        batch_size: int = None,
+        top_k: int = None
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size or settings.USER_MATCHES_REFRESH_BATCH_SIZE
+        self.top_k = top_k or settings.USER_MATCHES_TOP_N
+    
+    def refresh_due(self) -> int:
+        """Recompute one batch of due lists, returns how many were refreshed"""
+        db = self.session_factory()
+        try:
+            service = MatchingService(db)
+            user_ids = crud_user_match.get_due_user_ids(
+                db, index_version=service.vector_db.version, limit=self.batch_size
+            )
+            
+            refreshed = 0
+            for user_id in user_ids:
+                try:
+                    service.refresh_user_matches(user_id, top_k=self.top_k)
+                    refreshed += 1
+                except ValueError as e:
+                    logger.info(f"No matches stored for user {user_id}: {e}")
+                    refreshed += 1
+                except Exception as e:
+                    db.rollback()
+                    logger.error(f"Error refreshing matches for user {user_id}: {e}")
+                    # Otherwise it stays first in line and blocks the batch every round
+                    crud_user_match.record_failure(db, user_id=user_id)
+            return refreshed
+        finally:
+            db.close()
+    
+    def run(self, interval: float = None):
+        """Refresh due lists forever, sleeping whenever the backlog is cleared"""
+        interval = interval if interval is not None else settings.USER_MATCHES_REFRESH_INTERVAL_SECONDS
+        while True:
+            refreshed = self.refresh_due()
+            if refreshed:
+                logger.info(f"Refreshed matches for {refreshed} users")
+            if refreshed < self.batch_size:
+                time.sleep(interval)
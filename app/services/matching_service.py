@@ -1,12 +1,17 @@
-import json
 import time
 import numpy as np
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Set, Tuple
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 from app.utils.vector_db import VectorDatabase
+from app.utils import reranker
+from app.utils.corpus_stats import CorpusStats, corpus_stats
+from app.utils.text_prcessing import common_keywords, keyword_set, pool_idf
 from app.services.embedding_service import EmbeddingService
+from app.services.search_filters import allowed_professor_ids
 from app.crud.professor import professor as crud_professor
 from app.crud.user import user as crud_user
+from app.crud.user_match import user_match as crud_user_match
 from app.schemas.professor import Professor
 from app.schemas.search import SearchFilters, MatchResult
 from app.core.config import settings
@@ -35,24 +40,28 @@ class MatchingService:
             raise ValueError(f"User {user_id} not found")
         
         user_embedding = self._get_user_embedding(user)
-        if not user_embedding:
+        if user_embedding is None:
             raise ValueError("User embedding not available")
         
-        # Search for similar professors
+        # First stage: a wide approximate search, restricted to the filters when possible
+        allowed_ids = allowed_professor_ids(self.db, self.vector_db, filters)
+        candidates = max(settings.RERANK_CANDIDATES, top_k)
         similar_professors = self.vector_db.search_similar(
-            user_embedding, top_k=top_k * 2  # Get more for filtering
+            user_embedding,
+            top_k=candidates if allowed_ids is not None else candidates * 2,  # Get more for filtering
+            allowed_ids=allowed_ids
         )
         
-        # Apply filters and get detailed professor data
-        filtered_matches = self._apply_filters_and_get_details(
-            similar_professors, filters, top_k
+        # Apply filters, reading only the columns re-ranking needs
+        candidates = crud_professor.get_rerank_candidates(
+            self.db, professor_ids=[prof_id for prof_id, _ in similar_professors], filters=filters
         )
         
-        # Generate match explanations
-        matches_with_explanations = [
-            self._add_match_explanation(prof, user) 
-            for prof in filtered_matches
-        ]
+        # Second stage: re-rank every candidate at once, then load full profiles of the top k
+        ranked_matches = self._load_ranked(self._rerank(candidates, similar_professors, user_embedding, user, top_k))
+        
+        # Generate match explanations, with keyword IDF taken over all candidates
+        matches_with_explanations = self._add_match_explanations(ranked_matches, candidates, user)
         
         processing_time = (time.time() - start_time) * 1000
         
@@ -63,10 +72,64 @@ class MatchingService:
             processing_time_ms=processing_time
         )
     
-    def _get_user_embedding(self, user) -> Optional[List[float]]:
+    def get_user_matches(self, user_id: int, top_k: int = 50) -> MatchResult:
+        """A user's matches, served from the stored list while it is fresh"""
+        start_time = time.time()
+        
+        stored = crud_user_match.get(self.db, user_id=user_id)
+        if (
+            stored is not None
+            and stored.matches is not None
+            and crud_user_match.is_fresh(stored, index_version=self.vector_db.version)
+            and top_k <= stored.top_k
+        ):
+            matches = [Professor(**match) for match in stored.matches[:top_k]]
+        else:
+            # Miss: compute live and keep the list for the next request
+            result = self.refresh_user_matches(user_id, top_k=max(top_k, settings.USER_MATCHES_TOP_N))
+            matches = result.matches[:top_k]
+        
+        return MatchResult(
+            user_id=user_id,
+            matches=matches,
+            total_matches=len(matches),
+            processing_time_ms=(time.time() - start_time) * 1000
+        )
+    
+    def refresh_user_matches(self, user_id: int, top_k: Optional[int] = None) -> MatchResult:
+        """Recompute and store a user's match list"""
+        top_k = top_k or settings.USER_MATCHES_TOP_N
+        # Versions are read first, changes made while computing leave the list stale
+        stored = crud_user_match.get(self.db, user_id=user_id)
+        requested_version = stored.requested_version if stored is not None else 0
+        index_version = self.vector_db.version
+        
+        try:
+            result = self.find_matches(user_id, top_k=top_k)
+        except ValueError:
+            # Nothing to match on until the profile changes, don't retry before that
+            self.db.rollback()
+            if crud_user.get(self.db, id=user_id) is not None:
+                crud_user_match.store(
+                    self.db, user_id=user_id, matches=None, top_k=top_k,
+                    computed_version=requested_version, index_version=index_version
+                )
+            raise
+        
+        crud_user_match.store(
+            self.db,
+            user_id=user_id,
+            matches=[match.dict() for match in result.matches],
+            top_k=top_k,
+            computed_version=requested_version,
+            index_version=index_version
+        )
+        return result
+    
+    def _get_user_embedding(self, user) -> Optional[np.ndarray]:
         """Get or generate user embedding"""
-        if user.resume_embedding:
-            return json.loads(user.resume_embedding)
+        if user.resume_embedding is not None:
+            return user.resume_embedding
         
         # Generate embedding from profile and resume text
         text_parts = []
@@ -87,72 +150,116 @@ class MatchingService:
         embedding = self.embedding_service.encode_text(combined_text)
         
         # Save embedding to user record
-        user.resume_embedding = json.dumps(embedding)
+        user.resume_embedding = embedding
         self.db.commit()
         
-        return embedding
+        return np.asarray(embedding, dtype=np.float32)
     
-    def _apply_filters_and_get_details(
-        self, 
-        similar_professors: List[Tuple[str, float]], 
-        filters: Optional[SearchFilters],
+    def _rerank(
+        self,
+        candidates: List[Row],
+        similar_professors: List[Tuple[str, float]],
+        user_embedding: np.ndarray,
+        user,
         top_k: int
-    ) -> List[Professor]:
-        """Apply filters and get detailed professor information"""
-        professor_ids = [prof_id for prof_id, _ in similar_professors]
-        similarity_scores = {prof_id: score for prof_id, score in similar_professors}
-        
-        # Get professors from database with filters
-        professors = crud_professor.get_filtered_professors(
-            self.db, 
-            professor_ids=professor_ids,
-            filters=filters,
-            limit=top_k
-        )
+    ) -> List[Tuple[str, float, float]]:
+        """Top k (openalex_id, blended score, exact similarity) among the candidate rows"""
+        if not candidates:
+            return []
         
-        # Add similarity scores
-        for prof in professors:
-            prof.match_score = similarity_scores.get(prof.openalex_id, 0.0)
+        first_stage = dict(similar_professors)
         
-        # Sort by similarity score
-        professors.sort(key=lambda x: x.match_score, reverse=True)
+        similarities = reranker.exact_similarities(
+            user_embedding,
+            [row.embedding for row in candidates],
+            np.array([first_stage.get(row.openalex_id, 0.0) for row in candidates], dtype=np.float32)
+        )
+        features = reranker.feature_matrix(
+            similarities,
+            np.array([row.h_index or 0 for row in candidates]),
+            np.array([row.cited_by_count or 0 for row in candidates]),
+            np.array([row.works_count or 0 for row in candidates]),
+            reranker.concept_overlap(
+                [self._concept_names(row.concepts) for row in candidates],
+                user.research_interests or []
+            )
+        )
+        scores = reranker.rerank(features)
         
-        return professors[:top_k]
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        return [(candidates[i].openalex_id, float(scores[i]), float(similarities[i])) for i in order]
     
-    def _add_match_explanation(self, professor: Professor, user) -> Professor:
-        """Add explanation for why this professor matches the user"""
-        explanation = {
-            "similarity_score": professor.match_score,
-            "matching_concepts": [],
-            "common_keywords": []
-        }
+    def _concept_names(self, concepts: Optional[List[Dict[str, Any]]]) -> List[str]:
+        """Display names of a professor's stored research concepts"""
+        return [concept.get("display_name") or "" for concept in concepts or []]
+    
+    def _load_ranked(self, ranked: List[Tuple[str, float, float]]) -> List[Tuple[Professor, float]]:
+        """Full profiles of the ranked professors in rank order, each scored and with its exact similarity"""
+        if not ranked:
+            return []
         
-        # Find matching research concepts
-        if user.research_interests and professor.concepts:
-            user_interests = [interest.lower() for interest in user.research_interests]
-            prof_concepts = [concept["display_name"].lower() for concept in professor.concepts]
-            
-            common_concepts = list(set(user_interests) & set(prof_concepts))
-            explanation["matching_concepts"] = common_concepts
-        
-        # Add keyword matching from resume
-        if user.resume_text and professor.research_summary:
-            explanation["common_keywords"] = self._find_common_keywords(
-                user.resume_text, professor.research_summary
+        professors = {
+            prof.openalex_id: prof
+            for prof in crud_professor.get_filtered_professors(
+                self.db, professor_ids=[prof_id for prof_id, _, _ in ranked], limit=len(ranked)
             )
+        }
+        loaded = []
+        for prof_id, score, similarity in ranked:
+            professor = professors.get(prof_id)
+            # Deleted since the candidates were read
+            if professor is None:
+                continue
+            professor.match_score = score
+            loaded.append((professor, similarity))
+        return loaded
+    
+    def _add_match_explanations(
+        self,
+        ranked: List[Tuple[Professor, float]],
+        candidates: List[Row],
+        user
+    ) -> List[Professor]:
+        """Explain why each ranked professor matches the user, in one batch"""
+        if not ranked:
+            return []
+        
+        # User side is tokenized once per request
+        user_interests = {interest.lower() for interest in user.research_interests or []}
+        user_keywords = keyword_set(user.resume_text)
+        
+        # Corpus-wide IDF once stats exist, otherwise estimated over the candidates
+        stats = corpus_stats.current()
+        candidate_keywords = self._professor_keywords(candidates)
+        shared_keywords = common_keywords(
+            [candidate_keywords[prof.openalex_id] for prof, _ in ranked],
+            user_keywords,
+            stats.term_idf if stats.documents else pool_idf(list(candidate_keywords.values()))
+        )
         
-        professor.match_explanation = explanation
-        return professor
+        for (professor, similarity), keywords in zip(ranked, shared_keywords):
+            professor.match_explanation = {
+                "similarity_score": similarity,
+                "matching_concepts": self._matching_concepts(professor, user_interests, stats),
+                "common_keywords": keywords
+            }
+        return [professor for professor, _ in ranked]
     
-    def _find_common_keywords(self, text1: str, text2: str) -> List[str]:
-        """Find common important keywords between two texts"""
-        # Simple keyword extraction (in production, use more sophisticated NLP)
-        import re
-        from collections import Counter
-        
-        # Extract words (simple approach)
-        words1 = set(re.findall(r'\b[a-z]{4,}\b', text1.lower()))
-        words2 = set(re.findall(r'\b[a-z]{4,}\b', text2.lower()))
-        
-        common = list(words1 & words2)
-        return common[:10]  # Return top 10 common keywords
\ No newline at end of file
+    def _matching_concepts(self, professor: Professor, user_interests: Set[str], stats: CorpusStats) -> List[str]:
+        """Professor concepts among the user's interests, rarest first"""
+        matched: Dict[str, str] = {}
+        for concept in professor.concepts or []:
+            name = concept.display_name.lower()
+            if name in user_interests:
+                matched.setdefault(name, concept.id.rsplit("/", 1)[-1])
+        
+        names = sorted(matched)
+        weights = stats.concept_idf([matched[name] for name in names])
+        return [names[i] for i in np.argsort(-weights, kind="stable")]
+    
+    def _professor_keywords(self, candidates: List[Row]) -> Dict[str, List[str]]:
+        """Precomputed keyword sets, tokenizing summaries of professors synced before they existed"""
+        return {
+            row.openalex_id: row.keywords if row.keywords is not None else keyword_set(row.research_summary)
+            for row in candidates
+        }
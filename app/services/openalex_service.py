@@ -1,106 +1,409 @@
 import asyncio
+import functools
+import hashlib
+import time
 import aiohttp
-from typing import Dict, List, Any, Optional
+from datetime import datetime, timezone
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Any, Optional, Set, Tuple
 from sqlalchemy.orm import Session
 from app.core.config import settings
+from app.core.database import SessionLocal
 from app.crud.professor import professor as crud_professor
 from app.crud.institution import institution as crud_institution
-from app.models.professor import Professor
+from app.crud.sync_checkpoint import sync_checkpoint as crud_sync_checkpoint
 from app.models.institution import Institution
+from app.models.sync_checkpoint import SyncCheckpoint
 from app.services.embedding_service import EmbeddingService
 from app.utils.vector_db import VectorDatabase
+from app.utils.rate_limiter import AsyncTokenBucket
+from app.utils.http_client import HttpStats, RateLimitedClient
+from app.utils.text_prcessing import keyword_set
 import logging
 
 logger = logging.getLogger(__name__)
 
+class AuthorPage:
+    """One page of OpenAlex authors moving through the sync pipeline"""
+    
+    def __init__(self, sequence: int, authors: List[Dict[str, Any]], next_cursor: Optional[str] = None):
+        self.sequence = sequence
+        self.authors = authors
+        self.next_cursor = next_cursor
+        self.professors: List[Dict[str, Any]] = []
+        self.institution_ids: Set[str] = set()
+
 class OpenAlexService:
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        vector_db: Optional[VectorDatabase] = None,
+        rate_limiter: Optional[AsyncTokenBucket] = None,
+        embedding_service: Optional[EmbeddingService] = None,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
+        # Database and index work runs in executor threads; ``db`` is only used
+        # by one stage at a time, embed workers open their own sessions
         self.db = db
+        self.session_factory = session_factory
         self.base_url = settings.OPENALEX_API_URL
         self.email = settings.OPENALEX_API_EMAIL
-        self.embedding_service = EmbeddingService()
-        self.vector_db = VectorDatabase()
+        self.embedding_service = embedding_service or EmbeddingService()
+        # Concurrent syncs share one index writer and one request budget
+        self.vector_db = vector_db or VectorDatabase()
+        self.rate_limiter = rate_limiter or AsyncTokenBucket(settings.OPENALEX_REQUESTS_PER_SECOND)
+        self.http_stats = HttpStats()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._client: Optional[RateLimitedClient] = None
+        # Institutions already stored or fetched during this sync
+        self._known_institutions: Set[str] = set()
+        # Content hashes of written rows, stored once the index holding them is published
+        self._unpublished_hashes: Dict[str, str] = {}
     
-    async def sync_professors_by_institution(self, institution_ror: str) -> Dict[str, int]:
-        """Sync professors from a specific institution"""
-        url = f"{self.base_url}/authors"
+    async def __aenter__(self) -> "OpenAlexService":
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.close()
+    
+    def _http(self) -> RateLimitedClient:
+        """Client over the service's single HTTP session, opened on first use.
+        
+        Author paging and institution lookups reuse its keep-alive
+        connections instead of paying a TCP+TLS handshake per request.
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=settings.OPENALEX_CONNECTION_LIMIT,
+                ttl_dns_cache=settings.OPENALEX_DNS_CACHE_SECONDS,
+                keepalive_timeout=settings.OPENALEX_KEEPALIVE_SECONDS
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=settings.OPENALEX_REQUEST_TIMEOUT_SECONDS)
+            )
+            self._client = RateLimitedClient(self._session, self.rate_limiter, self.http_stats)
+        return self._client
+    
+    async def close(self):
+        """Close the HTTP session and its pooled connections"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+            self._client = None
+    
+    async def sync_professors_by_institution(
+        self,
+        institution_ror: str,
+        restart: bool = False,
+        incremental: bool = False
+    ) -> Dict[str, int]:
+        """Sync professors from a specific institution
+        
+        Progress is checkpointed in the database, so a run that failed or was
+        interrupted resumes from its last committed page unless ``restart``.
+        With ``incremental``, only authors updated since the last completed
+        sync of the institution are fetched and merged in.
+        """
+        loop = asyncio.get_running_loop()
+        checkpoint = await loop.run_in_executor(None, functools.partial(
+            crud_sync_checkpoint.start,
+            self.db, institution_ror=institution_ror, restart=restart, incremental=incremental
+        ))
+        if checkpoint.cursor:
+            logger.info(f"Resuming sync of {institution_ror} after {checkpoint.pages_committed} pages")
+        
+        filters = [f"last_known_institution.ror:{institution_ror}"]
+        if checkpoint.updated_since:
+            filters.append(f"from_updated_date:{self._updated_date(checkpoint.updated_since)}")
+            logger.info(f"Syncing authors of {institution_ror} updated since {checkpoint.updated_since}")
+        
         params = {
-            "filter": f"last_known_institution.ror:{institution_ror}",
+            "filter": ",".join(filters),
             "per_page": 200,
             "select": "id,display_name,last_known_institution,works_count,cited_by_count,summary_stats,concepts,orcid,homepage",
             "mailto": self.email
         }
         
-        synced_count = 0
-        updated_count = 0
+        try:
+            result = await self.run_pipeline(
+                self._fetch_author_pages(params, checkpoint.cursor or "*"),
+                checkpoint=checkpoint
+            )
+        except BaseException as e:
+            await loop.run_in_executor(None, functools.partial(
+                crud_sync_checkpoint.fail, self.db, checkpoint=checkpoint, error=str(e) or type(e).__name__
+            ))
+            raise
+        finally:
+            await self.close()
+        
+        await loop.run_in_executor(None, functools.partial(crud_sync_checkpoint.complete, self.db, checkpoint=checkpoint))
+        
+        logger.info(f"OpenAlex requests for {institution_ror}: {self.http_stats.as_dict()}")
+        result["throttled_count"] = self.http_stats.throttled
+        result["retry_count"] = self.http_stats.retries
+        return result
+    
+    @staticmethod
+    def _updated_date(since: datetime) -> str:
+        """UTC date for the from_updated_date filter"""
+        # Day granularity re-fetches up to a day of authors, change detection skips them
+        if since.tzinfo is not None:
+            since = since.astimezone(timezone.utc)
+        return since.date().isoformat()
+    
+    async def run_pipeline(
+        self,
+        pages: AsyncIterator[Tuple[List[Dict[str, Any]], Optional[str]]],
+        checkpoint: Optional[SyncCheckpoint] = None
+    ) -> Dict[str, int]:
+        """Parse, embed and store pages of OpenAlex authors.
+        
+        ``pages`` yields (authors, next_cursor) tuples. Stages run concurrently
+        and are connected by bounded queues, so fetching the next page overlaps
+        with embedding and writing the previous ones:
+        
+        fetch -> parse + batch embed (SYNC_EMBED_CONCURRENCY workers) -> write
+        
+        Embedding, database queries and index writes run in executor threads,
+        keeping the event loop free for fetching and other requests.
+        
+        Each page is embedded in one batch and written in one transaction,
+        in page order. Authors whose content hash matches the stored one
+        are not re-embedded; only their row and filter attributes are
+        updated. With a ``checkpoint``, the vector index is published and
+        the cursor saved every SYNC_CHECKPOINT_SECONDS; otherwise the index
+        is published once at the end.
+        """
+        raw_pages: asyncio.Queue = asyncio.Queue(maxsize=settings.SYNC_PIPELINE_QUEUE_SIZE)
+        embedded_pages: asyncio.Queue = asyncio.Queue(maxsize=settings.SYNC_PIPELINE_QUEUE_SIZE)
+        embed_workers = max(settings.SYNC_EMBED_CONCURRENCY, 1)
+        counts = {
+            "synced_count": 0, "updated_count": 0, "failed_count": 0,
+            "embedded_count": 0, "skipped_count": 0
+        }
         
-        async with aiohttp.ClientSession() as session:
-            cursor = "*"
+        tasks = [
+            asyncio.create_task(self._read_stage(pages, raw_pages, embed_workers)),
+            *[
+                asyncio.create_task(self._embed_stage(raw_pages, embedded_pages))
+                for _ in range(embed_workers)
+            ],
+            asyncio.create_task(self._write_stage(embedded_pages, embed_workers, counts, checkpoint)),
+        ]
+        
+        try:
+            await asyncio.gather(*tasks)
+        except Exception:
+            # Don't leave the other stages blocked on their queues
+            for task in tasks:
+                task.cancel()
+            raise
+        
+        if checkpoint is None:
+            # Save vector database
+            if not await asyncio.get_running_loop().run_in_executor(None, self._publish_index):
+                raise RuntimeError("Publishing the vector index failed")
+        
+        return counts
+    
+    async def _fetch_author_pages(
+        self,
+        params: Dict[str, Any],
+        cursor: str = "*"
+    ) -> AsyncIterator[Tuple[List[Dict[str, Any]], Optional[str]]]:
+        """Page through /authors with cursor pagination"""
+        url = f"{self.base_url}/authors"
+        client = self._http()
+        
+        while cursor:
+            params["cursor"] = cursor
+            
+            # Raises once retries are exhausted; the checkpoint keeps the cursor
+            data = await client.get_json(url, params=params)
             
-            while cursor:
-                if cursor != "*":
-                    params["cursor"] = cursor
+            # Check for next page
+            cursor = data.get("meta", {}).get("next_cursor")
+            yield data.get("results", []), cursor
+    
+    async def _read_stage(self, pages, raw_pages: asyncio.Queue, embed_workers: int):
+        sequence = 0
+        async for authors, next_cursor in pages:
+            await raw_pages.put(AuthorPage(sequence, authors, next_cursor))
+            sequence += 1
+        
+        # One end marker per embed worker
+        for _ in range(embed_workers):
+            await raw_pages.put(None)
+    
+    async def _embed_stage(self, raw_pages: asyncio.Queue, embedded_pages: asyncio.Queue):
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            page = await raw_pages.get()
+            if page is None:
+                await embedded_pages.put(None)
+                return
+            
+            self._parse_page(page)
+            changed = await loop.run_in_executor(None, self._changed_professors, page.professors)
+            
+            if changed:
+                # One forward pass per page, off the event loop
+                embeddings = await loop.run_in_executor(
+                    None,
+                    functools.partial(
+                        self.embedding_service.encode_batch,
+                        [prof["research_summary"] for prof in changed],
+                        use_cache=False
+                    )
+                )
+                for prof, embedding in zip(changed, embeddings):
+                    prof["embedding"] = embedding
+            
+            await embedded_pages.put(page)
+    
+    async def _write_stage(
+        self,
+        embedded_pages: asyncio.Queue,
+        embed_workers: int,
+        counts: Dict[str, int],
+        checkpoint: Optional[SyncCheckpoint]
+    ):
+        loop = asyncio.get_running_loop()
+        # Embed workers can finish pages out of order; write them in order
+        waiting: Dict[int, AuthorPage] = {}
+        next_sequence = 0
+        finished_workers = 0
+        
+        checkpointed_counts = dict(counts)
+        unsaved_pages = 0
+        cursor = None
+        last_checkpoint = time.monotonic()
+        
+        while finished_workers < embed_workers:
+            page = await embedded_pages.get()
+            if page is None:
+                finished_workers += 1
+                continue
+            
+            waiting[page.sequence] = page
+            while next_sequence in waiting:
+                page = waiting.pop(next_sequence)
+                await self._write_page(page, counts)
+                next_sequence += 1
                 
-                async with session.get(url, params=params) as response:
-                    if response.status != 200:
-                        logger.error(f"OpenAlex API error: {response.status}")
-                        break
-                    
-                    data = await response.json()
-                    
-                    for author_data in data.get("results", []):
-                        try:
-                            result = await self._process_author(author_data)
-                            if result == "created":
-                                synced_count += 1
-                            elif result == "updated":
-                                updated_count += 1
-                        except Exception as e:
-                            logger.error(f"Error processing author {author_data.get('id')}: {e}")
-                    
-                    # Check for next page
-                    meta = data.get("meta", {})
-                    cursor = meta.get("next_cursor")
-                    
-                    if not cursor:
-                        break
-                    
-                    # Rate limiting
-                    await asyncio.sleep(0.1)
-        
-        # Save vector database
-        self.vector_db.save_index()
-        
-        return {
-            "synced_count": synced_count,
-            "updated_count": updated_count
-        }
+                unsaved_pages += 1
+                cursor = page.next_cursor
+                if checkpoint is None:
+                    continue
+                now = time.monotonic()
+                if now - last_checkpoint >= settings.SYNC_CHECKPOINT_SECONDS:
+                    # A failed publish is retried at the next checkpoint, the cursor stays put
+                    last_checkpoint = now
+                    if await loop.run_in_executor(
+                        None, self._save_checkpoint, checkpoint, cursor, unsaved_pages, counts, checkpointed_counts
+                    ):
+                        unsaved_pages = 0
+        
+        if checkpoint is not None and unsaved_pages:
+            if not await loop.run_in_executor(
+                None, self._save_checkpoint, checkpoint, cursor, unsaved_pages, counts, checkpointed_counts
+            ):
+                raise RuntimeError("Publishing the vector index failed, the sync resumes from the last checkpoint")
     
-    async def _process_author(self, author_data: Dict[str, Any]) -> str:
-        """Process individual author data"""
-        openalex_id = author_data["id"].replace("https://openalex.org/", "")
+    def _save_checkpoint(
+        self,
+        checkpoint: SyncCheckpoint,
+        cursor: Optional[str],
+        pages: int,
+        counts: Dict[str, int],
+        checkpointed_counts: Dict[str, int]
+    ) -> bool:
+        """Publish the index, then move the cursor past everything it contains
         
-        # Check if professor already exists
-        existing_prof = crud_professor.get_by_openalex_id(
-            self.db, openalex_id=openalex_id
+        Returns False, leaving the checkpoint untouched, if publishing failed.
+        """
+        if not self._publish_index():
+            logger.warning(f"Index publish failed, keeping the checkpoint before {pages} unpublished pages")
+            return False
+        crud_sync_checkpoint.save_progress(
+            self.db,
+            checkpoint=checkpoint,
+            cursor=cursor,
+            pages=pages,
+            counts={key: counts[key] - checkpointed_counts[key] for key in counts}
         )
+        checkpointed_counts.update(counts)
+        return True
+    
+    def _publish_index(self) -> bool:
+        """Publish the index, then store the content hashes of the vectors it now holds"""
+        if not self.vector_db.save_index():
+            return False
+        if self._unpublished_hashes:
+            crud_professor.set_content_hashes(self.db, hashes=self._unpublished_hashes)
+            self._unpublished_hashes = {}
+        return True
+    
+    def _changed_professors(self, professors: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Set each row's content hash, return the rows whose stored hash differs
+        
+        Runs in an executor thread, on a session of its own.
+        """
+        if not professors:
+            return []
+        
+        model_name = self.embedding_service.model_name
+        for prof in professors:
+            prof["content_hash"] = self._content_hash(prof["research_summary"], model_name)
+        
+        db = self.session_factory()
+        try:
+            stored = crud_professor.get_content_hashes(
+                db, openalex_ids=[prof["openalex_id"] for prof in professors]
+            )
+        finally:
+            db.close()
+        return [prof for prof in professors if stored.get(prof["openalex_id"]) != prof["content_hash"]]
+    
+    @staticmethod
+    def _content_hash(research_summary: str, model_name: str) -> str:
+        """Fingerprint of everything the embedding depends on"""
+        # The summary is built from the name, concepts and institution
+        return hashlib.sha256(f"{model_name}\n{research_summary}".encode("utf-8")).hexdigest()
+    
+    def _parse_page(self, page: AuthorPage):
+        """Turn raw author records into professor rows (without embeddings)"""
+        professors = {}
+        for author_data in page.authors:
+            try:
+                professor_data, institution_data = self._parse_author(author_data)
+            except Exception as e:
+                logger.error(f"Error processing author {author_data.get('id')}: {e}")
+                continue
+            
+            # Last occurrence wins if OpenAlex repeats an author
+            professors[professor_data["openalex_id"]] = professor_data
+            if institution_data:
+                page.institution_ids.add(professor_data["institution_id"])
+        
+        page.professors = list(professors.values())
+    
+    def _parse_author(self, author_data: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """Professor row and raw institution data for an author record"""
+        openalex_id = author_data["id"].replace("https://openalex.org/", "")
         
         # Extract institution data
-        institution_data = author_data.get("last_known_institution", {})
+        institution_data = author_data.get("last_known_institution") or None
         institution_id = None
         if institution_data:
             institution_id = institution_data["id"].replace("https://openalex.org/", "")
-            await self._process_institution(institution_data)
         
         # Prepare professor data
         concepts = author_data.get("concepts", [])[:10]  # Top 10 concepts
-        
-        # Create research summary
         research_summary = self._create_research_summary(author_data)
         
-        # Generate embedding
-        embedding = self.embedding_service.encode_text(research_summary)
-        
         professor_data = {
             "openalex_id": openalex_id,
             "name": author_data["display_name"],
@@ -110,9 +413,9 @@ class OpenAlexService:
             "cited_by_count": author_data.get("cited_by_count", 0),
             "concepts": concepts,
             "research_summary": research_summary,
+            "keywords": keyword_set(research_summary),
             "orcid": author_data.get("orcid"),
             "homepage_url": author_data.get("homepage"),
-            "embedding": embedding
         }
         
         # Extract h-index and i10-index from summary_stats
@@ -120,75 +423,132 @@ class OpenAlexService:
         professor_data["h_index"] = summary_stats.get("h_index", 0)
         professor_data["i10_index"] = summary_stats.get("i10_index", 0)
         
-        if existing_prof:
-            # Update existing professor
-            for key, value in professor_data.items():
-                if key != "openalex_id":  # Don't update primary key
-                    setattr(existing_prof, key, value)
-            self.db.commit()
-            
-            # Update vector database
-            self.vector_db.add_embedding(openalex_id, embedding)
-            
-            return "updated"
-        else:
-            # Create new professor
-            new_prof = Professor(**professor_data)
-            self.db.add(new_prof)
-            self.db.commit()
-            
-            # Add to vector database
-            self.vector_db.add_embedding(openalex_id, embedding)
-            
-            return "created"
+        return professor_data, institution_data
     
-    async def _process_institution(self, institution_data: Dict[str, Any]):
-        """Process institution data"""
-        if not institution_data:
+    async def _write_page(self, page: AuthorPage, counts: Dict[str, int]):
+        """Store one page of professors in a single transaction and index them"""
+        if not page.professors:
             return
         
-        openalex_id = institution_data["id"].replace("https://openalex.org/", "")
+        await self._prefetch_institutions(page.institution_ids)
+        await asyncio.get_running_loop().run_in_executor(None, self._store_page, page, counts)
+    
+    def _store_page(self, page: AuthorPage, counts: Dict[str, int]):
+        """Blocking part of ``_write_page``, run in an executor thread"""
+        # New hashes are stored once the index holding the new vectors is published,
+        # so authors written before a crash are re-embedded and indexed on resume
+        new_hashes = {
+            prof["openalex_id"]: prof.pop("content_hash")
+            for prof in page.professors if "embedding" in prof and "content_hash" in prof
+        }
+        
+        try:
+            created, updated = crud_professor.upsert_many(self.db, rows=page.professors)
+        except Exception as e:
+            self.db.rollback()
+            counts["failed_count"] += len(page.professors)
+            logger.error(f"Error writing page {page.sequence} ({len(page.professors)} authors): {e}")
+            return
+        
+        self._unpublished_hashes.update(new_hashes)
+        counts["synced_count"] += created
+        counts["updated_count"] += updated
+        
+        embedded = [prof for prof in page.professors if "embedding" in prof]
+        unchanged = [prof for prof in page.professors if "embedding" not in prof]
+        counts["embedded_count"] += len(embedded)
+        counts["skipped_count"] += len(unchanged)
         
-        # Check if institution exists
-        existing_inst = crud_institution.get_by_openalex_id(
-            self.db, openalex_id=openalex_id
+        # Update vector database
+        self.vector_db.upsert_embeddings(
+            [(prof["openalex_id"], prof["embedding"]) for prof in embedded],
+            attributes={prof["openalex_id"]: prof for prof in embedded}
         )
+        # Counts used by filters can change without the embedded text changing
+        self.vector_db.update_attributes({prof["openalex_id"]: prof for prof in unchanged})
+    
+    async def _prefetch_institutions(self, openalex_ids: Iterable[str]):
+        """Store institutions not seen before, fetched in bulk.
         
-        if not existing_inst:
-            # Fetch detailed institution data
-            async with aiohttp.ClientSession() as session:
-                url = f"{self.base_url}/institutions/{openalex_id}"
-                params = {"mailto": self.email}
-                
-                async with session.get(url, params=params) as response:
-                    if response.status == 200:
-                        detailed_data = await response.json()
-                        
-                        inst_data = {
-                            "openalex_id": openalex_id,
-                            "name": detailed_data.get("display_name", ""),
-                            "display_name": detailed_data.get("display_name", ""),
-                            "country_code": detailed_data.get("country_code", ""),
-                            "country": detailed_data.get("country", ""),
-                            "type": detailed_data.get("type", ""),
-                            "homepage_url": detailed_data.get("homepage_url", ""),
-                            "ror_id": detailed_data.get("ror", ""),
-                            "works_count": detailed_data.get("works_count", 0),
-                        }
-                        
-                        # Extract location data
-                        geo = detailed_data.get("geo", {})
-                        if geo:
-                            inst_data["city"] = geo.get("city")
-                            inst_data["region"] = geo.get("region")
-                            inst_data["geo"] = {
-                                "latitude": geo.get("latitude"),
-                                "longitude": geo.get("longitude")
-                            }
-                        
-                        new_inst = Institution(**inst_data)
-                        self.db.add(new_inst)
-                        self.db.commit()
+        Unknown ids are looked up in one query, then the missing ones are
+        fetched with the ``openalex_id:`` OR-filter, OPENALEX_FILTER_MAX_IDS
+        per request, and inserted in one transaction.
+        """
+        unknown = set(openalex_ids) - self._known_institutions
+        if not unknown:
+            return
+        self._known_institutions.update(unknown)
+        
+        loop = asyncio.get_running_loop()
+        existing = await loop.run_in_executor(
+            None, functools.partial(crud_institution.get_existing_ids, self.db, openalex_ids=unknown)
+        )
+        missing = sorted(unknown - existing)
+        batch_size = max(settings.OPENALEX_FILTER_MAX_IDS, 1)
+        
+        for start in range(0, len(missing), batch_size):
+            batch = missing[start:start + batch_size]
+            try:
+                data = await self._http().get_json(
+                    f"{self.base_url}/institutions",
+                    params={
+                        "filter": "openalex_id:" + "|".join(batch),
+                        "per_page": len(batch),
+                        "mailto": self.email
+                    }
+                )
+                await loop.run_in_executor(None, self.store_institutions, data.get("results", []))
+            except Exception as e:
+                await loop.run_in_executor(None, self.db.rollback)
+                # Retry these on a later page
+                self._known_institutions.difference_update(batch)
+                logger.error(f"Error fetching {len(batch)} institutions: {e}")
+    
+    def store_institutions(self, records: List[Dict[str, Any]]) -> int:
+        """Insert OpenAlex institution records not stored yet, returns how many were new"""
+        rows = {}
+        for record in records:
+            openalex_id = record["id"].replace("https://openalex.org/", "")
+            rows[openalex_id] = self._institution_row(openalex_id, record)
+        if not rows:
+            return 0
+        
+        existing = crud_institution.get_existing_ids(self.db, openalex_ids=rows)
+        created = 0
+        for openalex_id, row in rows.items():
+            if openalex_id not in existing:
+                self.db.add(Institution(**row))
+                created += 1
+        self.db.commit()
+        
+        self._known_institutions.update(rows)
+        return created
+    
+    def _institution_row(self, openalex_id: str, detailed_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Institution columns from an OpenAlex institution record"""
+        inst_data = {
+            "openalex_id": openalex_id,
+            "name": detailed_data.get("display_name", ""),
+            "display_name": detailed_data.get("display_name", ""),
+            "country_code": detailed_data.get("country_code", ""),
+            "country": detailed_data.get("country", ""),
+            "type": detailed_data.get("type", ""),
+            "homepage_url": detailed_data.get("homepage_url", ""),
+            "ror_id": detailed_data.get("ror", ""),
+            "works_count": detailed_data.get("works_count", 0),
+        }
+        
+        # Extract location data
+        geo = detailed_data.get("geo", {})
+        if geo:
+            inst_data["city"] = geo.get("city")
+            inst_data["region"] = geo.get("region")
+            inst_data["geo"] = {
+                "latitude": geo.get("latitude"),
+                "longitude": geo.get("longitude")
+            }
+        
+        return inst_data
     
     def _create_research_summary(self, author_data: Dict[str, Any]) -> str:
         """Create a research summary from author data"""
@@ -209,4 +569,4 @@ class OpenAlexService:
         if institution:
             summary_parts.append(f"Institution: {institution.get('display_name', '')}")
         
-        return ". ".join(summary_parts)
\ No newline at end of file
+        return ". ".join(summary_parts)
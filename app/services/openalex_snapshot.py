@@ -0,0 +1,193 @@
+import asyncio
+import gzip
+import json
+import os
+from collections import deque
+from multiprocessing import Pool
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from app.services.openalex_service import OpenAlexService
+import logging
+
+logger = logging.getLogger(__name__)
+
+OPENALEX_PREFIX = "https://openalex.org/"
+ROR_PREFIX = "https://ror.org/"
+
+# Only the fields the sync uses are sent back from the parser processes
+AUTHOR_FIELDS = (
+    "id", "display_name", "last_known_institution", "works_count", "cited_by_count",
+    "summary_stats", "concepts", "orcid", "homepage"
+)
+INSTITUTION_FIELDS = (
+    "id", "display_name", "country_code", "country", "type", "homepage_url", "ror", "works_count", "geo"
+)
+
+class SnapshotFilter:
+    """Which institutions (OpenAlex or ROR ids) and countries to import, all if empty"""
+    
+    def __init__(self, institutions: Iterable[str] = (), countries: Iterable[str] = ()):
+        self.institution_ids = set()
+        self.rors = set()
+        for institution in institutions:
+            institution = institution.strip().replace(OPENALEX_PREFIX, "").replace(ROR_PREFIX, "")
+            if institution[:1] in ("I", "i") and institution[1:].isdigit():
+                self.institution_ids.add(institution.upper())
+            else:
+                self.rors.add(institution.lower())
+        self.country_codes = {country.upper() for country in countries}
+    
+    @property
+    def active(self) -> bool:
+        return bool(self.institution_ids or self.rors or self.country_codes)
+    
+    def matches_institution(self, institution: Dict[str, Any]) -> bool:
+        if not self.active:
+            return True
+        
+        openalex_id = (institution.get("id") or "").replace(OPENALEX_PREFIX, "")
+        ror = (institution.get("ror") or "").replace(ROR_PREFIX, "").lower()
+        return (
+            openalex_id in self.institution_ids
+            or (ror and ror in self.rors)
+            or (institution.get("country_code") or "").upper() in self.country_codes
+        )
+
+def snapshot_files(path: str) -> List[str]:
+    """Gzipped JSON Lines files of a snapshot entity directory, or the file itself"""
+    if os.path.isfile(path):
+        return [path]
+    
+    files = []
+    for root, _, names in os.walk(path):
+        files.extend(os.path.join(root, name) for name in names if name.endswith(".gz"))
+    return sorted(files)
+
+def read_chunks(paths: Iterable[str], chunk_size: int) -> Iterator[List[str]]:
+    """Stream raw lines of the snapshot files in chunks"""
+    for path in paths:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            chunk = []
+            for line in f:
+                if line.strip():
+                    chunk.append(line)
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+
+def _author_record(record: Dict[str, Any], snapshot_filter: SnapshotFilter) -> Optional[Dict[str, Any]]:
+    """API-shaped author record, None if it doesn't pass the filter"""
+    institution = record.get("last_known_institution")
+    if not institution and record.get("last_known_institutions"):
+        # Newer snapshots list every last known affiliation
+        institution = record["last_known_institutions"][0]
+    
+    if snapshot_filter.active and not (institution and snapshot_filter.matches_institution(institution)):
+        return None
+    
+    author = {field: record.get(field) for field in AUTHOR_FIELDS if record.get(field) is not None}
+    author["last_known_institution"] = institution
+    if "concepts" not in author and record.get("x_concepts"):
+        author["concepts"] = record["x_concepts"]
+    return author
+
+def _institution_record(record: Dict[str, Any], snapshot_filter: SnapshotFilter) -> Optional[Dict[str, Any]]:
+    if not snapshot_filter.matches_institution(record):
+        return None
+    return {field: record[field] for field in INSTITUTION_FIELDS if record.get(field) is not None}
+
+def _parse_chunk(entity: str, lines: List[str], snapshot_filter: SnapshotFilter) -> List[Dict[str, Any]]:
+    """Decode and filter one chunk of lines (runs in a parser process)"""
+    parse = _author_record if entity == "authors" else _institution_record
+    records = []
+    for line in lines:
+        try:
+            record = parse(json.loads(line), snapshot_filter)
+        except (ValueError, AttributeError, IndexError):
+            continue
+        if record is not None:
+            records.append(record)
+    return records
+
+def iter_records(
+    entity: str,
+    paths: Iterable[str],
+    snapshot_filter: SnapshotFilter,
+    processes: int = 1,
+    chunk_size: int = 2000
+) -> Iterator[Dict[str, Any]]:
+    """Matching records of an entity ("authors" or "institutions"), in file order
+    
+    Chunks are parsed by ``processes`` worker processes. At most two chunks
+    per worker are in flight, so memory stays constant however large the
+    snapshot is.
+    """
+    chunks = read_chunks(paths, chunk_size)
+    if processes <= 1:
+        for lines in chunks:
+            yield from _parse_chunk(entity, lines, snapshot_filter)
+        return
+    
+    with Pool(processes) as pool:
+        in_flight = deque()
+        for lines in chunks:
+            in_flight.append(pool.apply_async(_parse_chunk, (entity, lines, snapshot_filter)))
+            if len(in_flight) >= processes * 2:
+                yield from in_flight.popleft().get()
+        while in_flight:
+            yield from in_flight.popleft().get()
+
+def batched(records: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+class SnapshotImporter:
+    """Loads professors from a local OpenAlex snapshot through the sync pipeline"""
+    
+    def __init__(
+        self,
+        service: OpenAlexService,
+        snapshot_filter: SnapshotFilter,
+        processes: int = 1,
+        chunk_size: int = 2000,
+        page_size: int = 500
+    ):
+        self.service = service
+        self.snapshot_filter = snapshot_filter
+        self.processes = processes
+        self.chunk_size = chunk_size
+        self.page_size = page_size
+    
+    def import_institutions(self, path: str) -> int:
+        """Store matching institutions, returns how many were new"""
+        records = iter_records(
+            "institutions", snapshot_files(path), self.snapshot_filter, self.processes, self.chunk_size
+        )
+        created = 0
+        for batch in batched(records, self.page_size):
+            created += self.service.store_institutions(batch)
+        logger.info(f"Stored {created} new institutions from {path}")
+        return created
+    
+    async def import_authors(self, path: str) -> Dict[str, int]:
+        """Parse, embed, store and index matching authors"""
+        records = iter_records(
+            "authors", snapshot_files(path), self.snapshot_filter, self.processes, self.chunk_size
+        )
+        return await self.service.run_pipeline(self._pages(batched(records, self.page_size)))
+    
+    async def _pages(self, batches: Iterator[List[Dict[str, Any]]]):
+        loop = asyncio.get_running_loop()
+        while True:
+            # Reading blocks on the parser processes, keep it off the event loop
+            authors = await loop.run_in_executor(None, next, batches, None)
+            if authors is None:
+                return
+            yield authors, None
@@ -0,0 +1,25 @@
+import numpy as np
+from typing import Optional
+from sqlalchemy.orm import Session
+from app.crud.institution import institution as crud_institution
+from app.schemas.search import SearchFilters
+from app.utils.vector_db import VectorDatabase
+
+def allowed_professor_ids(
+    db: Session,
+    vector_db: VectorDatabase,
+    filters: Optional[SearchFilters]
+) -> Optional[np.ndarray]:
+    """Vector ids passing the filters, or None to filter after the vector search"""
+    if not filters or not any(filters.dict().values()):
+        return None
+    
+    institution_ids = crud_institution.get_ids_by_location(
+        db, university=filters.university, country=filters.country, city=filters.city
+    )
+    return vector_db.filter_ids(
+        institution_ids=institution_ids,
+        min_works_count=filters.min_works_count,
+        min_citations=filters.min_citations,
+        concepts=filters.concepts
+    )
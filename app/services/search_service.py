@@ -3,7 +3,10 @@ from typing import List, Optional
 from sqlalchemy.orm import Session
 from app.crud.professor import professor as crud_professor
 from app.services.embedding_service import EmbeddingService
+from app.services.search_filters import allowed_professor_ids
 from app.utils.vector_db import VectorDatabase
+from app.utils.cache import search_cache
+from app.core.config import settings
 from app.schemas.search import SearchFilters, SearchResult
 from app.schemas.professor import Professor
 
@@ -23,6 +26,16 @@ class SearchService:
         """Search professors using query and filters"""
         start_time = time.time()
         
+        cache_key = None
+        if settings.SEARCH_CACHE_ENABLED:
+            cache_key = search_cache.key(
+                self.vector_db.version, query, filters.dict() if filters else None, limit, offset
+            )
+            cached = search_cache.get(cache_key)
+            if cached is not None:
+                cached["query_time_ms"] = (time.time() - start_time) * 1000
+                return SearchResult(**cached)
+        
         if query:
             # Semantic search using embeddings
             professors = self._semantic_search(query, filters, limit, offset)
@@ -32,11 +45,16 @@ class SearchService:
         
         query_time = (time.time() - start_time) * 1000
         
-        return SearchResult(
+        result = SearchResult(
             professors=professors,
             total_count=len(professors),
             query_time_ms=query_time
         )
+        
+        if cache_key:
+            search_cache.set(cache_key, result.dict())
+        
+        return result
     
     def _semantic_search(
         self,
@@ -49,9 +67,13 @@ class SearchService:
         # Generate query embedding
         query_embedding = self.embedding_service.encode_text(query)
         
-        # Search similar professors
+        # Search similar professors, restricted to the filters when possible.
+        # Pages are cut after ranking, so fetch everything up to this page.
+        allowed_ids = allowed_professor_ids(self.db, self.vector_db, filters)
         similar_professors = self.vector_db.search_similar(
-            query_embedding, top_k=limit * 2  # Get more for filtering
+            query_embedding,
+            top_k=offset + limit if allowed_ids is not None else (offset + limit) * 2,  # Get more for filtering
+            allowed_ids=allowed_ids
         )
         
         if not similar_professors:
@@ -66,8 +88,7 @@ class SearchService:
             self.db,
             professor_ids=professor_ids,
             filters=filters,
-            skip=offset,
-            limit=limit
+            limit=offset + limit
         )
         
         # Add similarity scores
@@ -77,7 +98,7 @@ class SearchService:
         # Sort by similarity
         professors.sort(key=lambda x: x.match_score or 0, reverse=True)
         
-        return professors
+        return professors[offset:offset + limit]
     
     def _filter_search(
         self,
@@ -0,0 +1,63 @@
+import asyncio
+from typing import Any, Callable, Dict, List
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.openalex_service import OpenAlexService
+from app.utils.rate_limiter import AsyncTokenBucket
+from app.utils.vector_db import VectorDatabase
+import logging
+
+logger = logging.getLogger(__name__)
+
+class SyncJobRunner:
+    """Syncs many institutions concurrently within one OpenAlex request budget.
+    
+    Each institution gets its own database session and checkpoint; all of
+    them share the rate limiter and the vector index writer, so concurrent
+    syncs never overwrite each other's index versions.
+    """
+    
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        max_concurrent: int = None
+    ):
+        self.session_factory = session_factory
+        self.max_concurrent = max_concurrent or settings.SYNC_MAX_CONCURRENT_INSTITUTIONS
+    
+    async def run(
+        self,
+        institution_rors: List[str],
+        restart: bool = False,
+        incremental: bool = False
+    ) -> Dict[str, Dict[str, Any]]:
+        """Sync each institution, returning its counts or error by ROR id"""
+        rate_limiter = AsyncTokenBucket(settings.OPENALEX_REQUESTS_PER_SECOND)
+        vector_db = VectorDatabase()
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+        
+        async def sync_institution(institution_ror: str):
+            async with semaphore:
+                db = self.session_factory()
+                try:
+                    service = OpenAlexService(
+                        db, vector_db=vector_db, rate_limiter=rate_limiter, session_factory=self.session_factory
+                    )
+                    result = await service.sync_professors_by_institution(
+                        institution_ror, restart=restart, incremental=incremental
+                    )
+                    logger.info(f"Synced {institution_ror}: {result}")
+                    return institution_ror, result
+                except Exception as e:
+                    # The checkpoint keeps the cursor, a later run resumes there
+                    logger.error(f"Sync of {institution_ror} failed: {e}")
+                    return institution_ror, {"error": str(e)}
+                finally:
+                    db.close()
+        
+        results = await asyncio.gather(
+            *(sync_institution(ror) for ror in dict.fromkeys(institution_rors))
+        )
+        await asyncio.get_running_loop().run_in_executor(None, vector_db.save_index)
+        return dict(results)
@@ -0,0 +1,28 @@
+from typing import Any, Dict
+from sqlalchemy.orm import Session
+from app.crud.user import user as crud_user
+from app.crud.user_match import user_match as crud_user_match
+from app.models.user import User
+import logging
+
+logger = logging.getLogger(__name__)
+
+class UserService:
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def update_resume(self, user_id: int, resume: Dict[str, Any]) -> User:
+        """Store an uploaded resume's location, text and embedding on the user"""
+        user = crud_user.get(self.db, id=user_id)
+        if not user:
+            raise ValueError(f"User {user_id} not found")
+        
+        user.resume_file_path = resume["file_path"]
+        user.resume_text = resume["extracted_text"]
+        user.resume_embedding = resume["embedding"]
+        self.db.commit()
+        self.db.refresh(user)
+        crud_user_match.request_refresh(self.db, user_id=user_id)
+        
+        logger.info(f"Updated resume for user {user_id}")
+        return user
@@ -0,0 +1,181 @@
+import numpy as np
+from typing import Any, Dict, List, Optional, Set
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ProfessorAttributes:
+    """Compact per-professor filter attributes stored next to the FAISS index.
+    
+    Rows are sorted by professor int id (the FAISS id). Institutions and concepts are stored
+    as int32 codes into small vocabularies; concept membership is kept as
+    (professor id, concept code) pairs. Instances are never mutated, updates
+    return a new store so published snapshots stay consistent.
+    """
+    
+    def __init__(
+        self,
+        ids: Optional[np.ndarray] = None,
+        institution_codes: Optional[np.ndarray] = None,
+        works_counts: Optional[np.ndarray] = None,
+        citation_counts: Optional[np.ndarray] = None,
+        concept_owner_ids: Optional[np.ndarray] = None,
+        concept_codes: Optional[np.ndarray] = None,
+        institution_vocab: Optional[np.ndarray] = None,
+        concept_vocab: Optional[np.ndarray] = None,
+        concept_names: Optional[np.ndarray] = None,
+    ):
+        self.ids = ids if ids is not None else np.zeros(0, dtype=np.int64)
+        self.institution_codes = institution_codes if institution_codes is not None else np.zeros(0, dtype=np.int32)
+        self.works_counts = works_counts if works_counts is not None else np.zeros(0, dtype=np.int32)
+        self.citation_counts = citation_counts if citation_counts is not None else np.zeros(0, dtype=np.int64)
+        self.concept_owner_ids = concept_owner_ids if concept_owner_ids is not None else np.zeros(0, dtype=np.int64)
+        self.concept_codes = concept_codes if concept_codes is not None else np.zeros(0, dtype=np.int32)
+        self.institution_vocab = institution_vocab if institution_vocab is not None else np.zeros(0, dtype=str)
+        self.concept_vocab = concept_vocab if concept_vocab is not None else np.zeros(0, dtype=str)
+        self.concept_names = concept_names if concept_names is not None else np.zeros(0, dtype=str)
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def upsert(self, ids: np.ndarray, professors: List[Dict[str, Any]]) -> "ProfessorAttributes":
+        """New store with the given professors added or replaced.
+        
+        ``professors`` are dicts with institution_id, works_count,
+        cited_by_count and concepts, aligned with the unique int ``ids``.
+        """
+        if len(ids) == 0:
+            return self
+        
+        institution_vocab = list(self.institution_vocab)
+        institution_lookup = {inst_id: code for code, inst_id in enumerate(institution_vocab)}
+        concept_vocab = list(self.concept_vocab)
+        concept_names = list(self.concept_names)
+        concept_lookup = {concept_id: code for code, concept_id in enumerate(concept_vocab)}
+        
+        new_ids = np.asarray(ids, dtype=np.int64)
+        institution_codes = np.empty(len(new_ids), dtype=np.int32)
+        works_counts = np.empty(len(new_ids), dtype=np.int32)
+        citation_counts = np.empty(len(new_ids), dtype=np.int64)
+        concept_owner_ids = []
+        concept_codes = []
+        
+        for row, prof in enumerate(professors):
+            institution_id = prof.get("institution_id")
+            if institution_id:
+                if institution_id not in institution_lookup:
+                    institution_lookup[institution_id] = len(institution_vocab)
+                    institution_vocab.append(institution_id)
+                institution_codes[row] = institution_lookup[institution_id]
+            else:
+                institution_codes[row] = -1
+            
+            works_counts[row] = prof.get("works_count") or 0
+            citation_counts[row] = prof.get("cited_by_count") or 0
+            
+            for concept in prof.get("concepts") or []:
+                concept_id = concept.get("id", "").replace("https://openalex.org/", "")
+                if not concept_id:
+                    continue
+                if concept_id not in concept_lookup:
+                    concept_lookup[concept_id] = len(concept_vocab)
+                    concept_vocab.append(concept_id)
+                    concept_names.append((concept.get("display_name") or "").lower())
+                concept_owner_ids.append(new_ids[row])
+                concept_codes.append(concept_lookup[concept_id])
+        
+        keep = ~np.isin(self.ids, new_ids)
+        keep_concepts = ~np.isin(self.concept_owner_ids, new_ids)
+        
+        ids = np.concatenate([self.ids[keep], new_ids])
+        order = np.argsort(ids, kind="stable")
+        
+        return ProfessorAttributes(
+            ids=ids[order],
+            institution_codes=np.concatenate([self.institution_codes[keep], institution_codes])[order],
+            works_counts=np.concatenate([self.works_counts[keep], works_counts])[order],
+            citation_counts=np.concatenate([self.citation_counts[keep], citation_counts])[order],
+            concept_owner_ids=np.concatenate([
+                self.concept_owner_ids[keep_concepts], np.array(concept_owner_ids, dtype=np.int64)
+            ]),
+            concept_codes=np.concatenate([
+                self.concept_codes[keep_concepts], np.array(concept_codes, dtype=np.int32)
+            ]),
+            institution_vocab=np.array(institution_vocab, dtype=str),
+            concept_vocab=np.array(concept_vocab, dtype=str),
+            concept_names=np.array(concept_names, dtype=str),
+        )
+    
+    def delete(self, ids: np.ndarray) -> "ProfessorAttributes":
+        """New store without the given professors"""
+        keep = ~np.isin(self.ids, ids)
+        keep_concepts = ~np.isin(self.concept_owner_ids, ids)
+        
+        return ProfessorAttributes(
+            ids=self.ids[keep],
+            institution_codes=self.institution_codes[keep],
+            works_counts=self.works_counts[keep],
+            citation_counts=self.citation_counts[keep],
+            concept_owner_ids=self.concept_owner_ids[keep_concepts],
+            concept_codes=self.concept_codes[keep_concepts],
+            institution_vocab=self.institution_vocab,
+            concept_vocab=self.concept_vocab,
+            concept_names=self.concept_names,
+        )
+    
+    def select_ids(
+        self,
+        institution_ids: Optional[Set[str]] = None,
+        min_works_count: Optional[int] = None,
+        min_citations: Optional[int] = None,
+        concepts: Optional[List[str]] = None,
+    ) -> np.ndarray:
+        """Int ids of professors passing all given filters.
+        
+        ``institution_ids`` is the set of institutions allowed by the
+        university/country/city filters; ``concepts`` match concept ids or
+        (case-insensitive) display name substrings, any of them.
+        """
+        mask = np.ones(len(self.ids), dtype=bool)
+        
+        if institution_ids is not None:
+            allowed_codes = np.nonzero(np.isin(self.institution_vocab, list(institution_ids)))[0]
+            mask &= np.isin(self.institution_codes, allowed_codes)
+        
+        if min_works_count:
+            mask &= self.works_counts >= min_works_count
+        
+        if min_citations:
+            mask &= self.citation_counts >= min_citations
+        
+        if concepts:
+            concept_mask = np.zeros(len(self.concept_vocab), dtype=bool)
+            for concept in concepts:
+                concept_mask |= self.concept_vocab == concept
+                if len(self.concept_names):
+                    concept_mask |= np.char.find(self.concept_names, concept.lower()) >= 0
+            owners = self.concept_owner_ids[np.isin(self.concept_codes, np.nonzero(concept_mask)[0])]
+            mask &= np.isin(self.ids, owners)
+        
+        return self.ids[mask]
+    
+    def save(self, path: str):
+        """Save as an uncompressed .npz file"""
+        with open(path, 'wb') as f:
+            np.savez(
+                f,
+                ids=self.ids,
+                institution_codes=self.institution_codes,
+                works_counts=self.works_counts,
+                citation_counts=self.citation_counts,
+                concept_owner_ids=self.concept_owner_ids,
+                concept_codes=self.concept_codes,
+                institution_vocab=self.institution_vocab,
+                concept_vocab=self.concept_vocab,
+                concept_names=self.concept_names,
+            )
+    
+    @classmethod
+    def load(cls, path: str) -> "ProfessorAttributes":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(**{name: data[name] for name in data.files})
@@ -0,0 +1,178 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+import numpy as np
+import redis
+from app.core.config import settings
+from app.core.database import redis_client, redis_binary_client
+import logging
+
+logger = logging.getLogger(__name__)
+
+class SearchCache:
+    """Redis cache of search results.
+    
+    Keys include the published index version, so results computed against an
+    older index are never served once a new version is live; they simply
+    expire. Redis errors are logged and treated as misses so search keeps
+    working when Redis is down.
+    """
+    
+    def __init__(self, client: Optional[redis.Redis] = None, prefix: str = "search"):
+        self.client = client if client is not None else redis_client
+        self.prefix = prefix
+    
+    def key(
+        self,
+        index_version: int,
+        query: Optional[str],
+        filters: Optional[Dict[str, Any]],
+        limit: int,
+        offset: int
+    ) -> str:
+        """Cache key for a search; query case and whitespace don't matter"""
+        payload = {
+            "query": " ".join(query.lower().split()) if query else None,
+            "filters": {k: v for k, v in (filters or {}).items() if v not in (None, [], "")},
+            "limit": limit,
+            "offset": offset,
+        }
+        digest = hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+        return f"{self.prefix}:v{index_version}:{digest}"
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached value, or None on a miss"""
+        try:
+            value = self.client.get(key)
+            self.client.incr(f"{self.prefix}:stats:{'hits' if value is not None else 'misses'}")
+        except redis.RedisError as e:
+            logger.warning(f"Search cache unavailable: {e}")
+            return None
+        
+        return json.loads(value) if value is not None else None
+    
+    def set(self, key: str, value: Dict[str, Any]):
+        """Cache a value for SEARCH_CACHE_TTL_SECONDS"""
+        try:
+            self.client.set(key, json.dumps(value), ex=settings.SEARCH_CACHE_TTL_SECONDS)
+        except redis.RedisError as e:
+            logger.warning(f"Search cache unavailable: {e}")
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters shared by all workers"""
+        try:
+            hits, misses = self.client.mget(
+                f"{self.prefix}:stats:hits", f"{self.prefix}:stats:misses"
+            )
+        except redis.RedisError as e:
+            logger.warning(f"Search cache unavailable: {e}")
+            return {"available": False}
+        
+        hits, misses = int(hits or 0), int(misses or 0)
+        return {
+            "available": True,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+        }
+
+search_cache = SearchCache()
+
+class EmbeddingCache:
+    """Two-tier cache of text embeddings, keyed by model name and text hash.
+    
+    The first tier is a bounded in-process LRU. The optional second tier is
+    Redis, shared by all workers, storing raw float32 bytes. Redis errors
+    are logged and treated as misses.
+    """
+    
+    def __init__(
+        self,
+        max_size: Optional[int] = None,
+        client: Optional[redis.Redis] = None,
+        use_redis: Optional[bool] = None,
+        prefix: str = "embedding"
+    ):
+        self.max_size = settings.EMBEDDING_CACHE_SIZE if max_size is None else max_size
+        self.client = client if client is not None else redis_binary_client
+        self.use_redis = settings.EMBEDDING_CACHE_REDIS_ENABLED if use_redis is None else use_redis
+        self.prefix = prefix
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts = {"local_hits": 0, "redis_hits": 0, "misses": 0}
+    
+    def key(self, model_name: str, text: str) -> str:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{self.prefix}:{model_name}:{digest}"
+    
+    def get_many(self, model_name: str, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Cached embeddings for the texts, None where not cached"""
+        keys = [self.key(model_name, text) for text in texts]
+        results: List[Optional[np.ndarray]] = [None] * len(keys)
+        
+        with self._lock:
+            for i, key in enumerate(keys):
+                embedding = self._entries.get(key)
+                if embedding is not None:
+                    self._entries.move_to_end(key)
+                    results[i] = embedding
+        local_hits = sum(1 for embedding in results if embedding is not None)
+        
+        missing = [i for i, embedding in enumerate(results) if embedding is None]
+        if missing and self.use_redis:
+            try:
+                values = self.client.mget([keys[i] for i in missing])
+            except redis.RedisError as e:
+                logger.warning(f"Embedding cache unavailable: {e}")
+                values = [None] * len(missing)
+            
+            for i, value in zip(missing, values):
+                if value is not None:
+                    results[i] = self._remember(keys[i], np.frombuffer(value, dtype=np.float32))
+        
+        misses = sum(1 for embedding in results if embedding is None)
+        with self._lock:
+            self._counts["local_hits"] += local_hits
+            self._counts["redis_hits"] += len(results) - local_hits - misses
+            self._counts["misses"] += misses
+        return results
+    
+    def set_many(self, model_name: str, texts: List[str], embeddings: List[np.ndarray]):
+        """Cache embeddings for the texts in both tiers"""
+        keys = [self.key(model_name, text) for text in texts]
+        vectors = [np.asarray(embedding, dtype=np.float32) for embedding in embeddings]
+        
+        for key, vector in zip(keys, vectors):
+            self._remember(key, vector)
+        
+        if self.use_redis and keys:
+            try:
+                pipeline = self.client.pipeline(transaction=False)
+                for key, vector in zip(keys, vectors):
+                    pipeline.set(key, vector.tobytes(), ex=settings.EMBEDDING_CACHE_TTL_SECONDS)
+                pipeline.execute()
+            except redis.RedisError as e:
+                logger.warning(f"Embedding cache unavailable: {e}")
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of this worker"""
+        with self._lock:
+            return {"size": len(self._entries), "max_size": self.max_size, **self._counts}
+    
+    def _remember(self, key: str, vector: np.ndarray) -> np.ndarray:
+        # Entries are shared between callers, so they must not be modified
+        vector = vector.copy() if vector.flags.writeable else vector
+        vector.flags.writeable = False
+        if self.max_size <= 0:
+            return vector
+        
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return vector
+
+embedding_cache = EmbeddingCache()
@@ -0,0 +1,141 @@
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.crud.corpus_stat import corpus_stat as crud_corpus_stat
+from app.models.corpus_stat import CONCEPT, DOCUMENTS, DOCUMENTS_KEY, TERM
+from app.utils.text_prcessing import idf
+import logging
+
+logger = logging.getLogger(__name__)
+
+def concept_ids(concepts: Optional[List[Any]]) -> List[str]:
+    """Unique short OpenAlex ids of a concept list (dicts or ConceptScore)"""
+    ids = set()
+    for concept in concepts or []:
+        concept_id = concept.get("id") if isinstance(concept, dict) else getattr(concept, "id", None)
+        if concept_id:
+            ids.add(concept_id.rsplit("/", 1)[-1])
+    return sorted(ids)
+
+def document_deltas(
+    previous: Dict[str, Tuple[Optional[List[str]], Optional[List[Any]]]],
+    current: Iterable[Dict[str, Any]]
+) -> Dict[Tuple[str, str], int]:
+    """Change of each (kind, key) count when ``current`` professor rows replace the stored ones
+    
+    ``previous`` maps the openalex_id of each stored professor to its
+    (keywords, concepts). Rows without a keywords or concepts column keep the
+    stored value. Keys whose count doesn't change are left out.
+    """
+    deltas: Counter = Counter()
+    for row in {row["openalex_id"]: row for row in current}.values():
+        old_keywords, old_concepts = previous.get(row["openalex_id"], (None, None))
+        if row["openalex_id"] not in previous:
+            deltas[(DOCUMENTS, DOCUMENTS_KEY)] += 1
+        
+        old_terms = set(old_keywords or [])
+        new_terms = set(row["keywords"] or []) if "keywords" in row else old_terms
+        for term in new_terms - old_terms:
+            deltas[(TERM, term)] += 1
+        for term in old_terms - new_terms:
+            deltas[(TERM, term)] -= 1
+        
+        old_ids = set(concept_ids(old_concepts))
+        new_ids = set(concept_ids(row["concepts"])) if "concepts" in row else old_ids
+        for concept_id in new_ids - old_ids:
+            deltas[(CONCEPT, concept_id)] += 1
+        for concept_id in old_ids - new_ids:
+            deltas[(CONCEPT, concept_id)] -= 1
+    return {key: delta for key, delta in deltas.items() if delta}
+
+class CorpusStats:
+    """Document frequencies of summary keywords and concept ids over all professors.
+    
+    Counts live in plain dicts, so weighting a term is a single lookup.
+    Instances are never mutated; the holder swaps in a freshly loaded one.
+    """
+    
+    def __init__(
+        self,
+        documents: int = 0,
+        term_counts: Optional[Dict[str, int]] = None,
+        concept_counts: Optional[Dict[str, int]] = None
+    ):
+        self.documents = documents
+        self.term_counts = term_counts or {}
+        self.concept_counts = concept_counts or {}
+    
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[str, str, int]]) -> "CorpusStats":
+        """Stats from (kind, key, document_count) rows"""
+        documents = 0
+        counts: Dict[str, Dict[str, int]] = {TERM: {}, CONCEPT: {}}
+        for kind, key, count in rows:
+            if kind == DOCUMENTS:
+                documents = count
+            elif kind in counts and count > 0:
+                counts[kind][key] = count
+        return cls(documents, counts[TERM], counts[CONCEPT])
+    
+    def term_idf(self, terms: np.ndarray) -> np.ndarray:
+        """IDF of each keyword"""
+        return idf(np.array([self.term_counts.get(term, 0) for term in terms]), self.documents)
+    
+    def concept_idf(self, ids: List[str]) -> np.ndarray:
+        """IDF of each concept id"""
+        return idf(np.array([self.concept_counts.get(concept_id, 0) for concept_id in ids]), self.documents)
+
+class CorpusStatsHolder:
+    """Process-wide cache of the corpus stats, reloaded every CORPUS_STATS_RELOAD_SECONDS.
+    
+    Like the index manager, readers keep the snapshot they got. Stale stats
+    are reloaded by one background thread on a session of its own, and
+    requests are served the previous snapshot meanwhile.
+    """
+    
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal):
+        self.session_factory = session_factory
+        self._stats: Optional[CorpusStats] = None
+        self._reload_lock = threading.Lock()
+        self._loaded_at = 0.0
+    
+    def current(self) -> CorpusStats:
+        """Current stats, loading them first if there are none yet"""
+        if self._stats is None:
+            # Nothing to serve yet, load on this thread
+            with self._reload_lock:
+                if self._stats is None and self._stale():
+                    self._reload()
+        elif self._stale() and self._reload_lock.acquire(blocking=False):
+            threading.Thread(target=self._reload_in_background, daemon=True).start()
+        return self._stats if self._stats is not None else CorpusStats()
+    
+    def _stale(self) -> bool:
+        return time.time() - self._loaded_at >= settings.CORPUS_STATS_RELOAD_SECONDS
+    
+    def _reload_in_background(self):
+        try:
+            self._reload()
+        finally:
+            self._reload_lock.release()
+    
+    def _reload(self):
+        db = self.session_factory()
+        try:
+            self._stats = self._load(db)
+        except Exception as e:
+            # Explanations fall back to candidate-pool IDF, or keep the previous stats
+            logger.error(f"Error loading corpus stats: {e}")
+        finally:
+            db.close()
+            self._loaded_at = time.time()
+    
+    def _load(self, db: Session) -> CorpusStats:
+        return CorpusStats.from_rows(crud_corpus_stat.get_all(db))
+
+corpus_stats = CorpusStatsHolder()
@@ -0,0 +1,263 @@
+import numpy as np
+import os
+import shutil
+from typing import Iterator, Optional, Tuple
+
+STORE_DTYPES = ("float16", "int8")
+
+# Rows dequantized at a time while scanning (or copied while saving), bounds the scratch memory
+SCAN_BLOCK_ROWS = 16384
+
+def quantize(vectors: np.ndarray, dtype: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Compact codes for float32 rows, plus per-row scales for int8"""
+    if dtype not in STORE_DTYPES:
+        raise ValueError(f"Unknown embedding store dtype: {dtype}")
+    
+    if dtype == "float16":
+        return vectors.astype(np.float16), None
+    
+    # Symmetric per-row scaling onto [-127, 127]
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.rint(vectors / scales[:, None]).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+def _contains(sorted_ids: np.ndarray, ids: np.ndarray) -> np.ndarray:
+    """Whether each of ``ids`` is in ``sorted_ids``, by binary search"""
+    rows = np.searchsorted(sorted_ids, ids)
+    found = rows < len(sorted_ids)
+    found[found] = sorted_ids[rows[found]] == ids[found]
+    return found
+
+def _write_store(
+    path: str,
+    dtype: str,
+    count: int,
+    dimension: int,
+    blocks: Iterator[Tuple[np.ndarray, np.ndarray]]
+):
+    """Write ``count`` rows, given as sorted (ids, vectors) blocks, to a store directory, replacing it atomically"""
+    if dtype not in STORE_DTYPES:
+        raise ValueError(f"Unknown embedding store dtype: {dtype}")
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    
+    def open_array(name: str, array_dtype, shape):
+        return np.lib.format.open_memmap(os.path.join(tmp_path, name), mode="w+", dtype=array_dtype, shape=shape)
+    
+    ids = open_array("ids.npy", np.int64, (count,))
+    vectors = open_array("vectors.npy", np.float32, (count, dimension))
+    codes = open_array("codes.npy", dtype, (count, dimension))
+    scales = open_array("scales.npy", np.float32, (count,)) if dtype == "int8" else None
+    
+    start = 0
+    for block_ids, block_vectors in blocks:
+        end = start + len(block_ids)
+        block_codes, block_scales = quantize(np.asarray(block_vectors, dtype=np.float32), dtype)
+        ids[start:end] = block_ids
+        vectors[start:end] = block_vectors
+        codes[start:end] = block_codes
+        if scales is not None:
+            scales[start:end] = block_scales
+        start = end
+    
+    for array in (ids, vectors, codes, scales):
+        if array is not None:
+            array.flush()
+    del ids, vectors, codes, scales
+    
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp_path, path)
+
+class EmbeddingStore:
+    """Normalized professor embeddings on disk, sorted by FAISS id.
+    
+    ``codes`` is a compact float16 or int8 copy scanned to find candidates;
+    ``vectors`` keeps float32 rows for re-scoring the candidates. Saved stores
+    are opened with mmap, so worker processes share one copy through the OS
+    page cache and only the re-scored float32 rows are ever paged in. Like
+    ProfessorAttributes, instances are never mutated.
+    """
+    
+    def __init__(
+        self,
+        ids: Optional[np.ndarray] = None,
+        vectors: Optional[np.ndarray] = None,
+        codes: Optional[np.ndarray] = None,
+        scales: Optional[np.ndarray] = None,
+        dimension: Optional[int] = None
+    ):
+        self.ids = ids if ids is not None else np.zeros(0, dtype=np.int64)
+        self.vectors = vectors if vectors is not None else np.zeros((0, dimension or 0), dtype=np.float32)
+        self.codes = codes
+        self.scales = scales
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    @property
+    def dimension(self) -> int:
+        return self.vectors.shape[1]
+    
+    @classmethod
+    def from_vectors(cls, ids: np.ndarray, vectors: np.ndarray) -> "EmbeddingStore":
+        """Store over normalized float32 vectors (unique ids)"""
+        order = np.argsort(ids, kind="stable")
+        return cls(
+            ids=np.asarray(ids, dtype=np.int64)[order],
+            vectors=np.ascontiguousarray(vectors, dtype=np.float32)[order]
+        )
+    
+    def upsert(self, ids: np.ndarray, vectors: np.ndarray) -> "EmbeddingStoreChanges":
+        """This store with the given rows added or replaced, merged when saved"""
+        return EmbeddingStoreChanges(self).upsert(ids, vectors)
+    
+    def delete(self, ids: np.ndarray) -> "EmbeddingStoreChanges":
+        """This store without the given rows, merged when saved"""
+        return EmbeddingStoreChanges(self).delete(ids)
+    
+    def search(
+        self,
+        query: np.ndarray,
+        k: int,
+        allowed_ids: Optional[np.ndarray] = None,
+        rescore_factor: int = 4
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Top k (scores, ids) for one normalized query, optionally among ``allowed_ids`` only
+        
+        Every row's compact code is scored; the best ``k * rescore_factor``
+        candidates are then re-scored exactly with their float32 rows.
+        """
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        rows = None
+        if allowed_ids is not None:
+            # Ids are sorted, so allowed ids map to rows by binary search
+            allowed = np.asarray(allowed_ids, dtype=np.int64)
+            rows = np.searchsorted(self.ids, allowed)
+            found = rows < len(self.ids)
+            rows, allowed = rows[found], allowed[found]
+            rows = np.unique(rows[self.ids[rows] == allowed])
+        
+        candidates = self._candidates(query, min(k * max(rescore_factor, 1), self._count(rows)), rows)
+        if len(candidates) == 0:
+            return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.int64)
+        
+        # Sorted rows keep the mmap reads sequential
+        candidates.sort()
+        scores = self.vectors[candidates] @ query
+        top = np.argsort(-scores, kind="stable")[:k]
+        return scores[top], self.ids[candidates[top]]
+    
+    def _count(self, rows: Optional[np.ndarray]) -> int:
+        return len(self.ids) if rows is None else len(rows)
+    
+    def _candidates(self, query: np.ndarray, n: int, rows: Optional[np.ndarray]) -> np.ndarray:
+        """Rows with the n best approximate scores"""
+        if n <= 0:
+            return np.zeros(0, dtype=np.int64)
+        
+        codes, scales = self.codes, self.scales
+        if codes is None:
+            # Not saved yet, score the float32 rows directly
+            codes, scales = self.vectors, None
+        
+        total = self._count(rows)
+        scores = np.empty(total, dtype=np.float32)
+        for start in range(0, total, SCAN_BLOCK_ROWS):
+            block = slice(start, start + SCAN_BLOCK_ROWS)
+            block_rows = block if rows is None else rows[block]
+            block_scores = codes[block_rows].astype(np.float32) @ query
+            if scales is not None:
+                block_scores *= scales[block_rows]
+            scores[block] = block_scores
+        
+        best = np.argpartition(-scores, n - 1)[:n] if n < total else np.arange(total)
+        return best if rows is None else rows[best]
+    
+    def save(self, path: str, dtype: str):
+        """Write the store to a directory of .npy files, replacing it atomically"""
+        blocks = (
+            (self.ids[start:start + SCAN_BLOCK_ROWS], self.vectors[start:start + SCAN_BLOCK_ROWS])
+            for start in range(0, len(self.ids), SCAN_BLOCK_ROWS)
+        )
+        _write_store(path, dtype, len(self.ids), self.dimension, blocks)
+    
+    @classmethod
+    def load(cls, path: str) -> "EmbeddingStore":
+        """Open a saved store read-only with mmap"""
+        scales_path = os.path.join(path, "scales.npy")
+        return cls(
+            ids=np.load(os.path.join(path, "ids.npy"), mmap_mode="r"),
+            vectors=np.load(os.path.join(path, "vectors.npy"), mmap_mode="r"),
+            codes=np.load(os.path.join(path, "codes.npy"), mmap_mode="r"),
+            scales=np.load(scales_path, mmap_mode="r") if os.path.exists(scales_path) else None
+        )
+
+class EmbeddingStoreChanges:
+    """Rows upserted into and deleted from a base EmbeddingStore, not merged yet.
+    
+    Only the changed rows are held in memory. ``save`` merges them with the
+    base block by block, so publishing never reads the whole (mapped) base
+    matrix into RAM or sorts it.
+    """
+    
+    def __init__(
+        self,
+        base: EmbeddingStore,
+        ids: Optional[np.ndarray] = None,
+        vectors: Optional[np.ndarray] = None,
+        removed: Optional[np.ndarray] = None
+    ):
+        self.base = base
+        # Sorted upserted rows, and the sorted ids of base rows they replace or delete
+        self.ids = ids if ids is not None else np.zeros(0, dtype=np.int64)
+        self.vectors = vectors if vectors is not None else np.zeros((0, base.dimension), dtype=np.float32)
+        self.removed = removed if removed is not None else np.zeros(0, dtype=np.int64)
+    
+    def __len__(self) -> int:
+        return len(self.base) - int(_contains(self.base.ids, self.removed).sum()) + len(self.ids)
+    
+    def upsert(self, ids: np.ndarray, vectors: np.ndarray) -> "EmbeddingStoreChanges":
+        """These changes plus the given rows added or replaced"""
+        if len(ids) == 0:
+            return self
+        ids = np.asarray(ids, dtype=np.int64)
+        keep = ~np.isin(self.ids, ids)
+        merged = EmbeddingStore.from_vectors(
+            np.concatenate([self.ids[keep], ids]),
+            np.concatenate([self.vectors[keep], vectors.reshape(len(ids), -1)])
+        )
+        return EmbeddingStoreChanges(self.base, merged.ids, merged.vectors, np.union1d(self.removed, ids))
+    
+    def delete(self, ids: np.ndarray) -> "EmbeddingStoreChanges":
+        """These changes plus the given rows removed"""
+        if len(ids) == 0:
+            return self
+        ids = np.asarray(ids, dtype=np.int64)
+        keep = ~np.isin(self.ids, ids)
+        return EmbeddingStoreChanges(self.base, self.ids[keep], self.vectors[keep], np.union1d(self.removed, ids))
+    
+    def _merged_blocks(self) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Sorted (ids, vectors) blocks of the base with the changes applied"""
+        base_ids = self.base.ids
+        next_new = 0
+        for start in range(0, len(base_ids), SCAN_BLOCK_ROWS):
+            block_ids = np.asarray(base_ids[start:start + SCAN_BLOCK_ROWS])
+            keep = ~_contains(self.removed, block_ids)
+            # Upserted rows sorting up to the end of this block go into it
+            end_new = np.searchsorted(self.ids, block_ids[-1], side="right")
+            ids = np.concatenate([block_ids[keep], self.ids[next_new:end_new]])
+            vectors = np.concatenate([
+                self.base.vectors[start:start + SCAN_BLOCK_ROWS][keep], self.vectors[next_new:end_new]
+            ])
+            order = np.argsort(ids, kind="stable")
+            next_new = end_new
+            yield ids[order], vectors[order]
+        
+        if next_new < len(self.ids):
+            yield self.ids[next_new:], self.vectors[next_new:]
+    
+    def save(self, path: str, dtype: str):
+        """Write the merged store to a directory of .npy files, replacing it atomically"""
+        _write_store(path, dtype, len(self), self.base.dimension, self._merged_blocks())
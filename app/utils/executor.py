@@ -0,0 +1,64 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ExecutorBusy(Exception):
+    """Raised when the executor already holds as many jobs as it accepts"""
+
+class BoundedExecutor:
+    """Thread pool for CPU-heavy request work (text extraction, embedding, FAISS).
+    
+    Keeps that work off the event loop. At most ``max_workers`` jobs run and
+    ``max_queue`` wait; further jobs are rejected with ExecutorBusy right
+    away instead of queueing without bound behind a slow request.
+    """
+    
+    def __init__(self, max_workers: int, max_queue: int, name: str = "cpu"):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._rejected = 0
+    
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run ``func`` in the pool and await its result"""
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise ExecutorBusy(f"{self._in_flight} jobs already in flight")
+            self._in_flight += 1
+        
+        try:
+            future = self._executor.submit(functools.partial(func, *args, **kwargs))
+        except Exception:
+            self._release()
+            raise
+        # Release on completion, not on await, so a cancelled request still
+        # holds its slot while its job is running
+        future.add_done_callback(lambda _: self._release())
+        return await asyncio.wrap_future(future)
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "rejected": self._rejected,
+            }
+    
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+
+cpu_executor = BoundedExecutor(
+    max_workers=settings.CPU_EXECUTOR_WORKERS,
+    max_queue=settings.CPU_EXECUTOR_MAX_QUEUE
+)
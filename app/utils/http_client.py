@@ -0,0 +1,120 @@
+import asyncio
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+import aiohttp
+from app.core.config import settings
+from app.utils.rate_limiter import AsyncTokenBucket
+import logging
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class HttpRequestError(Exception):
+    """A request failed with a non-retryable status or ran out of retries"""
+    
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+class HttpStats:
+    """Request, throttle and retry counters"""
+    
+    def __init__(self):
+        self.requests = 0
+        self.throttled = 0
+        self.retries = 0
+        self.failures = 0
+    
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "retries": self.retries,
+            "failures": self.failures,
+        }
+
+class RateLimitedClient:
+    """JSON GETs through a shared token bucket, retrying throttles and transient errors.
+    
+    429 and 5xx responses and connection errors are retried with exponential
+    backoff and full jitter, up to ``max_retries`` times. A ``Retry-After``
+    header takes precedence over the computed delay and also pauses the
+    shared bucket, so concurrent requests back off together.
+    """
+    
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        rate_limiter: AsyncTokenBucket,
+        stats: Optional[HttpStats] = None,
+        max_retries: Optional[int] = None
+    ):
+        self.session = session
+        self.rate_limiter = rate_limiter
+        self.stats = stats or HttpStats()
+        self.max_retries = settings.OPENALEX_MAX_RETRIES if max_retries is None else max_retries
+    
+    async def get_json(self, url: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """GET ``url`` and decode the JSON body"""
+        attempt = 0
+        while True:
+            await self.rate_limiter.acquire()
+            self.stats.requests += 1
+            retry_after = None
+            
+            try:
+                async with self.session.get(url, params=params) as response:
+                    if response.status == 200:
+                        return await response.json()
+                    
+                    if response.status not in RETRY_STATUSES:
+                        self.stats.failures += 1
+                        raise HttpRequestError(f"GET {url} returned {response.status}", response.status)
+                    
+                    if response.status == 429:
+                        self.stats.throttled += 1
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    error = HttpRequestError(f"GET {url} returned {response.status}", response.status)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = HttpRequestError(f"GET {url} failed: {e}")
+            
+            if attempt >= self.max_retries:
+                self.stats.failures += 1
+                raise error
+            
+            if retry_after is not None:
+                delay = retry_after
+                self.rate_limiter.pause(delay)
+            else:
+                delay = backoff_delay(attempt)
+            
+            attempt += 1
+            self.stats.retries += 1
+            logger.warning(f"{error}, retry {attempt}/{self.max_retries} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter"""
+    cap = min(settings.OPENALEX_BACKOFF_MAX_SECONDS, settings.OPENALEX_BACKOFF_BASE_SECONDS * 2 ** attempt)
+    return random.uniform(0, cap)
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta seconds or HTTP date)"""
+    if not value:
+        return None
+    
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
@@ -0,0 +1,110 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Tuple
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+class MicroBatcher:
+    """Groups texts from concurrent callers into one encode call.
+    
+    Callers queue their texts and block on futures. A worker thread takes
+    the oldest text and keeps collecting for up to ``max_wait_ms`` after it
+    was queued (or until ``max_batch_size`` texts), then encodes them all in
+    a single forward pass.
+    """
+    
+    def __init__(
+        self,
+        encode_batch: Callable[[List[str]], np.ndarray],
+        max_batch_size: int,
+        max_wait_ms: float,
+        name: str = "encoder"
+    ):
+        self.encode_batch = encode_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.name = name
+        self._queue: "queue.Queue[Tuple[str, Future, float]]" = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._texts = 0
+        self._largest_batch = 0
+        self._queue_wait_ms = 0.0
+    
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Encode texts, sharing the forward pass with concurrent callers"""
+        if len(texts) >= self.max_batch_size:
+            # Already a full batch, queueing would only add latency
+            return self.encode_batch(texts)
+        
+        futures = [self.submit(text) for text in texts]
+        return np.stack([future.result() for future in futures])
+    
+    def submit(self, text: str) -> Future:
+        """Queue a text, the future resolves to its embedding"""
+        self._ensure_started()
+        future = Future()
+        self._queue.put((text, future, time.monotonic()))
+        return future
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "batches": self._batches,
+                "texts": self._texts,
+                "mean_batch_size": self._texts / self._batches if self._batches else 0.0,
+                "max_batch_size": self._largest_batch,
+                "mean_queue_wait_ms": self._queue_wait_ms / self._texts if self._texts else 0.0,
+                "queued": self._queue.qsize(),
+            }
+    
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name=f"micro-batcher-{self.name}", daemon=True
+                )
+                self._thread.start()
+    
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = batch[0][2] + self.max_wait_ms / 1000
+            
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                try:
+                    # Past the deadline, still take whatever is already waiting
+                    batch.append(self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            self._process(batch)
+    
+    def _process(self, batch: List[Tuple[str, Future, float]]):
+        started = time.monotonic()
+        texts = [text for text, _, _ in batch]
+        
+        try:
+            embeddings = self.encode_batch(texts)
+        except Exception as e:
+            logger.error(f"Batched encode of {len(texts)} texts failed: {e}")
+            for _, future, _ in batch:
+                future.set_exception(e)
+        else:
+            for (_, future, _), embedding in zip(batch, embeddings):
+                future.set_result(embedding)
+        
+        with self._stats_lock:
+            self._batches += 1
+            self._texts += len(batch)
+            self._largest_batch = max(self._largest_batch, len(batch))
+            self._queue_wait_ms += sum((started - queued_at) * 1000 for _, _, queued_at in batch)
@@ -0,0 +1,112 @@
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from sentence_transformers import SentenceTransformer
+from app.core.config import settings
+from app.utils.micro_batcher import MicroBatcher
+import logging
+
+logger = logging.getLogger(__name__)
+
+class SharedEncoder:
+    """Process-wide handle to a loaded sentence transformer model"""
+    
+    def __init__(self, name: str, model: SentenceTransformer, load_time_ms: float):
+        self.name = name
+        self.model = model
+        self.load_time_ms = load_time_ms
+        self.memory_bytes = self._model_memory_bytes(model)
+        # Serialise forward passes so concurrent requests don't oversubscribe
+        # the torch thread pool on CPU-only nodes
+        self._lock = threading.Lock()
+        self.batcher = MicroBatcher(
+            self._encode_normalized_now,
+            max_batch_size=settings.EMBEDDING_BATCH_MAX_SIZE,
+            max_wait_ms=settings.EMBEDDING_BATCH_MAX_WAIT_MS,
+            name=name
+        )
+    
+    def encode(self, texts: List[str], **kwargs):
+        """Encode texts with the shared model"""
+        with self._lock:
+            return self.model.encode(texts, **kwargs)
+    
+    def encode_normalized(self, texts: List[str]):
+        """Unit-length embeddings, micro-batched with concurrent callers if enabled"""
+        if settings.EMBEDDING_BATCHING_ENABLED:
+            return self.batcher.encode(texts)
+        return self._encode_normalized_now(texts)
+    
+    def _encode_normalized_now(self, texts: List[str]):
+        return self.encode(texts, normalize_embeddings=True)
+    
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "load_time_ms": self.load_time_ms,
+            "memory_bytes": self.memory_bytes,
+            "embedding_dimension": self.get_sentence_embedding_dimension(),
+            "batching": self.batcher.stats(),
+        }
+    
+    @staticmethod
+    def _model_memory_bytes(model: SentenceTransformer) -> int:
+        """Approximate resident size of the model weights"""
+        total = 0
+        for tensor in list(model.parameters()) + list(model.buffers()):
+            total += tensor.numel() * tensor.element_size()
+        return total
+
+class ModelRegistry:
+    """Loads each embedding model once per worker process and shares it"""
+    
+    def __init__(self):
+        self._models: Dict[str, SharedEncoder] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, name: Optional[str] = None) -> SharedEncoder:
+        """Get a shared encoder, loading it on first use"""
+        name = name or settings.SENTENCE_TRANSFORMER_MODEL
+        encoder = self._models.get(name)
+        if encoder is not None:
+            return encoder
+        
+        with self._lock:
+            # Another thread may have finished loading while we waited
+            encoder = self._models.get(name)
+            if encoder is None:
+                encoder = self._load(name)
+                self._models[name] = encoder
+        return encoder
+    
+    def load_all(self, names: Optional[List[str]] = None):
+        """Eagerly load all configured models (called at startup)"""
+        if names is None:
+            names = [settings.SENTENCE_TRANSFORMER_MODEL] + list(settings.PRELOAD_EMBEDDING_MODELS)
+        for name in dict.fromkeys(names):
+            self.get(name)
+    
+    def stats(self) -> List[Dict[str, Any]]:
+        """Load time and memory for every loaded model"""
+        return [encoder.stats() for encoder in list(self._models.values())]
+    
+    def _load(self, name: str) -> SharedEncoder:
+        start_time = time.time()
+        try:
+            model = SentenceTransformer(name)
+        except Exception as e:
+            logger.error(f"Failed to load embedding model {name}: {e}")
+            raise
+        load_time = (time.time() - start_time) * 1000
+        
+        encoder = SharedEncoder(name, model, load_time)
+        logger.info(
+            f"Loaded embedding model {name} in {load_time:.0f}ms "
+            f"({encoder.memory_bytes / (1024 * 1024):.1f}MB)"
+        )
+        return encoder
+
+model_registry = ModelRegistry()
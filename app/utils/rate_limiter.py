@@ -0,0 +1,41 @@
+import asyncio
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+class AsyncTokenBucket:
+    """Token bucket shared by coroutines to stay within a request budget.
+    
+    Tokens refill at ``rate`` per second up to ``capacity``; ``acquire``
+    waits until a token is available. One bucket shared by every concurrent
+    sync keeps the whole process within the API's budget.
+    """
+    
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    def pause(self, seconds: float):
+        """Hand out no tokens for ``seconds``, e.g. after the server asked us to back off"""
+        now = time.monotonic()
+        self._tokens = min(self._tokens + (now - self._updated) * self.rate, -seconds * self.rate)
+        self._updated = now
+    
+    async def acquire(self, tokens: float = 1.0):
+        """Wait for and take ``tokens`` from the bucket"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                
+                # Holding the lock while sleeping keeps waiters in FIFO order
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
@@ -0,0 +1,78 @@
+import numpy as np
+from typing import Optional, Sequence
+from app.core.config import settings
+
+# Columns of the feature matrix, in order
+SIGNALS = ("similarity", "h_index", "cited_by_count", "works_count", "concept_overlap")
+
+def rerank_weights() -> np.ndarray:
+    """Configured weight of each signal"""
+    return np.array([
+        settings.RERANK_SIMILARITY_WEIGHT,
+        settings.RERANK_H_INDEX_WEIGHT,
+        settings.RERANK_CITATIONS_WEIGHT,
+        settings.RERANK_WORKS_WEIGHT,
+        settings.RERANK_CONCEPT_WEIGHT,
+    ], dtype=np.float32)
+
+def log_scaled(values: np.ndarray) -> np.ndarray:
+    """Heavy-tailed counts mapped onto [0, 1] relative to the best candidate"""
+    logs = np.log1p(np.maximum(values, 0).astype(np.float32))
+    top = logs.max(initial=0.0)
+    return logs / top if top > 0 else logs
+
+def exact_similarities(
+    query: np.ndarray,
+    vectors: Sequence[Optional[np.ndarray]],
+    fallback_scores: np.ndarray
+) -> np.ndarray:
+    """Cosine similarity of each candidate vector, the first-stage score where a vector is missing"""
+    similarities = np.asarray(fallback_scores, dtype=np.float32).copy()
+    present = np.array([vector is not None for vector in vectors], dtype=bool)
+    if present.any():
+        matrix = np.stack([vector for vector in vectors if vector is not None]).astype(np.float32, copy=False)
+        query = np.asarray(query, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+        similarities[present] = (matrix @ query) / np.where(norms > 0, norms, 1.0)
+    return similarities
+
+def concept_overlap(concept_names: Sequence[Sequence[str]], interests: Sequence[str]) -> np.ndarray:
+    """Fraction of the user's interests found among each candidate's concept names"""
+    overlap = np.zeros(len(concept_names), dtype=np.float32)
+    interests = np.unique([interest.lower() for interest in interests if interest])
+    if len(interests) == 0:
+        return overlap
+    
+    # Flatten to (candidate row, concept name) pairs and match them all at once
+    owners = np.array([row for row, names in enumerate(concept_names) for _ in names], dtype=np.int64)
+    names = np.array([name.lower() for names in concept_names for name in names], dtype=str)
+    if len(names) == 0:
+        return overlap
+    
+    matched = np.isin(names, interests)
+    # A concept repeated on one candidate counts once
+    pairs = np.unique(np.stack([owners[matched], np.searchsorted(interests, names[matched])]), axis=1)
+    overlap += np.bincount(pairs[0], minlength=len(concept_names)).astype(np.float32)
+    return overlap / len(interests)
+
+def feature_matrix(
+    similarities: np.ndarray,
+    h_index: np.ndarray,
+    cited_by_count: np.ndarray,
+    works_count: np.ndarray,
+    overlap: np.ndarray
+) -> np.ndarray:
+    """(candidates x SIGNALS) matrix, every column roughly in [0, 1]"""
+    return np.column_stack([
+        similarities,
+        log_scaled(h_index),
+        log_scaled(cited_by_count),
+        log_scaled(works_count),
+        overlap,
+    ]).astype(np.float32)
+
+def rerank(features: np.ndarray, weights: Optional[np.ndarray] = None) -> np.ndarray:
+    """Blended score per candidate, one matrix-vector product for the whole request"""
+    if weights is None:
+        weights = rerank_weights()
+    return features @ weights
@@ -0,0 +1,61 @@
+import re
+import numpy as np
+from typing import Callable, List, Optional, Sequence
+
+# Lowercase words of four letters or more
+KEYWORD_PATTERN = re.compile(r"\b[a-z]{4,}\b")
+
+def keyword_set(text: Optional[str]) -> List[str]:
+    """Sorted unique keywords of a text"""
+    if not text:
+        return []
+    return sorted(set(KEYWORD_PATTERN.findall(text.lower())))
+
+def idf(document_counts: np.ndarray, total_documents: int) -> np.ndarray:
+    """Smoothed inverse document frequency, rarer terms weigh more"""
+    return np.log((1.0 + total_documents) / (1.0 + np.asarray(document_counts, dtype=np.float32))) + 1.0
+
+def pool_idf(keyword_lists: Sequence[Sequence[str]]) -> Callable[[np.ndarray], np.ndarray]:
+    """IDF lookup estimated from the given documents' keyword sets"""
+    vocabulary, counts = np.unique(
+        np.array([term for keywords in keyword_lists for term in keywords], dtype=str), return_counts=True
+    )
+    weights = idf(counts, len(keyword_lists))
+    unseen = float(idf(np.zeros(1), len(keyword_lists))[0])
+    
+    def lookup(terms: np.ndarray) -> np.ndarray:
+        if len(vocabulary) == 0:
+            return np.full(len(terms), unseen, dtype=np.float32)
+        positions = np.minimum(np.searchsorted(vocabulary, terms), len(vocabulary) - 1)
+        return np.where(vocabulary[positions] == terms, weights[positions], unseen).astype(np.float32)
+    
+    return lookup
+
+def common_keywords(
+    keyword_lists: Sequence[Sequence[str]],
+    query_keywords: Sequence[str],
+    term_idf: Callable[[np.ndarray], np.ndarray],
+    limit: int = 10
+) -> List[List[str]]:
+    """Keywords each document shares with the query, most informative first
+    
+    All documents are matched in one pass over the flattened (document, term)
+    pairs; ties in IDF are broken alphabetically.
+    """
+    shared: List[List[str]] = [[] for _ in keyword_lists]
+    query = np.unique(np.array(list(query_keywords), dtype=str))
+    if len(query) == 0:
+        return shared
+    
+    owners = np.array([row for row, keywords in enumerate(keyword_lists) for _ in keywords], dtype=np.int64)
+    terms = np.array([term for keywords in keyword_lists for term in keywords], dtype=str)
+    if len(terms) == 0:
+        return shared
+    
+    matched = np.isin(terms, query)
+    owners, terms = owners[matched], terms[matched]
+    order = np.lexsort((terms, -term_idf(terms), owners))
+    for row, term in zip(owners[order], terms[order]):
+        if len(shared[row]) < limit:
+            shared[row].append(str(term))
+    return shared
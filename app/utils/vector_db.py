@@ -1,110 +1,1103 @@
+import fcntl
+import functools
 import json
 import numpy as np
 import faiss
-from typing import List, Tuple, Optional
+import shutil
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Set, Tuple, Optional
 from app.core.config import settings
+from app.utils.attribute_store import ProfessorAttributes
+from app.utils.embedding_store import EmbeddingStore
 import logging
 import os
 
 logger = logging.getLogger(__name__)
 
-class VectorDatabase:
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+
+# Below this many points per list, k-means training is unreliable
+MIN_POINTS_PER_CENTROID = 39
+
+def professor_id_to_int(professor_id: str) -> int:
+    """Stable int64 FAISS id for an OpenAlex author id (A5023888391 -> 5023888391)"""
+    return int(professor_id.lstrip("A"))
+
+def int_to_professor_id(faiss_id: int) -> str:
+    """OpenAlex author id for a FAISS id"""
+    return f"A{faiss_id}"
+
+def normalize_embeddings(embeddings) -> np.ndarray:
+    """Float32 copy of the embeddings scaled to unit length, so inner product is cosine"""
+    embeddings_array = np.array(embeddings, dtype=np.float32, ndmin=2)
+    faiss.normalize_L2(embeddings_array)
+    return embeddings_array
+
+def create_index(
+    num_vectors: int,
+    index_type: Optional[str] = None,
+    dimension: Optional[int] = None
+) -> faiss.Index:
+    """Create an empty, id-keyed, inner-product FAISS index of the configured type.
+    
+    Vectors must be normalized before adding so scores are cosine similarities,
+    and are added with ``add_with_ids`` using ``professor_id_to_int`` ids.
+    IVF indexes store ids natively (with a hashtable direct map for removal and
+    reconstruction); flat and HNSW indexes are wrapped in ``IndexIDMap2``.
+    Falls back to a flat index when there are too few vectors to train the
+    requested index type.
+    """
+    index_type = index_type or settings.FAISS_INDEX_TYPE
+    dimension = dimension or settings.EMBEDDING_DIMENSION
+    
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown FAISS index type: {index_type}")
+    
+    nlist = min(settings.FAISS_NLIST, num_vectors // MIN_POINTS_PER_CENTROID)
+    
+    if index_type == "hnsw":
+        hnsw_index = faiss.index_factory(
+            dimension, f"HNSW{settings.FAISS_HNSW_M}", faiss.METRIC_INNER_PRODUCT
+        )
+        faiss.downcast_index(hnsw_index).hnsw.efConstruction = settings.FAISS_HNSW_EF_CONSTRUCTION
+        index = faiss.IndexIDMap2(hnsw_index)
+    elif index_type == "ivf_flat" and nlist >= 1:
+        index = faiss.index_factory(dimension, f"IVF{nlist},Flat", faiss.METRIC_INNER_PRODUCT)
+        index.set_direct_map_type(faiss.DirectMap.Hashtable)
+    elif index_type == "ivf_pq" and nlist >= 1 and num_vectors >= 2 ** settings.FAISS_PQ_NBITS * MIN_POINTS_PER_CENTROID:
+        index = faiss.index_factory(
+            dimension,
+            f"IVF{nlist},PQ{settings.FAISS_PQ_M}x{settings.FAISS_PQ_NBITS}",
+            faiss.METRIC_INNER_PRODUCT
+        )
+        index.set_direct_map_type(faiss.DirectMap.Hashtable)
+    else:
+        if index_type != "flat":
+            logger.warning(f"Not enough vectors ({num_vectors}) to train {index_type} index, using flat")
+        index = faiss.IndexIDMap2(faiss.IndexFlatIP(dimension))
+    
+    configure_search(index)
+    return index
+
+def base_index(index: faiss.Index) -> faiss.Index:
+    """The index doing the actual search, below any IndexIDMap2 wrapper"""
+    if isinstance(index, faiss.IndexIDMap):
+        return faiss.downcast_index(index.index)
+    return faiss.downcast_index(index)
+
+def is_id_keyed(index: faiss.Index) -> bool:
+    """Whether the index is keyed by professor ids rather than insert position"""
+    if isinstance(index, faiss.IndexIDMap):
+        return True
+    # Older IVF indexes were added to positionally and have no hashtable direct map
+    index = base_index(index)
+    return isinstance(index, faiss.IndexIVF) and index.direct_map.type == faiss.DirectMap.Hashtable
+
+def supports_remove(index: faiss.Index) -> bool:
+    """HNSW graphs cannot delete vectors, replaced and deleted ones are tombstoned instead"""
+    return not hasattr(base_index(index), "hnsw")
+
+def tombstone_positions(index: faiss.IndexIDMap, positions: np.ndarray):
+    """Blank the ids stored at these positions, so searches skip the vectors there until a compaction"""
+    id_map = faiss.rev_swig_ptr(index.id_map.data(), index.id_map.size())
+    id_map[positions] = -1
+
+def live_filter(id_map: Optional[np.ndarray]) -> Optional[Tuple[faiss.IDSelector, np.ndarray]]:
+    """Selector over the untombstoned positions plus the buffer it points into, None when all are live"""
+    if id_map is None or (id_map >= 0).all():
+        return None
+    buffer = np.packbits(id_map >= 0, bitorder="little")
+    return faiss.IDSelectorBitmap(len(id_map), faiss.swig_ptr(buffer)), buffer
+
+def index_ids(index: faiss.Index) -> np.ndarray:
+    """All ids stored in an id-keyed index, in storage order"""
+    if isinstance(index, faiss.IndexIDMap):
+        return faiss.vector_to_array(index.id_map)
+    
+    invlists = base_index(index).invlists
+    ids = [
+        faiss.rev_swig_ptr(invlists.get_ids(list_no), invlists.list_size(list_no)).copy()
+        for list_no in range(invlists.nlist)
+        if invlists.list_size(list_no) > 0
+    ]
+    return np.concatenate(ids) if ids else np.zeros(0, dtype=np.int64)
+
+def live_vectors(index: faiss.Index) -> Tuple[np.ndarray, np.ndarray]:
+    """Current (ids, vectors) of an id-keyed index, without tombstoned or stale duplicates"""
+    ids = index_ids(index)
+    if len(ids) == 0:
+        return ids, np.zeros((0, index.d), dtype=np.float32)
+    
+    if isinstance(index, faiss.IndexIDMap):
+        # Tombstones have id -1; an id appearing twice was re-added without removal
+        # (by older versions), the last copy wins
+        live = np.nonzero(ids >= 0)[0][::-1]
+        unique_ids, first_in_reversed = np.unique(ids[live], return_index=True)
+        positions = live[first_in_reversed]
+        vectors = base_index(index).reconstruct_n(0, index.ntotal)[positions]
+        return unique_ids, vectors
+    
+    return ids, index.reconstruct_batch(ids)
+
+def train_and_add(index: faiss.Index, embeddings_array: np.ndarray, ids: np.ndarray):
+    """Train the index if needed (on a random sample) and add normalized vectors"""
+    if not index.is_trained:
+        # Full k-means over millions of vectors is slow, a sample is enough
+        sample_size = min(len(embeddings_array), settings.FAISS_TRAIN_SAMPLE_SIZE)
+        sample = np.random.default_rng(0).choice(
+            len(embeddings_array), sample_size, replace=False
+        )
+        index.train(embeddings_array[sample])
+    index.add_with_ids(embeddings_array, ids)
+
+def _index_type(index: faiss.Index) -> str:
+    """Configured index type name of an existing index"""
+    index = base_index(index)
+    if hasattr(index, "hnsw"):
+        return "hnsw"
+    if isinstance(index, faiss.IndexIVFPQ):
+        return "ivf_pq"
+    if isinstance(index, faiss.IndexIVF):
+        return "ivf_flat"
+    return "flat"
+
+def _build_index(
+    ids: np.ndarray,
+    embeddings_array: np.ndarray,
+    index_type: str,
+    dimension: int
+) -> faiss.Index:
+    index = create_index(len(ids), index_type, dimension)
+    if len(ids):
+        train_and_add(index, np.ascontiguousarray(embeddings_array, dtype=np.float32), ids)
+    return index
+
+def migrate_legacy_index(index: faiss.Index, professor_mapping: Dict[str, str]) -> faiss.Index:
+    """Convert a positional and/or L2 index into an id-keyed inner-product index.
+    
+    ``professor_mapping`` maps insert positions to professor ids. Stale
+    duplicates left by earlier syncs are dropped, keeping the latest position.
+    PQ indexes only store approximate vectors, so their rebuild is lossy.
+    """
+    if is_id_keyed(index):
+        ids, embeddings_array = live_vectors(index)
+    else:
+        try:
+            faiss.extract_index_ivf(index).make_direct_map()
+        except RuntimeError:
+            pass
+        
+        latest_positions = {}
+        for position, professor_id in professor_mapping.items():
+            if int(position) < index.ntotal:
+                latest_positions[professor_id] = max(int(position), latest_positions.get(professor_id, -1))
+        
+        positions = np.array(sorted(latest_positions.values()), dtype=np.int64)
+        ids = np.array(
+            [professor_id_to_int(professor_mapping[str(p)]) for p in positions], dtype=np.int64
+        )
+        embeddings_array = np.zeros((0, index.d), dtype=np.float32)
+        if len(positions):
+            embeddings_array = index.reconstruct_n(0, index.ntotal)[positions]
+    
+    embeddings_array = np.ascontiguousarray(embeddings_array, dtype=np.float32)
+    faiss.normalize_L2(embeddings_array)
+    return _build_index(ids, embeddings_array, _index_type(index), index.d)
+
+def configure_search(
+    index: faiss.Index,
+    nprobe: Optional[int] = None,
+    ef_search: Optional[int] = None
+):
+    """Set the default query-time accuracy/speed knobs on an index"""
+    params = search_parameters(index, nprobe, ef_search)
+    if isinstance(params, faiss.SearchParametersIVF):
+        base_index(index).nprobe = params.nprobe
+    elif isinstance(params, faiss.SearchParametersHNSW):
+        base_index(index).hnsw.efSearch = params.efSearch
+
+def search_parameters(
+    index: faiss.Index,
+    nprobe: Optional[int] = None,
+    ef_search: Optional[int] = None
+) -> Optional[faiss.SearchParameters]:
+    """Per-query search parameters for IVF (nprobe) and HNSW (efSearch) indexes"""
+    index = base_index(index)
+    if isinstance(index, faiss.IndexIVF):
+        return faiss.SearchParametersIVF(nprobe=nprobe or settings.FAISS_NPROBE)
+    
+    if hasattr(index, "hnsw"):
+        return faiss.SearchParametersHNSW(efSearch=ef_search or settings.FAISS_HNSW_EF_SEARCH)
+    
+    return None
+
+def search_index(
+    index: faiss.Index,
+    query_array: np.ndarray,
+    k: int,
+    params: Optional[faiss.SearchParameters] = None,
+    id_map: Optional[np.ndarray] = None,
+    live: Optional[Tuple[faiss.IDSelector, np.ndarray]] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Search returning professor int ids, with optional search parameters.
+    
+    IndexIDMap2 rejects search parameters, so parameterised searches go to
+    the wrapped index and positions are translated with ``id_map``. ``live``
+    (see ``live_filter``) keeps tombstoned vectors out of the results.
+    """
+    if live is not None:
+        if params is None:
+            params = search_parameters(index) or faiss.SearchParameters()
+        params.sel = live[0]
+    
+    if params is None or not isinstance(index, faiss.IndexIDMap):
+        return index.search(query_array, k, params=params)
+    
+    if id_map is None:
+        id_map = index_ids(index)
+    distances, positions = base_index(index).search(query_array, k, params=params)
+    labels = np.where(positions >= 0, id_map[np.maximum(positions, 0)], -1)
+    return distances, labels
+
+def _id_selector(
+    index: faiss.Index,
+    allowed_ids: np.ndarray,
+    id_map: Optional[np.ndarray] = None
+) -> Tuple[faiss.IDSelector, np.ndarray]:
+    """Selector over the allowed ids, plus the buffer it points into.
+    
+    Searches under IndexIDMap2 run on the wrapped index, which sees
+    positions, so those get a position bitmap. The buffer must be kept
+    alive for as long as the selector is used.
+    """
+    if isinstance(index, faiss.IndexIDMap):
+        if id_map is None:
+            id_map = index_ids(index)
+        buffer = np.packbits(np.isin(id_map, allowed_ids), bitorder="little")
+        return faiss.IDSelectorBitmap(len(id_map), faiss.swig_ptr(buffer)), buffer
+    
+    buffer = np.ascontiguousarray(allowed_ids, dtype=np.int64)
+    return faiss.IDSelectorBatch(len(buffer), faiss.swig_ptr(buffer)), buffer
+
+def exact_search(
+    index: faiss.Index,
+    query_array: np.ndarray,
+    k: int,
+    allowed_ids: np.ndarray,
+    id_map: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Score only the allowed ids against the query, exactly"""
+    if isinstance(index, faiss.IndexIDMap):
+        if id_map is None:
+            id_map = index_ids(index)
+        positions = np.nonzero(np.isin(id_map, allowed_ids))[0][::-1]
+        # Re-added vectors awaiting compaction appear twice; the last copy wins
+        labels, first_in_reversed = np.unique(id_map[positions], return_index=True)
+        positions = positions[first_in_reversed]
+        vectors = base_index(index).reconstruct_batch(positions) if len(positions) else None
+    else:
+        labels = np.ascontiguousarray(allowed_ids, dtype=np.int64)
+        try:
+            vectors = index.reconstruct_batch(labels)
+        except RuntimeError:
+            # Some allowed ids are not in the index
+            labels = labels[np.isin(labels, index_ids(index))]
+            vectors = index.reconstruct_batch(labels) if len(labels) else None
+    
+    k = min(k, len(labels))
+    if k == 0:
+        return np.zeros((1, 0), dtype=np.float32), np.zeros((1, 0), dtype=np.int64)
+    
+    scores = vectors @ query_array[0]
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top], kind="stable")]
+    return scores[top].reshape(1, -1), labels[top].reshape(1, -1)
+
+def filtered_search(
+    index: faiss.Index,
+    query_array: np.ndarray,
+    k: int,
+    allowed_ids: np.ndarray,
+    nprobe: Optional[int] = None,
+    ef_search: Optional[int] = None,
+    id_map: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Search restricted to ``allowed_ids``, finding k results whenever k are allowed.
+    
+    Small allowed sets are scored exactly. Larger ones are searched with an
+    id selector; IVF and HNSW can run out of candidates under a selective
+    filter, so nprobe/efSearch are widened 4x up to FAISS_FILTER_MAX_WIDENINGS
+    times before falling back to an exact search.
+    """
+    k = min(k, len(allowed_ids))
+    if k == 0:
+        return np.zeros((1, 0), dtype=np.float32), np.zeros((1, 0), dtype=np.int64)
+    
+    if len(allowed_ids) <= settings.FAISS_FILTER_EXACT_MAX:
+        return exact_search(index, query_array, k, allowed_ids, id_map)
+    
+    if isinstance(index, faiss.IndexIDMap) and id_map is None:
+        id_map = index_ids(index)
+    selector, _buffer = _id_selector(index, allowed_ids, id_map)
+    
+    searched = base_index(index)
+    for widening in range(settings.FAISS_FILTER_MAX_WIDENINGS + 1):
+        scale = 4 ** widening
+        exhaustive = False
+        if isinstance(searched, faiss.IndexIVF):
+            probes = min((nprobe or settings.FAISS_NPROBE) * scale, searched.nlist)
+            params = faiss.SearchParametersIVF(sel=selector, nprobe=probes)
+            exhaustive = probes == searched.nlist
+        elif hasattr(searched, "hnsw"):
+            params = faiss.SearchParametersHNSW(
+                sel=selector, efSearch=max(ef_search or settings.FAISS_HNSW_EF_SEARCH, k) * scale
+            )
+        else:
+            params = faiss.SearchParameters(sel=selector)
+            exhaustive = True
+        
+        distances, labels = search_index(index, query_array, k, params, id_map)
+        if exhaustive or (labels[0] >= 0).sum() >= k:
+            return distances, labels
+    
+    logger.info(f"Filtered search found too few results after widening, searching {len(allowed_ids)} vectors exactly")
+    return exact_search(index, query_array, k, allowed_ids, id_map)
+
+def _versioned_path(path: str, version: int) -> str:
+    """professor_embeddings.index -> professor_embeddings.v<version>.index"""
+    root, ext = os.path.splitext(path)
+    return f"{root}.v{version}{ext}"
+
+def uses_embedding_store() -> bool:
+    """Whether searches scan the mmap'd embedding store instead of the FAISS index"""
+    return settings.VECTOR_SEARCH_BACKEND == "mmap"
+
+class WriterLock:
+    """Exclusive lock on publishing new index versions, shared by every process.
+    
+    A writer takes it before copying the newest version and releases it once
+    its changes are published, so two writers never publish versions built
+    from the same base and lose each other's updates. The OS drops the lock
+    if the holding process dies.
+    """
+    
     def __init__(self):
-        self.index = None
-        self.professor_mapping = {}
-        self.load_index()
+        self._file = None
     
-    def load_index(self):
-        """Load FAISS index and professor mapping"""
+    @property
+    def held(self) -> bool:
+        return self._file is not None
+    
+    def acquire(self, timeout: Optional[float] = None):
+        """Block until the lock is free, raises RuntimeError after ``timeout`` seconds"""
+        if self._file is not None:
+            return
+        timeout = timeout if timeout is not None else settings.FAISS_WRITER_LOCK_TIMEOUT_SECONDS
+        path = f"{settings.FAISS_INDEX_POINTER_PATH}.lock"
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        lock_file = open(path, "a")
+        deadline = time.time() + timeout
+        while True:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                self._file = lock_file
+                return
+            except BlockingIOError:
+                if time.time() >= deadline:
+                    lock_file.close()
+                    raise RuntimeError(f"Another writer held the FAISS index lock for over {timeout}s")
+                time.sleep(0.1)
+    
+    def release(self):
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+
+class IndexSnapshot:
+    """A published index version. Never mutated once handed to readers.
+    
+    With an embedding store, the FAISS index is only read from disk when
+    first needed (by a writer), so search-only workers never hold a copy.
+    """
+    
+    def __init__(
+        self,
+        version: int,
+        index: Optional[faiss.Index] = None,
+        attributes: Optional[ProfessorAttributes] = None,
+        embedding_store: Optional[EmbeddingStore] = None,
+        index_loader: Optional[Callable[[], faiss.Index]] = None
+    ):
+        self.version = version
+        self._index = index
+        self._index_loader = index_loader
+        self._index_lock = threading.Lock()
+        self.attributes = attributes if attributes is not None else ProfessorAttributes()
+        self.embedding_store = embedding_store
+        self._id_map = None
+        self._live_filter = None
+        self._live_filter_built = False
+    
+    @property
+    def index(self) -> faiss.Index:
+        if self._index is None:
+            with self._index_lock:
+                if self._index is None:
+                    self._index = self._index_loader()
+        return self._index
+    
+    @property
+    def ntotal(self) -> int:
+        """Number of indexed vectors, without loading a lazy index"""
+        if self._index is None and self.embedding_store is not None:
+            return len(self.embedding_store)
+        return self.index.ntotal
+    
+    @property
+    def id_map(self) -> Optional[np.ndarray]:
+        """Position -> id array of an IndexIDMap2 index, built once per snapshot"""
+        if self._id_map is None and isinstance(self.index, faiss.IndexIDMap):
+            self._id_map = index_ids(self.index)
+        return self._id_map
+    
+    @property
+    def live_filter(self) -> Optional[Tuple[faiss.IDSelector, np.ndarray]]:
+        """Selector skipping tombstoned vectors (see ``live_filter``), built once per snapshot"""
+        if not self._live_filter_built:
+            self._live_filter = live_filter(self.id_map)
+            self._live_filter_built = True
+        return self._live_filter
+
+class IndexManager:
+    """Process-wide holder of the current FAISS index.
+    
+    Readers grab the current snapshot and keep using it for the whole search,
+    so swapping in a new version never produces a torn read. New versions are
+    written to versioned files and published by atomically replacing a small
+    pointer file, which other worker processes pick up on their next access.
+    """
+    
+    def __init__(self):
+        self._snapshot: Optional[IndexSnapshot] = None
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._last_check = 0.0
+    
+    def current(self) -> IndexSnapshot:
+        """Get the current index snapshot, loading or refreshing it if needed"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = self._load(self._read_pointer())
+                    self._last_check = time.time()
+                snapshot = self._snapshot
+        elif time.time() - self._last_check >= settings.FAISS_RELOAD_INTERVAL_SECONDS:
+            self._refresh()
+            snapshot = self._snapshot
+        return snapshot
+    
+    def latest(self) -> IndexSnapshot:
+        """Current snapshot, first swapping in any version published since the last check"""
+        snapshot = self.current()
+        if self._read_pointer() != snapshot.version:
+            self._refresh(wait=True)
+            snapshot = self._snapshot
+        return snapshot
+    
+    def publish(
+        self,
+        index: faiss.Index,
+        attributes: Optional[ProfessorAttributes] = None,
+        embedding_store: Optional[EmbeddingStore] = None,
+        keep_writing: bool = False
+    ) -> IndexSnapshot:
+        """Write a new index version (with its filter attributes and embedding store) to disk and swap it in
+        
+        With ``keep_writing`` the caller goes on modifying ``index``, so the
+        snapshot reads its own copy from disk if this process searches it.
+        """
+        version = max(int(time.time() * 1000), self._read_pointer() + 1)
+        index_path = self._index_path(version)
+        attributes = attributes if attributes is not None else ProfessorAttributes()
+        
+        os.makedirs(os.path.dirname(index_path) or ".", exist_ok=True)
+        faiss.write_index(index, index_path)
+        attributes_path = self._attributes_path(version)
+        os.makedirs(os.path.dirname(attributes_path) or ".", exist_ok=True)
+        attributes.save(attributes_path)
+        if embedding_store is not None:
+            store_path = self._store_path(version)
+            embedding_store.save(store_path, settings.EMBEDDING_STORE_DTYPE)
+            # Serve from the mapped files like every other worker
+            embedding_store = EmbeddingStore.load(store_path)
+        
+        # Only flip the pointer once the index is fully written
+        pointer_path = settings.FAISS_INDEX_POINTER_PATH
+        tmp_path = f"{pointer_path}.tmp.{os.getpid()}"
+        with open(tmp_path, 'w') as f:
+            json.dump({"version": version}, f)
+        os.replace(tmp_path, pointer_path)
+        
+        if keep_writing:
+            snapshot = IndexSnapshot(
+                version, attributes=attributes, embedding_store=embedding_store,
+                index_loader=lambda: self._read_index(version)
+            )
+        else:
+            snapshot = IndexSnapshot(version, index, attributes, embedding_store)
+        with self._lock:
+            self._snapshot = snapshot
+            self._last_check = time.time()
+        
+        self._remove_old_versions(version)
+        logger.info(f"Published FAISS index version {version} with {index.ntotal} vectors")
+        return snapshot
+    
+    def migrate(self) -> bool:
+        """Persist the conversion of a legacy (positional or L2) published index"""
+        writer_lock = WriterLock()
+        writer_lock.acquire()
+        try:
+            version = self._read_pointer()
+            index_path = self._index_path(version)
+            if not os.path.exists(index_path):
+                return False
+            
+            index = faiss.read_index(index_path)
+            if index.metric_type == faiss.METRIC_INNER_PRODUCT and is_id_keyed(index):
+                return False
+            
+            # _load performs the conversion
+            snapshot = self._load(version)
+            self.publish(snapshot.index, snapshot.attributes, snapshot.embedding_store)
+            return True
+        finally:
+            writer_lock.release()
+    
+    def _refresh(self, wait: bool = False):
+        """Swap in a version published by another process, if any"""
+        # Only one thread reloads; the others keep serving the old snapshot
+        if not self._reload_lock.acquire(blocking=wait):
+            return
+        try:
+            self._last_check = time.time()
+            version = self._read_pointer()
+            if self._snapshot is not None and version == self._snapshot.version:
+                return
+            
+            snapshot = self._load(version)
+            with self._lock:
+                self._snapshot = snapshot
+        finally:
+            self._reload_lock.release()
+    
+    def _read_pointer(self) -> int:
+        """Read the currently published version (0 means unversioned files)"""
+        try:
+            with open(settings.FAISS_INDEX_POINTER_PATH, 'r') as f:
+                return int(json.load(f)["version"])
+        except FileNotFoundError:
+            return 0
+        except Exception as e:
+            logger.error(f"Error reading FAISS index pointer: {e}")
+            return 0
+    
+    def _index_path(self, version: int) -> str:
+        if version:
+            return _versioned_path(settings.FAISS_INDEX_PATH, version)
+        return settings.FAISS_INDEX_PATH
+    
+    def _attributes_path(self, version: int) -> str:
+        if version:
+            return _versioned_path(settings.FAISS_ATTRIBUTES_PATH, version)
+        return settings.FAISS_ATTRIBUTES_PATH
+    
+    def _store_path(self, version: int) -> str:
+        if version:
+            return _versioned_path(settings.EMBEDDING_STORE_PATH, version)
+        return settings.EMBEDDING_STORE_PATH
+    
+    def _legacy_mapping_path(self, version: int) -> str:
+        if version:
+            return _versioned_path(settings.FAISS_MAPPING_PATH, version)
+        return settings.FAISS_MAPPING_PATH
+    
+    def _load(self, version: int) -> IndexSnapshot:
+        """Load the FAISS index (or embedding store) and attributes for a version"""
         try:
-            if os.path.exists(settings.FAISS_INDEX_PATH):
-                self.index = faiss.read_index(settings.FAISS_INDEX_PATH)
-                logger.info(f"Loaded FAISS index with {self.index.ntotal} vectors")
+            attributes = None
+            attributes_path = self._attributes_path(version)
+            if os.path.exists(attributes_path):
+                attributes = ProfessorAttributes.load(attributes_path)
             else:
+                logger.warning("No professor attributes for this FAISS index, filters are applied after search")
+            
+            store_path = self._store_path(version)
+            if uses_embedding_store() and os.path.exists(store_path):
+                embedding_store = EmbeddingStore.load(store_path)
+                logger.info(f"Mapped embedding store version {version} with {len(embedding_store)} vectors")
+                return IndexSnapshot(
+                    version, attributes=attributes, embedding_store=embedding_store,
+                    index_loader=lambda: self._read_index(version)
+                )
+            
+            return IndexSnapshot(version, self._read_index(version), attributes)
+        
+        except Exception as e:
+            logger.error(f"Error loading FAISS index: {e}")
+            return IndexSnapshot(version, create_index(0))
+    
+    def _read_index(self, version: int) -> faiss.Index:
+        """Read the FAISS index of a version, converting legacy formats"""
+        index_path = self._index_path(version)
+        
+        try:
+            if not os.path.exists(index_path):
                 logger.warning("FAISS index file not found, creating new index")
-                self.index = faiss.IndexFlatL2(settings.EMBEDDING_DIMENSION)
+                return create_index(0)
             
-            if os.path.exists(settings.FAISS_MAPPING_PATH):
-                with open(settings.FAISS_MAPPING_PATH, 'r') as f:
-                    self.professor_mapping = json.load(f)
-                logger.info(f"Loaded professor mapping with {len(self.professor_mapping)} entries")
-            else:
-                logger.warning("Professor mapping file not found")
-                
+            index = faiss.read_index(index_path)
+            
+            if index.metric_type != faiss.METRIC_INNER_PRODUCT or not is_id_keyed(index):
+                # Serve the converted index right away; scripts/migrate_faiss_index.py
+                # persists the conversion so workers stop redoing it
+                logger.warning("Legacy FAISS index format, converting in memory")
+                professor_mapping = {}
+                mapping_path = self._legacy_mapping_path(version)
+                if os.path.exists(mapping_path):
+                    with open(mapping_path, 'r') as f:
+                        professor_mapping = json.load(f)
+                index = migrate_legacy_index(index, professor_mapping)
+            
+            configure_search(index)
+            
+            logger.info(f"Loaded FAISS index version {version} with {index.ntotal} vectors")
+            return index
+        
         except Exception as e:
             logger.error(f"Error loading FAISS index: {e}")
-            self.index = faiss.IndexFlatL2(settings.EMBEDDING_DIMENSION)
-            self.professor_mapping = {}
+            return create_index(0)
+    
+    def _remove_old_versions(self, current_version: int):
+        """Delete versioned files beyond the configured retention"""
+        directory = os.path.dirname(settings.FAISS_INDEX_PATH) or "."
+        root = os.path.basename(os.path.splitext(settings.FAISS_INDEX_PATH)[0])
+        
+        versions = []
+        for filename in os.listdir(directory):
+            parts = filename.split(".")
+            if len(parts) == 3 and parts[0] == root and parts[1].startswith("v"):
+                try:
+                    versions.append(int(parts[1][1:]))
+                except ValueError:
+                    continue
+        
+        # Keep the newest versions (including the current one) for rollback
+        stale = sorted(v for v in versions if v != current_version)
+        keep = max(settings.FAISS_KEEP_VERSIONS - 1, 0)
+        for version in stale[:max(len(stale) - keep, 0)]:
+            paths = (
+                self._index_path(version),
+                self._attributes_path(version),
+                self._legacy_mapping_path(version),
+            )
+            for path in paths:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            shutil.rmtree(self._store_path(version), ignore_errors=True)
+
+index_manager = IndexManager()
+
+def _synchronized(method):
+    """Run a VectorDatabase method under the instance lock"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+class VectorDatabase:
+    """Per-service view of the shared index.
+    
+    Searches always go to the current shared snapshot. Writes are made on a
+    private copy which becomes visible to everyone when ``save_index`` publishes it.
+    Vectors are keyed by professor id, so adding an existing professor replaces
+    its vector instead of appending a duplicate. Filter attributes passed with
+    the embeddings are published together with the index, and so is the
+    embedding store when VECTOR_SEARCH_BACKEND is mmap. A writer holds the
+    ``WriterLock`` from its first write until it publishes, so only one
+    writer at a time works on the newest version. The private copy outlives
+    a publish, and is only copied again if another writer published since.
+    An instance may be shared
+    by threads (concurrent syncs write pages from executor threads); its
+    methods hold an instance lock.
+    """
+    
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._writer_lock = WriterLock()
+        self.load_index()
+    
+    @_synchronized
+    def load_index(self):
+        """Point at the current shared FAISS index, dropping unpublished writes"""
+        self._writer_lock.release()
+        snapshot = index_manager.current()
+        # Readers search the current snapshot; writers work on a private copy
+        self.index = None
+        self.attributes = snapshot.attributes
+        self.embedding_store = snapshot.embedding_store
+        self._writable = False
+        # Published version the private copy was last in sync with
+        self._base_version: Optional[int] = None
+        # Id -> position of the live vectors of an HNSW copy, built on its first write
+        self._positions: Optional[Dict[int, int]] = None
+        # Attribute and store changes are batched, each applied change copies the arrays
+        self._pending_attributes: Dict[int, Optional[Dict[str, Any]]] = {}
+        self._pending_vectors: Dict[int, Optional[np.ndarray]] = {}
+    
+    @property
+    def version(self) -> int:
+        """Published index version that searches currently run against"""
+        return index_manager.current().version
     
-    def add_embedding(self, professor_id: str, embedding: List[float]):
-        """Add a professor embedding to the index"""
-        if not self.index:
+    def _ensure_writable(self):
+        """Take the writer lock and copy the newest version before the first write, so readers are unaffected"""
+        if self._writer_lock.held:
+            return
+        self._writer_lock.acquire()
+        # Another process may have published since this one last checked
+        snapshot = index_manager.latest()
+        if self._writable and snapshot.version == self._base_version:
+            # Still the newest version, keep writing to the copy that was published
+            return
+        self.index = faiss.clone_index(snapshot.index)
+        self.attributes = snapshot.attributes
+        self.embedding_store = snapshot.embedding_store
+        self._base_version = snapshot.version
+        self._positions = None
+        self._writable = True
+    
+    def add_embedding(
+        self,
+        professor_id: str,
+        embedding: List[float],
+        attributes: Optional[Dict[str, Any]] = None
+    ):
+        """Add or replace a professor embedding in the index"""
+        self.upsert_embeddings(
+            [(professor_id, embedding)],
+            {professor_id: attributes} if attributes is not None else None
+        )
+    
+    @_synchronized
+    def upsert_embeddings(
+        self,
+        professor_embeddings: Iterable[Tuple[str, List[float]]],
+        attributes: Optional[Dict[str, Dict[str, Any]]] = None
+    ):
+        """Add or replace professor embeddings in the index
+        
+        ``attributes`` maps professor ids to dicts with institution_id,
+        works_count, cited_by_count and concepts, used by filtered searches.
+        """
+        # Last write wins for professors repeated within the batch
+        latest = dict(professor_embeddings)
+        if not latest:
             return
         
-        embedding_array = np.array([embedding], dtype=np.float32)
-        self.index.add(embedding_array)
+        self._ensure_writable()
+        ids = np.array([professor_id_to_int(p) for p in latest], dtype=np.int64)
+        embeddings_array = normalize_embeddings(list(latest.values()))
+        self._remove(ids)
+        start = self.index.ntotal
+        self.index.add_with_ids(embeddings_array, ids)
+        if self._positions is not None:
+            self._positions.update(zip(ids.tolist(), range(start, start + len(ids))))
         
-        # Map the index position to professor ID
-        index_position = self.index.ntotal - 1
-        self.professor_mapping[str(index_position)] = professor_id
+        if uses_embedding_store():
+            for faiss_id, vector in zip(ids.tolist(), embeddings_array):
+                self._pending_vectors[faiss_id] = vector
+        
+        for professor_id, professor_attributes in (attributes or {}).items():
+            if professor_id in latest:
+                self._pending_attributes[professor_id_to_int(professor_id)] = professor_attributes
+    
+    @_synchronized
+    def update_attributes(self, attributes: Dict[str, Dict[str, Any]]):
+        """Replace the filter attributes of indexed professors, keeping their vectors"""
+        if not attributes:
+            return
+        
+        self._ensure_writable()
+        for professor_id, professor_attributes in attributes.items():
+            self._pending_attributes[professor_id_to_int(professor_id)] = professor_attributes
+    
+    @_synchronized
+    def delete_embeddings(self, professor_ids: Iterable[str]):
+        """Remove professors from the index"""
+        ids = np.array([professor_id_to_int(p) for p in professor_ids], dtype=np.int64)
+        if len(ids) == 0:
+            return
+        
+        self._ensure_writable()
+        for faiss_id in ids.tolist():
+            self._pending_attributes[faiss_id] = None
+            self._pending_vectors[faiss_id] = None
+        
+        self._remove(ids)
+    
+    def _remove(self, ids: np.ndarray):
+        if supports_remove(self.index):
+            self.index.remove_ids(ids)
+            return
+        
+        # HNSW keeps the old vectors in the graph, searches skip them until a compaction
+        positions = self._live_positions()
+        stale = [positions.pop(faiss_id) for faiss_id in ids.tolist() if faiss_id in positions]
+        if stale:
+            tombstone_positions(self.index, np.array(stale, dtype=np.int64))
     
+    def _live_positions(self) -> Dict[int, int]:
+        """Id -> position of every live vector in an HNSW copy"""
+        if self._positions is None:
+            ids = index_ids(self.index)
+            self._positions = {faiss_id: position for position, faiss_id in enumerate(ids.tolist()) if faiss_id >= 0}
+            # Duplicates left by older versions become tombstones too
+            live = np.zeros(len(ids), dtype=bool)
+            live[list(self._positions.values())] = True
+            if not live[ids >= 0].all():
+                tombstone_positions(self.index, np.nonzero((ids >= 0) & ~live)[0])
+        return self._positions
+    
+    def _needs_compaction(self) -> bool:
+        """Whether tombstones have grown past FAISS_COMPACTION_STALE_FRACTION of an HNSW copy"""
+        if self._positions is None or self.index.ntotal == 0:
+            return False
+        stale = self.index.ntotal - len(self._positions)
+        return stale > settings.FAISS_COMPACTION_STALE_FRACTION * self.index.ntotal
+    
+    def _apply_pending_attributes(self):
+        """Fold batched attribute upserts and deletes into a new attribute store"""
+        if not self._pending_attributes:
+            return
+        
+        deleted = [faiss_id for faiss_id, row in self._pending_attributes.items() if row is None]
+        upserted = [(faiss_id, row) for faiss_id, row in self._pending_attributes.items() if row is not None]
+        
+        attributes = self.attributes.delete(np.array(deleted, dtype=np.int64))
+        self.attributes = attributes.upsert(
+            np.array([faiss_id for faiss_id, _ in upserted], dtype=np.int64),
+            [row for _, row in upserted]
+        )
+        self._pending_attributes = {}
+    
+    def _apply_pending_vectors(self):
+        """Fold batched vector upserts and deletes into a new embedding store"""
+        if not uses_embedding_store():
+            return
+        
+        if self.embedding_store is None:
+            # First store for this index; the index already holds the pending writes
+            if isinstance(base_index(self.index), faiss.IndexIVFPQ):
+                logger.warning("Embedding store built from PQ-compressed vectors, rebuild the index for exact re-scoring")
+            ids, embeddings_array = live_vectors(self.index)
+            self.embedding_store = EmbeddingStore.from_vectors(ids, normalize_embeddings(embeddings_array))
+            self._pending_vectors = {}
+            return
+        
+        if not self._pending_vectors:
+            return
+        
+        deleted = [faiss_id for faiss_id, vector in self._pending_vectors.items() if vector is None]
+        upserted = [(faiss_id, vector) for faiss_id, vector in self._pending_vectors.items() if vector is not None]
+        
+        store = self.embedding_store.delete(np.array(deleted, dtype=np.int64))
+        if upserted:
+            store = store.upsert(
+                np.array([faiss_id for faiss_id, _ in upserted], dtype=np.int64),
+                np.stack([vector for _, vector in upserted])
+            )
+        self.embedding_store = store
+        self._pending_vectors = {}
+    
+    @_synchronized
+    def filter_ids(
+        self,
+        institution_ids: Optional[Set[str]] = None,
+        min_works_count: Optional[int] = None,
+        min_citations: Optional[int] = None,
+        concepts: Optional[List[str]] = None
+    ) -> Optional[np.ndarray]:
+        """FAISS ids of professors passing the filters, for ``search_similar(allowed_ids=...)``
+        
+        Returns None when the index has no attribute store (built before
+        filtered search existed); callers then filter after searching.
+        """
+        if self._writer_lock.held:
+            self._apply_pending_attributes()
+            ntotal, attributes = self.index.ntotal, self.attributes
+        else:
+            snapshot = index_manager.current()
+            ntotal, attributes = snapshot.ntotal, snapshot.attributes
+        
+        if len(attributes) == 0 and ntotal > 0:
+            return None
+        
+        return attributes.select_ids(
+            institution_ids=institution_ids,
+            min_works_count=min_works_count,
+            min_citations=min_citations,
+            concepts=concepts
+        )
+    
+    @_synchronized
+    def compact(self):
+        """Rebuild the index without tombstoned or stale vectors"""
+        self._ensure_writable()
+        ids, embeddings_array = live_vectors(self.index)
+        self.index = _build_index(ids, embeddings_array, _index_type(self.index), self.index.d)
+        self._positions = None
+        logger.info(f"Compacted FAISS index to {self.index.ntotal} vectors")
+    
+    @_synchronized
     def search_similar(
-        self, 
-        query_embedding: List[float], 
-        top_k: int = 50
+        self,
+        query_embedding: List[float],
+        top_k: int = 50,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        min_score: Optional[float] = None,
+        allowed_ids: Optional[np.ndarray] = None
     ) -> List[Tuple[str, float]]:
-        """Search for similar professors"""
-        if not self.index or self.index.ntotal == 0:
+        """Search for similar professors, scored by cosine similarity
+        
+        ``nprobe`` (IVF) and ``ef_search`` (HNSW) override the configured
+        recall/latency trade-off for this query only. Results scoring below
+        ``min_score`` are dropped. With ``allowed_ids`` (see ``filter_ids``)
+        only those professors are searched.
+        
+        Readers with an embedding store (mmap backend) scan it instead of the
+        index and re-score the best candidates in float32.
+        """
+        params = None
+        id_map = None
+        live = None
+        store = None
+        if self._writer_lock.held:
+            index = self.index
+            if isinstance(index, faiss.IndexIDMap):
+                id_map = index_ids(index)
+                live = live_filter(id_map)
+        else:
+            snapshot = index_manager.current()
+            if uses_embedding_store() and snapshot.embedding_store is not None:
+                store = snapshot.embedding_store
+                index = None
+            else:
+                index = snapshot.index
+                live = snapshot.live_filter
+                if nprobe or ef_search or allowed_ids is not None or live is not None:
+                    id_map = snapshot.id_map
+        
+        if store is None and (not index or index.ntotal == 0):
             return []
         
-        query_array = np.array([query_embedding], dtype=np.float32)
-        distances, indices = self.index.search(query_array, min(top_k, self.index.ntotal))
+        query_array = normalize_embeddings([query_embedding])
+        if store is not None:
+            distances, labels = store.search(
+                query_array[0], top_k, allowed_ids, settings.EMBEDDING_STORE_RESCORE_FACTOR
+            )
+            distances, labels = distances.reshape(1, -1), labels.reshape(1, -1)
+        elif allowed_ids is not None:
+            distances, labels = filtered_search(
+                index, query_array, top_k, allowed_ids, nprobe, ef_search, id_map
+            )
+        else:
+            if nprobe or ef_search:
+                params = search_parameters(index, nprobe, ef_search)
+            distances, labels = search_index(
+                index, query_array, min(top_k, index.ntotal), params, id_map, live
+            )
         
         results = []
-        for i, (distance, idx) in enumerate(zip(distances[0], indices[0])):
-            if idx == -1:  # FAISS returns -1 for invalid indices
+        for score, label in zip(distances[0], labels[0]):
+            if label == -1:  # FAISS returns -1 for invalid indices
                 continue
             
-            professor_id = self.professor_mapping.get(str(idx))
-            if professor_id:
-                # Convert L2 distance to similarity score (0-1)
-                similarity_score = 1.0 / (1.0 + distance)
-                results.append((professor_id, similarity_score))
+            # Results are sorted by score, nothing further can pass
+            if min_score is not None and score < min_score:
+                break
+            
+            results.append((int_to_professor_id(int(label)), float(score)))
         
         return results
     
-    def save_index(self):
-        """Save FAISS index and mapping to disk"""
+    @_synchronized
+    def save_index(self) -> bool:
+        """Publish the FAISS index as a new version, returns False if publishing failed"""
+        # The lock is held from the first write until the publish
+        if not self._writer_lock.held:
+            return True
+        
         try:
-            # Create directories if they don't exist
-            os.makedirs(os.path.dirname(settings.FAISS_INDEX_PATH), exist_ok=True)
-            os.makedirs(os.path.dirname(settings.FAISS_MAPPING_PATH), exist_ok=True)
-            
-            # Save FAISS index
-            faiss.write_index(self.index, settings.FAISS_INDEX_PATH)
-            
-            # Save professor mapping
-            with open(settings.FAISS_MAPPING_PATH, 'w') as f:
-                json.dump(self.professor_mapping, f)
-            
-            logger.info("Successfully saved FAISS index and mapping")
-            
+            if self._needs_compaction():
+                self.compact()
+            self._apply_pending_attributes()
+            self._apply_pending_vectors()
+            snapshot = index_manager.publish(
+                self.index,
+                self.attributes,
+                self.embedding_store if uses_embedding_store() else None,
+                keep_writing=True
+            )
+            # Readers get the file written from the copy, later writes go on modifying it
+            self._base_version = snapshot.version
+            self.embedding_store = snapshot.embedding_store
+            self._writer_lock.release()
+            return True
+        
         except Exception as e:
             logger.error(f"Error saving FAISS index: {e}")
+            return False
     
-    def rebuild_index(self, professor_embeddings: List[Tuple[str, List[float]]]):
-        """Rebuild the entire index from scratch"""
-        self.index = faiss.IndexFlatL2(settings.EMBEDDING_DIMENSION)
-        self.professor_mapping = {}
+    @_synchronized
+    def rebuild_index(
+        self,
+        professor_embeddings: List[Tuple[str, List[float]]],
+        index_type: Optional[str] = None,
+        attributes: Optional[Dict[str, Dict[str, Any]]] = None
+    ):
+        """Rebuild the entire index (and attribute store) from scratch"""
+        latest = dict(professor_embeddings)
+        # Replaces every version, but still waits for a writer in progress
+        self._writer_lock.acquire()
+        self.index = create_index(len(latest), index_type)
+        self.attributes = ProfessorAttributes()
+        self._writable = True
+        self._positions = None
+        self._pending_attributes = {}
+        self._pending_vectors = {}
+        # The store is a second full copy of the vectors, only built when it is searched
+        self.embedding_store = EmbeddingStore(dimension=self.index.d) if uses_embedding_store() else None
         
-        embeddings = []
-        for i, (professor_id, embedding) in enumerate(professor_embeddings):
-            embeddings.append(embedding)
-            self.professor_mapping[str(i)] = professor_id
-        
-        if embeddings:
-            embeddings_array = np.array(embeddings, dtype=np.float32)
-            self.index.add(embeddings_array)
+        if latest:
+            ids = np.array([professor_id_to_int(p) for p in latest], dtype=np.int64)
+            embeddings_array = normalize_embeddings(list(latest.values()))
+            train_and_add(self.index, embeddings_array, ids)
+            if uses_embedding_store():
+                self.embedding_store = EmbeddingStore.from_vectors(ids, embeddings_array)
+            
+            attribute_ids = [p for p in latest if attributes and p in attributes]
+            self.attributes = self.attributes.upsert(
+                np.array([professor_id_to_int(p) for p in attribute_ids], dtype=np.int64),
+                [attributes[p] for p in attribute_ids]
+            )
         
         self.save_index()
-        logger.info(f"Rebuilt FAISS index with {len(embeddings)} professors")
\ No newline at end of file
+        logger.info(f"Rebuilt FAISS index with {len(latest)} professors")
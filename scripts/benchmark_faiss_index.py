@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Compare approximate FAISS index types against the exact flat index
+
+Reports recall@k and mean query latency for each index type and a range of
+nprobe / efSearch values, so FAISS_INDEX_TYPE and its search settings can be
+picked for the current corpus size.
+"""
+import argparse
+import time
+import numpy as np
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine
+
+from app.core.config import settings
+from app.crud.professor import professor as crud_professor
+from app.utils.vector_db import (
+    create_index, index_ids, normalize_embeddings, search_index, search_parameters, train_and_add
+)
+
+NPROBE_VALUES = [1, 4, 16, 64, 256]
+EF_SEARCH_VALUES = [16, 32, 64, 128, 256]
+
+def load_embeddings() -> np.ndarray:
+    """Load all professor embeddings from the database"""
+    engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    
+    db = SessionLocal()
+    try:
+        professors = db.query(crud_professor.model).filter(
+            crud_professor.model.embedding.isnot(None)
+        ).all()
+        
+        return normalize_embeddings([prof.embedding for prof in professors])
+    finally:
+        db.close()
+
+def build_index(index_type: str, embeddings: np.ndarray):
+    """Build and train an index of the given type"""
+    index = create_index(len(embeddings), index_type)
+    
+    start_time = time.time()
+    train_and_add(index, embeddings, np.arange(len(embeddings), dtype=np.int64))
+    build_time = time.time() - start_time
+    
+    return index, build_time
+
+def evaluate(index, queries: np.ndarray, ground_truth: np.ndarray, k: int, params=None):
+    """Return (recall@k, mean latency in ms) for single-query searches"""
+    found = 0
+    id_map = index_ids(index)
+    start_time = time.time()
+    for query, expected in zip(queries, ground_truth):
+        _, indices = search_index(index, query.reshape(1, -1), k, params, id_map)
+        found += len(set(indices[0]) & set(expected))
+    latency = (time.time() - start_time) * 1000 / len(queries)
+    
+    return found / ground_truth.size, latency
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--k", type=int, default=50, help="Neighbours per query")
+    parser.add_argument("--queries", type=int, default=200, help="Number of sampled queries")
+    parser.add_argument(
+        "--index-types", nargs="+", default=["ivf_flat", "ivf_pq", "hnsw"],
+        help="Index types to compare against flat"
+    )
+    args = parser.parse_args()
+    
+    embeddings = load_embeddings()
+    if len(embeddings) == 0:
+        print("No professor embeddings found")
+        return
+    print(f"Loaded {len(embeddings)} embeddings")
+    
+    # Perturbed corpus vectors stand in for real queries
+    rng = np.random.default_rng(1)
+    query_ids = rng.choice(len(embeddings), min(args.queries, len(embeddings)), replace=False)
+    queries = normalize_embeddings(
+        embeddings[query_ids] + rng.normal(0, 0.01, (len(query_ids), embeddings.shape[1]))
+    )
+    k = min(args.k, len(embeddings))
+    
+    flat_index, _ = build_index("flat", embeddings)
+    _, ground_truth = flat_index.search(queries, k)
+    _, flat_latency = evaluate(flat_index, queries, ground_truth, k)
+    
+    print(f"\n{'index':<10} {'setting':<14} {'recall@' + str(k):>10} {'latency_ms':>11} {'speedup':>8}")
+    print(f"{'flat':<10} {'-':<14} {1.0:>10.3f} {flat_latency:>11.3f} {1.0:>8.1f}")
+    
+    for index_type in args.index_types:
+        index, build_time = build_index(index_type, embeddings)
+        params = search_parameters(index)
+        
+        if params is None:
+            # Not enough vectors for this type, create_index fell back to flat
+            continue
+        
+        if index_type == "hnsw":
+            settings_to_try = [("efSearch", v, search_parameters(index, ef_search=v)) for v in EF_SEARCH_VALUES]
+        else:
+            settings_to_try = [("nprobe", v, search_parameters(index, nprobe=v)) for v in NPROBE_VALUES]
+        
+        for name, value, params in settings_to_try:
+            recall, latency = evaluate(index, queries, ground_truth, k, params)
+            print(
+                f"{index_type:<10} {name + '=' + str(value):<14} {recall:>10.3f} "
+                f"{latency:>11.3f} {flat_latency / latency:>8.1f}"
+            )
+        print(f"{index_type:<10} build time {build_time:.1f}s")
+
+if __name__ == "__main__":
+    main()
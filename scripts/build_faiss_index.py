@@ -2,7 +2,6 @@
 """
 Build FAISS index from existing professor embeddings
 """
-import json
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import create_engine
 
@@ -26,16 +25,23 @@ def build_faiss_index():
         
         # Prepare data for FAISS
         professor_embeddings = []
+        professor_attributes = {}
         for prof in professors:
-            if prof.embedding:
-                embedding = json.loads(prof.embedding) if isinstance(prof.embedding, str) else prof.embedding
-                professor_embeddings.append((prof.openalex_id, embedding))
+            if prof.embedding is not None:
+                professor_embeddings.append((prof.openalex_id, prof.embedding))
+                # Filter attributes stored next to the index
+                professor_attributes[prof.openalex_id] = {
+                    "institution_id": prof.institution_id,
+                    "works_count": prof.works_count,
+                    "cited_by_count": prof.cited_by_count,
+                    "concepts": prof.concepts,
+                }
         
         print(f"Processing {len(professor_embeddings)} embeddings...")
         
         # Build FAISS index
         vector_db = VectorDatabase()
-        vector_db.rebuild_index(professor_embeddings)
+        vector_db.rebuild_index(professor_embeddings, attributes=professor_attributes)
         
         print("FAISS index built successfully!")
         
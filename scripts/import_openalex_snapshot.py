@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Import professors from a local OpenAlex snapshot
+
+Streams the gzipped JSON Lines files of the authors (and optionally
+institutions) snapshot, keeps authors whose last known institution matches
+--institution / --country, and runs them through the same parse, embed,
+upsert and index pipeline as the API sync. Lines are decoded and filtered in
+parallel worker processes; memory use doesn't grow with the snapshot size.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from app.core.database import SessionLocal
+from app.services.openalex_service import OpenAlexService
+from app.services.openalex_snapshot import SnapshotFilter, SnapshotImporter
+
+async def import_snapshot(args) -> dict:
+    """Import institutions, then authors, with one service and database session"""
+    db = SessionLocal()
+    try:
+        async with OpenAlexService(db) as service:
+            importer = SnapshotImporter(
+                service,
+                SnapshotFilter(args.institution, args.country),
+                processes=args.processes,
+                chunk_size=args.chunk_size,
+                page_size=args.page_size
+            )
+            
+            if args.institutions:
+                created = importer.import_institutions(args.institutions)
+                print(f"Stored {created} new institutions")
+            
+            return await importer.import_authors(args.authors)
+    finally:
+        db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("authors", help="Authors snapshot directory (data/authors) or .gz file")
+    parser.add_argument(
+        "--institutions",
+        help="Institutions snapshot directory or .gz file; institutions missing from it are fetched from the API"
+    )
+    parser.add_argument(
+        "--institution", action="append", default=[],
+        help="OpenAlex or ROR id of an institution to import (repeatable)"
+    )
+    parser.add_argument("--country", action="append", default=[], help="ISO country code (repeatable)")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="Parser processes")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="Lines per parser task")
+    parser.add_argument("--page-size", type=int, default=500, help="Authors embedded and written together")
+    args = parser.parse_args()
+    
+    if not (args.institution or args.country):
+        print("Importing every author in the snapshot (no --institution or --country given)")
+    
+    start_time = time.time()
+    result = asyncio.run(import_snapshot(args))
+    
+    print(
+        f"Imported in {time.time() - start_time:.0f}s: created {result['synced_count']}, "
+        f"updated {result['updated_count']}, failed {result['failed_count']}, "
+        f"re-embedded {result['embedded_count']}, unchanged {result['skipped_count']}"
+    )
+    sys.exit(1 if result["failed_count"] else 0)
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,7 @@ from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
 from app.core.database import Base
-from app.models import user, professor, institution
+from app.models import user, professor, institution, sync_checkpoint, corpus_stat, user_match
 
 def init_db():
     """Initialize database"""
@@ -1,42 +1,63 @@
 #!/usr/bin/env python3
 """
 Load professors from OpenAlex API for specific institutions
+
+Institutions are synced concurrently under one request budget. Progress is
+checkpointed per institution, so re-running after a failure resumes where
+each institution stopped. With --incremental only authors updated since an
+institution's last completed sync are fetched.
 """
+import argparse
 import asyncio
 import sys
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
+from typing import List
+
+from app.services.sync_runner import SyncJobRunner
 
-from app.core.config import settings
-from app.services.openalex_service import OpenAlexService
+def read_rors(path: str) -> List[str]:
+    """ROR ids from a file, one per line (blank lines and # comments ignored)"""
+    with open(path, 'r') as f:
+        lines = [line.split("#", 1)[0].strip() for line in f]
+    return [line for line in lines if line]
 
-async def load_professors(institution_ror: str):
-    """Load professors for a specific institution"""
-    engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+async def load_professors(institution_rors: List[str], restart: bool = False, incremental: bool = False):
+    """Load professors for the given institutions"""
+    results = await SyncJobRunner().run(institution_rors, restart=restart, incremental=incremental)
+    
+    failed = 0
+    for institution_ror, result in results.items():
+        if "error" in result:
+            failed += 1
+            print(f"{institution_ror}: failed ({result['error']}), re-run to resume")
+        else:
+            print(
+                f"{institution_ror}: synced {result['synced_count']}, updated {result['updated_count']}, "
+                f"re-embedded {result['embedded_count']}, unchanged {result['skipped_count']}"
+            )
     
-    db = SessionLocal()
-    try:
-        openalex_service = OpenAlexService(db)
-        result = await openalex_service.sync_professors_by_institution(institution_ror)
-        
-        print(f"Successfully loaded professors:")
-        print(f"  Synced: {result['synced_count']}")
-        print(f"  Updated: {result['updated_count']}")
-        
-    except Exception as e:
-        print(f"Error loading professors: {e}")
-    finally:
-        db.close()
+    return failed
 
 async def main():
-    if len(sys.argv) != 2:
-        print("Usage: python load_professors.py <institution_ror_id>")
-        print("Example: python load_professors.py 00f54p054")  # Stanford
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("rors", nargs="*", help="Institution ROR ids, e.g. 00f54p054 (Stanford)")
+    parser.add_argument("--file", help="File with one ROR id per line")
+    parser.add_argument("--restart", action="store_true", help="Ignore checkpoints and sync from the start")
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="Only fetch authors updated since each institution's last completed sync"
+    )
+    args = parser.parse_args()
+    
+    institution_rors = list(args.rors)
+    if args.file:
+        institution_rors += read_rors(args.file)
+    
+    if not institution_rors:
+        parser.print_usage()
         sys.exit(1)
     
-    institution_ror = sys.argv[1]
-    await load_professors(institution_ror)
+    failed = await load_professors(institution_rors, restart=args.restart, incremental=args.incremental)
+    sys.exit(1 if failed else 0)
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Convert JSON embedding columns to binary float32/float16 vectors
+
+Rewrites professors.embedding and users.resume_embedding from JSON float
+arrays to BYTEA in EMBEDDING_STORAGE_DTYPE. Rows are converted in batches
+into a new column, which then replaces the JSON one. The conversion can be
+interrupted and re-run; it continues with the rows not converted yet.
+"""
+import argparse
+import json
+import numpy as np
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+
+# (table, primary key, embedding column)
+EMBEDDING_COLUMNS = [
+    ("professors", "openalex_id", "embedding"),
+    ("users", "id", "resume_embedding"),
+]
+
+def column_type(conn, table: str, column: str):
+    return conn.execute(
+        text(
+            "SELECT data_type FROM information_schema.columns "
+            "WHERE table_name = :table AND column_name = :column"
+        ),
+        {"table": table, "column": column}
+    ).scalar()
+
+def migrate_column(engine, table: str, key: str, column: str, dtype: np.dtype, batch_size: int):
+    """Convert one embedding column, returns the number of rows converted"""
+    binary_column = f"{column}_binary"
+    
+    with engine.begin() as conn:
+        if column_type(conn, table, column) == "bytea":
+            print(f"{table}.{column} is already binary")
+            return 0
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {binary_column} BYTEA"))
+    
+    # Walk the primary key so each batch is an index range scan
+    conditions = [f"{column} IS NOT NULL", f"{column}::text <> 'null'", f"{binary_column} IS NULL"]
+    converted = 0
+    last_key = None
+    while True:
+        with engine.begin() as conn:
+            where = conditions + ([f"{key} > :last_key"] if last_key is not None else [])
+            rows = conn.execute(
+                text(
+                    f"SELECT {key}, {column}::text FROM {table} "
+                    f"WHERE {' AND '.join(where)} ORDER BY {key} LIMIT :limit"
+                ),
+                {"last_key": last_key, "limit": batch_size}
+            ).fetchall()
+            if not rows:
+                break
+            
+            updates = []
+            for row_key, value in rows:
+                embedding = json.loads(value)
+                if isinstance(embedding, str):
+                    # Values written with json.dumps into a JSON column are double encoded
+                    embedding = json.loads(embedding)
+                updates.append({
+                    "key": row_key,
+                    "value": np.asarray(embedding, dtype=dtype).tobytes()
+                })
+            
+            conn.execute(
+                text(f"UPDATE {table} SET {binary_column} = :value WHERE {key} = :key"),
+                updates
+            )
+        
+        converted += len(rows)
+        last_key = rows[-1][0]
+        print(f"{table}: converted {converted} rows")
+    
+    # Swap the columns in one transaction
+    with engine.begin() as conn:
+        conn.execute(text(f"ALTER TABLE {table} DROP COLUMN {column}"))
+        conn.execute(text(f"ALTER TABLE {table} RENAME COLUMN {binary_column} TO {column}"))
+    
+    return converted
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows converted per transaction")
+    args = parser.parse_args()
+    
+    dtype = np.dtype(settings.EMBEDDING_STORAGE_DTYPE)
+    engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+    
+    for table, key, column in EMBEDDING_COLUMNS:
+        converted = migrate_column(engine, table, key, column, dtype, args.batch_size)
+        print(f"{table}.{column}: {converted} rows stored as {dtype.name}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+Convert a legacy FAISS index (L2 distance and/or positional JSON mapping)
+into the id-keyed, normalized inner-product format
+"""
+from app.utils.vector_db import index_manager
+
+def migrate_faiss_index():
+    """Publish a converted copy of the current index if it uses a legacy format"""
+    try:
+        if index_manager.migrate():
+            print("FAISS index migrated to the id-keyed inner-product format")
+        else:
+            print("FAISS index is already up to date, nothing to do")
+    except Exception as e:
+        print(f"Error migrating FAISS index: {e}")
+
+if __name__ == "__main__":
+    migrate_faiss_index()
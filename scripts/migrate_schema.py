@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Add columns introduced after their table was first created
+
+create_all only creates missing tables; it never alters existing ones.
+Run this after upgrading an existing database. Columns that already exist
+are left alone, so it is safe to re-run.
+"""
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+
+# (table, column, PostgreSQL type)
+ADDED_COLUMNS = [
+    ("professors", "content_hash", "VARCHAR(64)"),
+    ("professors", "keywords", "JSON"),
+    ("sync_checkpoints", "updated_since", "TIMESTAMP WITH TIME ZONE"),
+    ("sync_checkpoints", "synced_through", "TIMESTAMP WITH TIME ZONE"),
+]
+
+def main():
+    engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+    
+    with engine.begin() as conn:
+        for table, column, column_type in ADDED_COLUMNS:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} {column_type}"))
+            print(f"{table}.{column}: present")
+
+if __name__ == "__main__":
+    main()
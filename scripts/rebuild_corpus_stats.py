@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Recount the corpus stats from the professors table
+
+Counts the professors containing each research summary keyword and OpenAlex
+concept, filling in the keywords of professors synced before they were
+stored, and replaces the corpus_stats table. Syncs keep the counts up to
+date afterwards; run this once after upgrading, or to correct drift, while
+no sync is running. On an existing database run migrate_schema.py first so
+professors.keywords exists.
+"""
+import argparse
+from collections import Counter
+
+from app.core.database import SessionLocal
+from app.crud.corpus_stat import corpus_stat as crud_corpus_stat
+from app.models.corpus_stat import CONCEPT, DOCUMENTS, DOCUMENTS_KEY, TERM
+from app.models.professor import Professor
+from app.utils.corpus_stats import concept_ids
+from app.utils.text_prcessing import keyword_set
+
+def rebuild_corpus_stats(batch_size: int) -> Counter:
+    """Count every professor, returns the counts written"""
+    counts: Counter = Counter()
+    db = SessionLocal()
+    try:
+        # Walk the primary key so each batch is an index range scan
+        last_id = None
+        while True:
+            query = db.query(Professor).order_by(Professor.openalex_id)
+            if last_id is not None:
+                query = query.filter(Professor.openalex_id > last_id)
+            professors = query.limit(batch_size).all()
+            if not professors:
+                break
+            
+            for prof in professors:
+                if prof.keywords is None:
+                    prof.keywords = keyword_set(prof.research_summary)
+                counts[(DOCUMENTS, DOCUMENTS_KEY)] += 1
+                counts.update((TERM, term) for term in set(prof.keywords))
+                counts.update((CONCEPT, concept_id) for concept_id in concept_ids(prof.concepts))
+            db.commit()
+            
+            last_id = professors[-1].openalex_id
+            print(f"Counted {counts[(DOCUMENTS, DOCUMENTS_KEY)]} professors")
+            db.expunge_all()
+        
+        crud_corpus_stat.replace_all(db, counts=counts)
+    finally:
+        db.close()
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=1000, help="Professors read per transaction")
+    args = parser.parse_args()
+    
+    counts = rebuild_corpus_stats(args.batch_size)
+    terms = sum(1 for kind, _ in counts if kind == TERM)
+    concepts = sum(1 for kind, _ in counts if kind == CONCEPT)
+    print(f"Stored stats for {counts[(DOCUMENTS, DOCUMENTS_KEY)]} professors: {terms} keywords, {concepts} concepts")
+
+if __name__ == "__main__":
+    main()
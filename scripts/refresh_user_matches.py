@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Refresh the stored per-user match lists served by GET /matching/me
+
+Recomputes the list of every user whose resume or interests changed, or
+whose list was computed against an older index version. Runs until stopped;
+with --once it works through the current backlog and exits.
+"""
+import argparse
+import logging
+
+from app.services.match_refresh import MatchRefreshWorker
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--once", action="store_true", help="Refresh the current backlog and exit")
+    parser.add_argument("--batch-size", type=int, help="Users refreshed per database session")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    worker = MatchRefreshWorker(batch_size=args.batch_size)
+    
+    if not args.once:
+        worker.run()
+        return
+    
+    total = 0
+    while True:
+        refreshed = worker.refresh_due()
+        total += refreshed
+        if refreshed < worker.batch_size:
+            break
+    print(f"Refreshed matches for {total} users")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import os
+import pytest
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+import app.crud.base as crud_base
+from app.crud.corpus_stat import corpus_stat as crud_corpus_stat
+from app.crud.professor import professor as crud_professor
+from app.models.corpus_stat import CorpusStat
+from app.models.institution import Institution
+from app.models.professor import Professor
+
+TABLES = [Institution.__table__, Professor.__table__, CorpusStat.__table__]
+
+def _session(url: str):
+    engine = create_engine(url)
+    Professor.metadata.create_all(bind=engine, tables=TABLES)
+    return engine, sessionmaker(bind=engine)()
+
+@pytest.fixture(params=["on_conflict", "orm"])
+def session(request, monkeypatch):
+    """SQLite session, upserting with ON CONFLICT or with the row-by-row fallback"""
+    if request.param == "orm":
+        monkeypatch.setattr(crud_base, "ON_CONFLICT_INSERTS", {})
+    _, db = _session("sqlite://")
+    yield db
+    db.close()
+
+def _row(i: int, name: str = None, **columns):
+    row = {"openalex_id": f"A{i}", "name": name or f"Author {i}", "keywords": [f"term{i}"], "concepts": []}
+    row.update(columns)
+    return row
+
+def test_upsert_many_counts_created_and_updated(session):
+    """Test that new and existing rows are counted apart and repeated rows are written once"""
+    assert crud_professor.upsert_many(session, rows=[_row(1), _row(2)]) == (2, 0)
+    
+    # The last occurrence of A2 wins
+    rows = [_row(2, "First"), _row(3), _row(2, "Last")]
+    assert crud_professor.upsert_many(session, rows=rows) == (1, 1)
+    
+    assert session.get(Professor, "A2").name == "Last"
+    assert session.query(Professor).count() == 3
+    stats = {(kind, key): count for kind, key, count in crud_corpus_stat.get_all(session)}
+    assert stats[("documents", "professors")] == 3
+    assert stats[("term", "term2")] == 1
+
+def test_upsert_many_keeps_columns_missing_from_rows(session):
+    """Test that rows with different column sets are written together without clearing missing columns"""
+    embedding = [0.5] * 4
+    crud_professor.upsert_many(session, rows=[_row(1, embedding=embedding, content_hash="h1")])
+    
+    # A1 is unchanged and written without its embedding, A2 is new and embedded
+    rows = [_row(1, "Renamed", h_index=7), _row(2, embedding=embedding, content_hash="h2")]
+    assert crud_professor.upsert_many(session, rows=rows, batch_size=1) == (1, 1)
+    
+    session.expire_all()
+    stored = session.get(Professor, "A1")
+    assert (stored.name, stored.h_index, stored.content_hash) == ("Renamed", 7, "h1")
+    assert np.allclose(stored.embedding, embedding)
+    assert session.get(Professor, "A2").content_hash == "h2"
+
+@pytest.mark.integration
+@pytest.mark.skipif(not os.getenv("TEST_POSTGRES_URL"), reason="TEST_POSTGRES_URL is not set")
+def test_upsert_many_counts_inserts_from_xmax_on_postgres():
+    """Test that PostgreSQL counts inserted rows from RETURNING xmax = 0"""
+    engine, db = _session(os.environ["TEST_POSTGRES_URL"])
+    try:
+        db.query(Professor).delete()
+        db.query(CorpusStat).delete()
+        db.commit()
+        
+        assert crud_professor.upsert_many(db, rows=[_row(1), _row(2, embedding=[0.5] * 4)]) == (2, 0)
+        rows = [_row(2), _row(3, embedding=[0.5] * 4), _row(3, "Last", embedding=[0.5] * 4), _row(4)]
+        assert crud_professor.upsert_many(db, rows=rows, batch_size=1) == (2, 1)
+        
+        db.expire_all()
+        assert db.get(Professor, "A2").embedding is not None
+        assert db.get(Professor, "A3").name == "Last"
+    finally:
+        db.close()
+        Professor.metadata.drop_all(bind=engine, tables=TABLES)
@@ -14,7 +14,7 @@ def test_find_my_matches(client: TestClient, normal_user_token_headers: dict):
             "total_matches": 0,
             "processing_time_ms": 50.0
         }
-        mock_instance.find_matches.return_value = mock_result
+        mock_instance.get_user_matches.return_value = mock_result
         
         response = client.get("/api/v1/matching/me", headers=normal_user_token_headers)
         assert response.status_code == 200
@@ -0,0 +1,33 @@
+import numpy as np
+from sqlalchemy import Column, Integer, create_engine
+from sqlalchemy.orm import Session, declarative_base
+from app.models.types import EmbeddingVector
+
+Base = declarative_base()
+
+class Vectors(Base):
+    __tablename__ = "vectors"
+    
+    id = Column(Integer, primary_key=True)
+    float32 = Column(EmbeddingVector("float32"))
+    float16 = Column(EmbeddingVector("float16"))
+
+def test_embedding_vector_round_trip():
+    """Test that embeddings are stored as raw bytes and load as numpy views"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    embedding = [0.1, -0.5, 0.25, 1.0]
+    
+    with Session(engine) as db:
+        db.add(Vectors(id=1, float32=embedding, float16=np.array(embedding)))
+        db.add(Vectors(id=2))
+        db.commit()
+    
+    with Session(engine) as db:
+        stored = db.get(Vectors, 1)
+        assert stored.float32.dtype == np.float32
+        assert stored.float32.nbytes == 16
+        assert np.allclose(stored.float32, embedding)
+        assert stored.float16.nbytes == 8
+        assert np.allclose(stored.float16, embedding, atol=1e-3)
+        assert db.get(Vectors, 2).float32 is None
@@ -1,5 +1,7 @@
+import numpy as np
 import pytest
 from app.services.embedding_service import EmbeddingService
+from app.utils.cache import embedding_cache
 
 @pytest.fixture
 def embedding_service():
@@ -43,4 +45,46 @@ def test_compute_similarity(embedding_service):
     
     assert 0 <= sim_high <= 1
     assert 0 <= sim_low <= 1
-    assert sim_high > sim_low
\ No newline at end of file
+    assert sim_high > sim_low
+
+def test_model_shared_across_instances(embedding_service):
+    """Test that services share one model per process"""
+    other_service = EmbeddingService()
+    
+    assert other_service.model is embedding_service.model
+
+class FakeModel:
+    """Stands in for the sentence transformer, recording what it encodes"""
+    name = "fake-model"
+    
+    def __init__(self):
+        self.encoded = []
+    
+    def encode_normalized(self, texts):
+        self.encoded.extend(texts)
+        return [np.full(4, 0.5, dtype=np.float32) for _ in texts]
+
+@pytest.fixture
+def fake_service():
+    service = EmbeddingService.__new__(EmbeddingService)
+    service.model = FakeModel()
+    return service
+
+def test_repeated_text_served_from_cache(fake_service):
+    """Test that encoding the same text twice hits the embedding cache"""
+    text = "Reinforcement learning for robotics"
+    first = fake_service.encode_text(text)
+    hits = embedding_cache.stats()["local_hits"]
+    
+    assert fake_service.encode_text(text) == first
+    assert embedding_cache.stats()["local_hits"] == hits + 1
+    assert fake_service.model.encoded == [text]
+
+def test_bulk_encode_bypasses_cache(fake_service):
+    """Test that ingestion encodes don't read or fill the query embedding cache"""
+    text = "Protein folding. Institution: Example University"
+    fake_service.encode_batch([text], use_cache=False)
+    fake_service.encode_batch([text], use_cache=False)
+    
+    assert fake_service.model.encoded == [text, text]
+    assert embedding_cache.get_many(fake_service.model.name, [text]) == [None]
@@ -0,0 +1,152 @@
+import pytest
+from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+import app.crud.base as crud_base
+from app.crud.professor import professor as crud_professor
+from app.crud.user_match import user_match as crud_user_match
+from app.models.corpus_stat import CorpusStat
+from app.models.institution import Institution
+from app.models.professor import Professor as ProfessorRow
+from app.models.user import User
+from app.models.user_match import UserMatch
+from app.schemas.professor import Professor
+from app.schemas.search import MatchResult
+from app.services import match_refresh
+import app.services.matching_service as matching_module
+from app.services.match_refresh import MatchRefreshWorker
+from app.services.matching_service import MatchingService
+from app.utils.corpus_stats import CorpusStats
+
+class FakeVectorDatabase:
+    version = 1
+
+@pytest.fixture(params=["on_conflict", "orm"])
+def session(request, monkeypatch):
+    """SQLite session, storing lists with ON CONFLICT or with the read-then-write fallback"""
+    if request.param == "orm":
+        monkeypatch.setattr(crud_base, "ON_CONFLICT_INSERTS", {})
+    engine = create_engine("sqlite://")
+    User.metadata.create_all(bind=engine, tables=[User.__table__, UserMatch.__table__])
+    db = sessionmaker(bind=engine)()
+    db.add(User(id=1, email="student@example.com", hashed_password="x"))
+    db.commit()
+    yield db
+    db.close()
+
+def _service(db, computed):
+    service = MatchingService.__new__(MatchingService)
+    service.db = db
+    service.vector_db = FakeVectorDatabase()
+    
+    def find_matches(user_id, filters=None, top_k=50):
+        computed.append(top_k)
+        matches = [Professor(openalex_id=f"A{i}", name=f"Author {i}", match_score=1.0 - i / 100) for i in range(3)]
+        return MatchResult(user_id=user_id, matches=matches, total_matches=len(matches), processing_time_ms=1.0)
+    
+    service.find_matches = find_matches
+    return service
+
+def test_user_matches_served_from_store_until_stale(session, monkeypatch):
+    """Test that stored lists are served until the profile changes or they are too old for a new index"""
+    monkeypatch.setattr(settings, "USER_MATCHES_TOP_N", 20)
+    computed = []
+    service = _service(session, computed)
+    
+    # Miss computes the full list once, later requests are served from the store
+    assert [m.openalex_id for m in service.get_user_matches(1, top_k=2).matches] == ["A0", "A1"]
+    assert [m.openalex_id for m in service.get_user_matches(1, top_k=3).matches] == ["A0", "A1", "A2"]
+    assert computed == [20]
+    assert crud_user_match.get_due_user_ids(session, index_version=1, limit=10) == []
+    
+    # Profile change marks the list due and is computed live on the next request
+    crud_user_match.request_refresh(session, user_id=1)
+    assert crud_user_match.get_due_user_ids(session, index_version=1, limit=10) == [1]
+    service.get_user_matches(1, top_k=3)
+    assert computed == [20, 20]
+    
+    # A new index version is served the stored list for a while
+    service.vector_db.version = 2
+    assert crud_user_match.get_due_user_ids(session, index_version=2, limit=10) == []
+    service.get_user_matches(1, top_k=3)
+    assert computed == [20, 20]
+    
+    # Past the staleness bound, a new index version makes every list due
+    monkeypatch.setattr(settings, "USER_MATCHES_MAX_STALENESS_SECONDS", 0)
+    assert crud_user_match.get_due_user_ids(session, index_version=2, limit=10) == [1]
+    service.get_user_matches(1, top_k=3)
+    assert computed == [20, 20, 20]
+    monkeypatch.setattr(settings, "USER_MATCHES_MAX_STALENESS_SECONDS", 3600)
+    
+    # Asking for more than is stored recomputes
+    service.get_user_matches(1, top_k=50)
+    assert computed == [20, 20, 20, 50]
+
+def test_failed_refresh_moves_user_behind_other_due_lists(session, monkeypatch):
+    """Test that a user whose refresh keeps failing doesn't stay first in the due queue"""
+    session.add(User(id=2, email="other@example.com", hashed_password="x"))
+    session.add_all([
+        UserMatch(user_id=1, requested_version=1, computed_version=0, updated_at=datetime(2024, 1, 1)),
+        UserMatch(user_id=2, requested_version=1, computed_version=0, updated_at=datetime(2024, 1, 2)),
+    ])
+    session.commit()
+    assert crud_user_match.get_due_user_ids(session, index_version=1, limit=10) == [1, 2]
+    
+    class FailingMatchingService:
+        vector_db = FakeVectorDatabase()
+        
+        def __init__(self, db):
+            pass
+        
+        def refresh_user_matches(self, user_id, top_k=None):
+            raise RuntimeError("embedding service unavailable")
+    
+    monkeypatch.setattr(match_refresh, "MatchingService", FailingMatchingService)
+    worker = MatchRefreshWorker(session_factory=lambda: session, batch_size=1)
+    
+    assert worker.refresh_due() == 0
+    assert crud_user_match.get_due_user_ids(session, index_version=1, limit=10) == [2, 1]
+
+def test_full_profiles_loaded_for_top_k_only(session, monkeypatch):
+    """Test that candidates are re-ranked from their columns and only the top k are loaded in full"""
+    ProfessorRow.metadata.create_all(
+        bind=session.get_bind(), tables=[Institution.__table__, ProfessorRow.__table__, CorpusStat.__table__]
+    )
+    concepts = [{"id": "https://openalex.org/C1", "display_name": "Robotics", "level": 1, "score": 0.9}]
+    for i in range(5):
+        session.add(ProfessorRow(
+            openalex_id=f"A{i}", name=f"Author {i}", h_index=i, concepts=concepts,
+            embedding=[1.0, i / 10, 0.0, 0.0], research_summary="robot planning",
+            keywords=["planning", "robot"] if i else None
+        ))
+    user = session.get(User, 1)
+    user.resume_embedding = [1.0, 0.0, 0.0, 0.0]
+    user.resume_text = "robot planning"
+    user.research_interests = ["robotics"]
+    session.commit()
+    
+    loaded = []
+    get_filtered_professors = crud_professor.get_filtered_professors
+    
+    def record_loads(db, **kwargs):
+        loaded.append(sorted(kwargs["professor_ids"]))
+        return get_filtered_professors(db, **kwargs)
+    
+    monkeypatch.setattr(crud_professor, "get_filtered_professors", record_loads)
+    monkeypatch.setattr(
+        matching_module, "corpus_stats", type("Holder", (), {"current": lambda self, *args: CorpusStats()})()
+    )
+    
+    service = MatchingService.__new__(MatchingService)
+    service.db = session
+    service.vector_db = FakeVectorDatabase()
+    service.vector_db.search_similar = lambda embedding, top_k, allowed_ids: [(f"A{i}", 0.5) for i in range(5)]
+    
+    result = service.find_matches(1, top_k=2)
+    
+    assert loaded == [sorted(match.openalex_id for match in result.matches)]
+    assert len(result.matches) == 2
+    assert all(match.match_score is not None for match in result.matches)
+    assert result.matches[0].match_explanation["matching_concepts"] == ["robotics"]
+    assert result.matches[0].match_explanation["common_keywords"]
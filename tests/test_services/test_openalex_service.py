@@ -0,0 +1,330 @@
+import asyncio
+import threading
+import pytest
+from datetime import datetime, timedelta, timezone
+from app.core.config import settings
+from app.services.openalex_service import OpenAlexService
+import app.services.openalex_service as openalex_module
+
+class FakeEmbeddingService:
+    model_name = "test-model"
+    
+    def __init__(self):
+        self.encoded = []
+    
+    def encode_batch(self, texts, use_cache=True):
+        self.encoded.extend(texts)
+        return [[float(len(text))] for text in texts]
+
+class FakeVectorDatabase:
+    def __init__(self):
+        self.upserted = []
+        self.attributes_updated = []
+    
+    def upsert_embeddings(self, professor_embeddings, attributes=None):
+        self.upserted.extend(professor_id for professor_id, _ in professor_embeddings)
+    
+    def update_attributes(self, attributes):
+        self.attributes_updated.extend(attributes)
+    
+    def save_index(self):
+        self.saved = True
+        return True
+
+class FakeSession:
+    def __init__(self):
+        self.added = []
+        self.commits = 0
+    
+    def add(self, obj):
+        self.added.append(obj)
+    
+    def commit(self):
+        self.commits += 1
+    
+    def rollback(self):
+        pass
+    
+    def close(self):
+        pass
+
+def new_service() -> OpenAlexService:
+    """Service over fake embedding, index and database dependencies"""
+    return OpenAlexService(
+        FakeSession(),
+        vector_db=FakeVectorDatabase(),
+        embedding_service=FakeEmbeddingService(),
+        session_factory=FakeSession
+    )
+
+@pytest.fixture
+def service(monkeypatch):
+    # Every institution counts as stored, so pages fetch none
+    monkeypatch.setattr(
+        openalex_module.crud_institution, "get_existing_ids", lambda db, *, openalex_ids: set(openalex_ids)
+    )
+    return new_service()
+
+class FakeClock:
+    """Stands in for the time module, one second passes per reading"""
+    def __init__(self):
+        self.now = 0.0
+    
+    def monotonic(self):
+        self.now += 1
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake_clock = FakeClock()
+    monkeypatch.setattr(openalex_module, "time", fake_clock)
+    return fake_clock
+
+@pytest.fixture(autouse=True)
+def stored_hashes(monkeypatch):
+    """Content hashes stored after each index publish"""
+    stored = {}
+    monkeypatch.setattr(
+        openalex_module.crud_professor, "set_content_hashes", lambda db, *, hashes: stored.update(hashes)
+    )
+    return stored
+
+def _author(i: int):
+    return {
+        "id": f"https://openalex.org/A{i}",
+        "display_name": f"Author {i}",
+        "last_known_institution": {"id": "https://openalex.org/I1", "display_name": "Test University"},
+        "concepts": [{"id": "https://openalex.org/C1", "display_name": "Machine learning"}],
+        "summary_stats": {"h_index": i},
+    }
+
+def test_pipeline_writes_pages_in_order(service, monkeypatch):
+    """Test that pages are embedded in batches and written once each, in order, off the event loop"""
+    monkeypatch.setattr(settings, "SYNC_EMBED_CONCURRENCY", 3)
+    written_pages = []
+    writer_threads = set()
+    
+    def upsert_many(db, *, rows):
+        written_pages.append([row["openalex_id"] for row in rows])
+        writer_threads.add(threading.get_ident())
+        return len(rows), 0
+    
+    monkeypatch.setattr(openalex_module.crud_professor, "upsert_many", upsert_many)
+    monkeypatch.setattr(openalex_module.crud_professor, "get_content_hashes", lambda db, *, openalex_ids: {})
+    
+    async def pages():
+        for page in range(5):
+            # Author repeated within a page is only written once
+            yield [_author(page * 10 + i) for i in range(3)] + [_author(page * 10)], f"cursor{page}"
+    
+    result = asyncio.run(service.run_pipeline(pages()))
+    
+    assert result == {
+        "synced_count": 15, "updated_count": 0, "failed_count": 0,
+        "embedded_count": 15, "skipped_count": 0
+    }
+    assert [page[0] for page in written_pages] == ["A0", "A10", "A20", "A30", "A40"]
+    # Database writes stay off the event loop thread
+    assert threading.get_ident() not in writer_threads
+    assert len(service.vector_db.upserted) == 15
+    assert service.vector_db.saved
+
+def test_checkpoint_saved_after_index_publish(service, clock, monkeypatch):
+    """Test that the cursor only advances once the index holding those pages is published"""
+    monkeypatch.setattr(settings, "SYNC_CHECKPOINT_SECONDS", 2)
+    events = []
+    
+    monkeypatch.setattr(openalex_module.crud_professor, "upsert_many", lambda db, *, rows: (len(rows), 0))
+    monkeypatch.setattr(openalex_module.crud_professor, "get_content_hashes", lambda db, *, openalex_ids: {})
+    
+    def save_progress(db, *, checkpoint, cursor, pages, counts):
+        events.append(("checkpoint", cursor, pages, counts["synced_count"]))
+    
+    monkeypatch.setattr(openalex_module.crud_sync_checkpoint, "save_progress", save_progress)
+    
+    service.vector_db.save_index = lambda: events.append(("publish",)) or True
+    
+    async def pages():
+        for page in range(3):
+            yield [_author(page)], f"cursor{page}" if page < 2 else None
+    
+    asyncio.run(service.run_pipeline(pages(), checkpoint=object()))
+    
+    assert events == [
+        ("publish",), ("checkpoint", "cursor1", 2, 2),
+        ("publish",), ("checkpoint", None, 1, 1),
+    ]
+
+def test_checkpoint_not_saved_when_publish_fails(service, clock, monkeypatch):
+    """Test that a failed index publish keeps the cursor until a later publish succeeds"""
+    monkeypatch.setattr(settings, "SYNC_CHECKPOINT_SECONDS", 1)
+    events = []
+    publishes = iter([False, True, True])
+    
+    monkeypatch.setattr(openalex_module.crud_professor, "upsert_many", lambda db, *, rows: (len(rows), 0))
+    monkeypatch.setattr(openalex_module.crud_professor, "get_content_hashes", lambda db, *, openalex_ids: {})
+    
+    def save_progress(db, *, checkpoint, cursor, pages, counts):
+        events.append(("checkpoint", cursor, pages, counts["synced_count"]))
+    
+    monkeypatch.setattr(openalex_module.crud_sync_checkpoint, "save_progress", save_progress)
+    
+    service.vector_db.save_index = lambda: events.append(("publish",)) or next(publishes)
+    
+    async def pages():
+        for page in range(3):
+            yield [_author(page)], f"cursor{page}" if page < 2 else None
+    
+    asyncio.run(service.run_pipeline(pages(), checkpoint=object()))
+    
+    assert events == [
+        ("publish",),
+        ("publish",), ("checkpoint", "cursor1", 2, 2),
+        ("publish",), ("checkpoint", None, 1, 1),
+    ]
+
+def test_crash_before_checkpoint_reindexes_written_pages(service, clock, monkeypatch, stored_hashes):
+    """Test that authors written but not yet published are re-embedded and indexed on resume"""
+    monkeypatch.setattr(settings, "SYNC_CHECKPOINT_SECONDS", 2)
+    written_rows = []
+    
+    def upsert_many(db, *, rows):
+        written_rows.extend(rows)
+        return len(rows), 0
+    
+    monkeypatch.setattr(openalex_module.crud_professor, "upsert_many", upsert_many)
+    monkeypatch.setattr(
+        openalex_module.crud_professor, "get_content_hashes",
+        lambda db, *, openalex_ids: {i: stored_hashes[i] for i in openalex_ids if i in stored_hashes}
+    )
+    monkeypatch.setattr(openalex_module.crud_sync_checkpoint, "save_progress", lambda db, **kwargs: None)
+    
+    async def crashing_pages():
+        for page in range(3):
+            yield [_author(page)], f"cursor{page}"
+        # Crash once the third page is written, before its checkpoint
+        while len(written_rows) < 3:
+            await asyncio.sleep(0)
+        raise RuntimeError("crash")
+    
+    with pytest.raises(RuntimeError):
+        asyncio.run(service.run_pipeline(crashing_pages(), checkpoint=object()))
+    
+    # Only the published pages have their hashes stored; A2 was written without one
+    assert set(stored_hashes) == {"A0", "A1"}
+    assert "content_hash" not in written_rows[-1]
+    
+    async def resumed_pages():
+        yield [_author(2)], None
+    
+    # A fresh process: new service, empty index writer
+    service = new_service()
+    result = asyncio.run(service.run_pipeline(resumed_pages(), checkpoint=object()))
+    
+    assert result["embedded_count"] == 1
+    assert service.vector_db.upserted == ["A2"]
+    assert set(stored_hashes) == {"A0", "A1", "A2"}
+
+def test_unchanged_authors_not_reembedded(service, monkeypatch):
+    """Test that authors whose content hash is stored skip embedding and re-indexing"""
+    written_rows = []
+    
+    def upsert_many(db, *, rows):
+        written_rows.extend(rows)
+        return 0, len(rows)
+    
+    monkeypatch.setattr(openalex_module.crud_professor, "upsert_many", upsert_many)
+    
+    unchanged_hash = service._content_hash(service._create_research_summary(_author(1)), "test-model")
+    stale_hash = service._content_hash(service._create_research_summary(_author(2)), "old-model")
+    monkeypatch.setattr(
+        openalex_module.crud_professor, "get_content_hashes",
+        lambda db, *, openalex_ids: {"A1": unchanged_hash, "A2": stale_hash}
+    )
+    
+    async def pages():
+        yield [_author(1), _author(2), _author(3)], None
+    
+    result = asyncio.run(service.run_pipeline(pages()))
+    
+    assert result["embedded_count"] == 2
+    assert result["skipped_count"] == 1
+    assert len(service.embedding_service.encoded) == 2
+    assert service.vector_db.upserted == ["A2", "A3"]
+    assert service.vector_db.attributes_updated == ["A1"]
+    # The unchanged row is still written, without touching its embedding
+    assert [("embedding" in row) for row in written_rows] == [False, True, True]
+
+def test_incremental_sync_filters_by_last_completed_run(service, monkeypatch):
+    """Test that an incremental sync only requests authors updated since the last completed run"""
+    checkpoint = type("Checkpoint", (), {
+        "cursor": None,
+        "pages_committed": 0,
+        "updated_since": datetime(2024, 3, 1, 23, 30, tzinfo=timezone(timedelta(hours=-5))),
+    })()
+    calls = []
+    
+    def start(db, *, institution_ror, restart, incremental):
+        calls.append(incremental)
+        return checkpoint
+    
+    monkeypatch.setattr(openalex_module.crud_sync_checkpoint, "start", start)
+    monkeypatch.setattr(openalex_module.crud_sync_checkpoint, "complete", lambda db, *, checkpoint: checkpoint)
+    
+    requested = []
+    
+    def fetch_author_pages(params, cursor="*"):
+        requested.append(params["filter"])
+        return None
+    
+    async def run_pipeline(pages, checkpoint=None):
+        return {}
+    
+    service._fetch_author_pages = fetch_author_pages
+    service.run_pipeline = run_pipeline
+    
+    asyncio.run(service.sync_professors_by_institution("00f54p054", incremental=True))
+    
+    assert calls == [True]
+    # Dates are in UTC
+    assert requested == ["last_known_institution.ror:00f54p054,from_updated_date:2024-03-02"]
+
+class FakeHttpClient:
+    def __init__(self):
+        self.filters = []
+    
+    async def get_json(self, url, params=None):
+        ids = params["filter"].replace("openalex_id:", "").split("|")
+        self.filters.append(ids)
+        return {"results": [{"id": f"https://openalex.org/{i}", "display_name": i} for i in ids]}
+
+def test_institutions_fetched_in_bulk_once(service, monkeypatch):
+    """Test that unknown institutions are fetched with batched filter queries, once per sync"""
+    monkeypatch.setattr(settings, "OPENALEX_FILTER_MAX_IDS", 2)
+    monkeypatch.setattr(openalex_module, "Institution", dict)
+    monkeypatch.setattr(
+        openalex_module.crud_institution, "get_existing_ids", lambda db, *, openalex_ids: {"I0"}
+    )
+    
+    client = FakeHttpClient()
+    service._http = lambda: client
+    
+    asyncio.run(service._prefetch_institutions(["I0", "I1", "I2", "I3"]))
+    asyncio.run(service._prefetch_institutions(["I1", "I3"]))
+    
+    assert client.filters == [["I1", "I2"], ["I3"]]
+    assert [inst["openalex_id"] for inst in service.db.added] == ["I1", "I2", "I3"]
+    assert service.db.commits == 2
+
+def test_http_session_reused_until_closed(service):
+    """Test that requests share one session which close() releases"""
+    async def scenario():
+        client = service._http()
+        assert service._http() is client
+        session = service._session
+        await service.close()
+        return session
+    
+    session = asyncio.run(scenario())
+    assert session.closed
+    assert service._session is None
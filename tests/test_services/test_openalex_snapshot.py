@@ -0,0 +1,62 @@
+import asyncio
+import os
+import pytest
+from app.services.openalex_snapshot import SnapshotFilter, SnapshotImporter, iter_records, snapshot_files
+from tests.test_services.test_openalex_service import new_service
+import app.services.openalex_service as openalex_module
+
+SNAPSHOT_DIR = os.path.join(os.path.dirname(__file__), "..", "fixtures", "openalex_snapshot", "data")
+AUTHORS_DIR = os.path.join(SNAPSHOT_DIR, "authors")
+INSTITUTIONS_DIR = os.path.join(SNAPSHOT_DIR, "institutions")
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_snapshot_records_filtered_by_institution_and_country(processes):
+    """Test that authors are streamed in file order and filtered by ROR id or country"""
+    snapshot_filter = SnapshotFilter(institutions=["https://ror.org/00f54p054"], countries=["gb"])
+    
+    authors = list(iter_records("authors", snapshot_files(AUTHORS_DIR), snapshot_filter, processes, chunk_size=2))
+    
+    assert [author["id"] for author in authors] == [
+        "https://openalex.org/A1", "https://openalex.org/A2",
+        "https://openalex.org/A3", "https://openalex.org/A6",
+    ]
+    # Newer snapshot fields are mapped to the API shape the sync parses
+    assert authors[1]["last_known_institution"]["id"] == "https://openalex.org/I2"
+    assert authors[1]["concepts"][0]["display_name"] == "Genomics"
+    assert "counts_by_year" not in authors[0]
+
+def test_snapshot_import_runs_sync_pipeline(monkeypatch):
+    """Test that snapshot institutions are stored up front and authors go through the pipeline"""
+    stored_institutions = []
+    written_rows = []
+    
+    def upsert_many(db, *, rows):
+        written_rows.extend(rows)
+        return len(rows), 0
+    
+    monkeypatch.setattr(openalex_module.crud_professor, "upsert_many", upsert_many)
+    monkeypatch.setattr(openalex_module.crud_professor, "get_content_hashes", lambda db, *, openalex_ids: {})
+    monkeypatch.setattr(openalex_module.crud_professor, "set_content_hashes", lambda db, *, hashes: None)
+    
+    service = new_service()
+    
+    def store_institutions(records):
+        stored_institutions.extend(record["id"] for record in records)
+        service._known_institutions.update(record["id"].rsplit("/", 1)[-1] for record in records)
+        return len(records)
+    
+    async def fetch_institutions(*args, **kwargs):
+        raise AssertionError("Institutions from the snapshot must not be fetched")
+    
+    service.store_institutions = store_institutions
+    service._http = lambda: type("Client", (), {"get_json": fetch_institutions})()
+    
+    importer = SnapshotImporter(service, SnapshotFilter(countries=["US", "CA"]), page_size=2)
+    assert importer.import_institutions(INSTITUTIONS_DIR) == 2
+    result = asyncio.run(importer.import_authors(AUTHORS_DIR))
+    
+    assert stored_institutions == ["https://openalex.org/I1", "https://openalex.org/I3"]
+    assert [row["openalex_id"] for row in written_rows] == ["A1", "A3", "A5"]
+    assert result["synced_count"] == 3
+    assert service.vector_db.upserted == ["A1", "A3", "A5"]
+    assert service.vector_db.saved
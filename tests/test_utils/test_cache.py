@@ -0,0 +1,88 @@
+import numpy as np
+import redis
+from app.utils.cache import EmbeddingCache, SearchCache
+
+class InMemoryRedis:
+    """Just enough of the Redis client API for the cache"""
+    
+    def __init__(self):
+        self.data = {}
+    
+    def get(self, key):
+        return self.data.get(key)
+    
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+    
+    def incr(self, key):
+        self.data[key] = int(self.data.get(key, 0)) + 1
+    
+    def mget(self, *keys):
+        if len(keys) == 1 and isinstance(keys[0], list):
+            keys = keys[0]
+        return [self.data.get(key) for key in keys]
+    
+    def pipeline(self, transaction=True):
+        return self
+    
+    def execute(self):
+        pass
+
+class UnavailableRedis:
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise redis.ConnectionError("Connection refused")
+        return fail
+
+def test_key_normalizes_query():
+    """Test that equivalent queries share a key and index versions don't"""
+    cache = SearchCache(InMemoryRedis())
+    key = cache.key(1, "Machine  Learning Stanford", {"country": None}, 50, 0)
+    
+    assert key == cache.key(1, " machine learning stanford", None, 50, 0)
+    assert key != cache.key(2, "machine learning stanford", None, 50, 0)
+    assert key != cache.key(1, "machine learning stanford", None, 50, 50)
+
+def test_get_and_set_count_hits_and_misses():
+    """Test that cached values round-trip and are counted"""
+    cache = SearchCache(InMemoryRedis())
+    key = cache.key(1, "robotics", None, 10, 0)
+    
+    assert cache.get(key) is None
+    cache.set(key, {"professors": [], "total_count": 0, "query_time_ms": 1.0})
+    assert cache.get(key)["total_count"] == 0
+    
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+def test_redis_errors_are_misses():
+    """Test that the cache fails open when Redis is down"""
+    cache = SearchCache(UnavailableRedis())
+    key = cache.key(1, "robotics", None, 10, 0)
+    
+    cache.set(key, {"total_count": 0})
+    assert cache.get(key) is None
+    assert cache.stats() == {"available": False}
+
+def test_embedding_cache_evicts_least_recently_used():
+    """Test that the in-process tier is bounded and keeps recent entries"""
+    cache = EmbeddingCache(max_size=2, use_redis=False)
+    cache.set_many("model", ["a", "b"], [np.ones(4), np.zeros(4)])
+    cache.get_many("model", ["a"])
+    cache.set_many("model", ["c"], [np.full(4, 2.0)])
+    
+    a, b, c = cache.get_many("model", ["a", "b", "c"])
+    assert b is None
+    assert a.tolist() == [1.0] * 4
+    assert c.dtype == np.float32
+    assert cache.get_many("other-model", ["a"]) == [None]
+
+def test_embedding_cache_shares_float32_bytes_through_redis():
+    """Test that another worker's cache finds embeddings stored in Redis"""
+    client = InMemoryRedis()
+    EmbeddingCache(client=client, use_redis=True).set_many("model", ["a"], [np.arange(4)])
+    
+    assert all(isinstance(value, bytes) for value in client.data.values())
+    embedding, = EmbeddingCache(client=client, use_redis=True).get_many("model", ["a"])
+    assert embedding.tolist() == [0.0, 1.0, 2.0, 3.0]
@@ -0,0 +1,92 @@
+import threading
+import numpy as np
+from app.core.config import settings
+from app.models.corpus_stat import CONCEPT, DOCUMENTS, DOCUMENTS_KEY, TERM
+from app.utils.corpus_stats import CorpusStats, CorpusStatsHolder, document_deltas
+import app.utils.corpus_stats as corpus_stats_module
+
+def test_document_deltas_count_only_changes():
+    """Test that new professors and changed keywords/concepts adjust the counts incrementally"""
+    previous = {
+        "A1": (["learning", "neural"], [{"id": "https://openalex.org/C1"}]),
+        "A2": (["robotics"], [{"id": "https://openalex.org/C2"}]),
+    }
+    rows = [
+        # Summary changed, concepts unchanged
+        {"openalex_id": "A1", "keywords": ["learning", "protein"], "concepts": [{"id": "https://openalex.org/C1"}]},
+        # Row without the corpus columns keeps the stored values
+        {"openalex_id": "A2", "works_count": 10},
+        {"openalex_id": "A3", "keywords": ["protein"], "concepts": [{"id": "https://openalex.org/C2"}]},
+    ]
+    
+    deltas = document_deltas(previous, rows)
+    
+    assert deltas == {
+        (DOCUMENTS, DOCUMENTS_KEY): 1,
+        (TERM, "neural"): -1,
+        (TERM, "protein"): 2,
+        (CONCEPT, "C2"): 1,
+    }
+
+def test_corpus_stats_weigh_rare_terms_higher():
+    """Test that loaded counts give rare keywords and concepts a higher IDF"""
+    stats = CorpusStats.from_rows([
+        (DOCUMENTS, DOCUMENTS_KEY, 100),
+        (TERM, "learning", 80),
+        (TERM, "protein", 3),
+        (TERM, "stale", 0),
+        (CONCEPT, "C1", 50),
+    ])
+    
+    term_weights = stats.term_idf(np.array(["learning", "protein", "unseen"]))
+    
+    assert stats.documents == 100
+    assert "stale" not in stats.term_counts
+    assert term_weights[0] < term_weights[1] < term_weights[2]
+    assert stats.concept_idf(["C1"])[0] < stats.concept_idf(["C9"])[0]
+
+class FakeSession:
+    def __init__(self):
+        self.closed = False
+    
+    def close(self):
+        self.closed = True
+
+def test_stale_stats_reload_in_background(monkeypatch):
+    """Test that stale stats are served while one background reload runs on its own session"""
+    monkeypatch.setattr(settings, "CORPUS_STATS_RELOAD_SECONDS", 0)
+    sessions = []
+    loads = iter([100, 200, RuntimeError("database unavailable")])
+    release = threading.Event()
+    
+    def get_all(db):
+        if len(sessions) > 1:
+            release.wait(5)
+        result = next(loads)
+        if isinstance(result, Exception):
+            raise result
+        return [(DOCUMENTS, DOCUMENTS_KEY, result)]
+    
+    def session_factory():
+        sessions.append(FakeSession())
+        return sessions[-1]
+    
+    monkeypatch.setattr(corpus_stats_module.crud_corpus_stat, "get_all", get_all)
+    holder = CorpusStatsHolder(session_factory=session_factory)
+    
+    # First load has nothing to serve meanwhile and runs on the caller's thread
+    assert holder.current().documents == 100
+    
+    # Stale: the previous snapshot is served while a single reload is running
+    assert holder.current().documents == 100
+    assert holder.current().documents == 100
+    release.set()
+    with holder._reload_lock:
+        assert holder._stats.documents == 200
+    assert len(sessions) == 2
+    
+    # A failed reload keeps the previous snapshot
+    holder.current()
+    with holder._reload_lock:
+        assert holder.current().documents == 200
+    assert all(session.closed for session in sessions)
@@ -0,0 +1,81 @@
+import pytest
+import numpy as np
+from app.utils.embedding_store import EmbeddingStore, EmbeddingStoreChanges
+import app.utils.embedding_store as embedding_store_module
+
+def _vectors(count: int, dimension: int = 16, seed: int = 0):
+    vectors = np.random.default_rng(seed).standard_normal((count, dimension)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def _saved(store, tmp_path, dtype: str) -> EmbeddingStore:
+    path = str(tmp_path / f"store.{dtype}")
+    store.save(path, dtype)
+    return EmbeddingStore.load(path)
+
+@pytest.mark.parametrize("dtype", ["float16", "int8"])
+def test_quantized_scan_rescored_in_float32(tmp_path, dtype):
+    """Test that candidates found on the compact codes come back with exact float32 scores"""
+    vectors = _vectors(500)
+    ids = np.arange(500, dtype=np.int64)[::-1] * 3
+    store = _saved(EmbeddingStore.from_vectors(ids, vectors), tmp_path, dtype)
+    assert store.codes.dtype == np.dtype(dtype)
+    assert (store.scales is not None) == (dtype == "int8")
+    
+    query = vectors[7]
+    scores, labels = store.search(query, 10, rescore_factor=4)
+    
+    expected = np.argsort(-(vectors @ query))[:10]
+    assert labels.tolist() == ids[expected].tolist()
+    assert np.allclose(scores, (vectors @ query)[expected], atol=1e-6)
+
+def test_allowed_ids_skip_unknown_ids():
+    """Test that allowed ids missing from the store, or beyond either end, are ignored"""
+    vectors = _vectors(5)
+    store = EmbeddingStore.from_vectors(np.array([10, 20, 30, 40, 50]), vectors)
+    
+    scores, labels = store.search(vectors[1], 5, allowed_ids=np.array([5, 20, 25, 20, 50, 99]))
+    
+    assert labels.tolist() == [20, 50]
+    assert store.search(vectors[1], 5, allowed_ids=np.array([1, 99]))[1].tolist() == []
+
+def test_empty_store(tmp_path):
+    """Test that an empty store saves, loads and searches to nothing"""
+    store = _saved(EmbeddingStore(dimension=16), tmp_path, "int8")
+    
+    scores, labels = store.search(_vectors(1)[0], 10)
+    
+    assert len(store) == 0
+    assert scores.tolist() == [] and labels.tolist() == []
+
+def test_k_larger_than_candidates():
+    """Test that asking for more results than rows (or allowed rows) returns them all, best first"""
+    vectors = _vectors(4)
+    store = EmbeddingStore.from_vectors(np.arange(4), vectors)
+    
+    scores, labels = store.search(vectors[2], 50)
+    assert labels[0] == 2 and sorted(labels.tolist()) == [0, 1, 2, 3]
+    assert np.all(np.diff(scores) <= 0)
+    
+    assert sorted(store.search(vectors[2], 50, allowed_ids=np.array([1, 3]))[1].tolist()) == [1, 3]
+
+def test_changes_merged_block_by_block_on_save(tmp_path, monkeypatch):
+    """Test that upserts and deletes are merged into the saved base in id order, a block at a time"""
+    monkeypatch.setattr(embedding_store_module, "SCAN_BLOCK_ROWS", 3)
+    vectors = _vectors(20, seed=1)
+    base = _saved(EmbeddingStore.from_vectors(np.arange(0, 20) * 2, vectors), tmp_path, "float16")
+    new_vectors = _vectors(5, seed=2)
+    
+    changes = base.delete(np.array([0, 8, 7])).upsert(np.array([41, 3, 10, 100]), new_vectors[:4])
+    changes = changes.upsert(np.array([3]), new_vectors[4:]).delete(np.array([100]))
+    assert isinstance(changes, EmbeddingStoreChanges)
+    
+    saved = _saved(changes, tmp_path / "merged", "float16")
+    
+    expected_ids = sorted((set(range(0, 40, 2)) - {0, 8, 10}) | {3, 10, 41})
+    assert len(changes) == len(saved) == len(expected_ids)
+    assert saved.ids.tolist() == expected_ids
+    rows = {faiss_id: row for row, faiss_id in enumerate(saved.ids.tolist())}
+    assert np.allclose(saved.vectors[rows[3]], new_vectors[4])
+    assert np.allclose(saved.vectors[rows[10]], new_vectors[2])
+    assert np.allclose(saved.vectors[rows[41]], new_vectors[0])
+    assert np.allclose(saved.vectors[rows[12]], base.vectors[6])
@@ -0,0 +1,30 @@
+import asyncio
+import threading
+import pytest
+from app.utils.executor import BoundedExecutor, ExecutorBusy
+
+def test_run_returns_result_off_the_event_loop():
+    """Test that jobs run in a pool thread and return their result"""
+    executor = BoundedExecutor(max_workers=2, max_queue=0)
+    
+    result, thread = asyncio.run(executor.run(lambda x: (x * 2, threading.current_thread()), 21))
+    assert result == 42
+    assert thread is not threading.main_thread()
+    assert executor.stats()["in_flight"] == 0
+
+def test_jobs_beyond_capacity_are_rejected():
+    """Test that a full executor rejects new jobs instead of queueing them"""
+    executor = BoundedExecutor(max_workers=1, max_queue=1)
+    release = threading.Event()
+    
+    async def scenario():
+        running = [asyncio.ensure_future(executor.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(ExecutorBusy):
+            await executor.run(release.wait)
+        release.set()
+        await asyncio.gather(*running)
+    
+    asyncio.run(scenario())
+    assert executor.stats()["rejected"] == 1
+    assert executor.stats()["in_flight"] == 0
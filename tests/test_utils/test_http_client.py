@@ -0,0 +1,68 @@
+import asyncio
+import pytest
+from app.core.config import settings
+from app.utils.http_client import HttpRequestError, RateLimitedClient, parse_retry_after
+from app.utils.rate_limiter import AsyncTokenBucket
+
+class FakeResponse:
+    def __init__(self, status, body=None, headers=None):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+    
+    async def json(self):
+        return self.body
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *args):
+        pass
+
+class FakeSession:
+    """Returns the queued responses in order"""
+    
+    def __init__(self, responses):
+        self.responses = list(responses)
+    
+    def get(self, url, params=None):
+        return self.responses.pop(0)
+
+def test_retries_throttles_honouring_retry_after(monkeypatch):
+    """Test that 429 and 5xx responses are retried and counted"""
+    monkeypatch.setattr(settings, "OPENALEX_BACKOFF_BASE_SECONDS", 0.01)
+    session = FakeSession([
+        FakeResponse(429, headers={"Retry-After": "0.05"}),
+        FakeResponse(503),
+        FakeResponse(200, {"results": []}),
+    ])
+    client = RateLimitedClient(session, AsyncTokenBucket(rate=100), max_retries=3)
+    
+    assert asyncio.run(client.get_json("https://api.openalex.org/authors")) == {"results": []}
+    assert client.stats.as_dict() == {"requests": 3, "throttled": 1, "retries": 2, "failures": 0}
+
+def test_client_errors_are_not_retried():
+    """Test that a 404 fails immediately"""
+    client = RateLimitedClient(FakeSession([FakeResponse(404)]), AsyncTokenBucket(rate=100))
+    
+    with pytest.raises(HttpRequestError) as exc_info:
+        asyncio.run(client.get_json("https://api.openalex.org/institutions/I0"))
+    assert exc_info.value.status == 404
+    assert client.stats.retries == 0
+
+def test_gives_up_after_max_retries(monkeypatch):
+    """Test that persistent server errors raise once retries run out"""
+    monkeypatch.setattr(settings, "OPENALEX_BACKOFF_BASE_SECONDS", 0.001)
+    client = RateLimitedClient(
+        FakeSession([FakeResponse(500) for _ in range(3)]), AsyncTokenBucket(rate=100), max_retries=2
+    )
+    
+    with pytest.raises(HttpRequestError):
+        asyncio.run(client.get_json("https://api.openalex.org/authors"))
+    assert client.stats.failures == 1
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
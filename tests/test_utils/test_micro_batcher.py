@@ -0,0 +1,49 @@
+import threading
+import numpy as np
+import pytest
+from app.utils.micro_batcher import MicroBatcher
+
+def _fake_encode(texts):
+    return np.array([[len(text), 1.0] for text in texts], dtype=np.float32)
+
+def test_concurrent_texts_share_a_batch():
+    """Test that texts queued together are encoded in one call"""
+    batch_sizes = []
+    
+    def encode(texts):
+        batch_sizes.append(len(texts))
+        return _fake_encode(texts)
+    
+    batcher = MicroBatcher(encode, max_batch_size=8, max_wait_ms=200)
+    futures = [batcher.submit("x" * i) for i in range(5)]
+    
+    assert [future.result(timeout=5)[0] for future in futures] == [0, 1, 2, 3, 4]
+    assert batch_sizes == [5]
+    assert batcher.stats()["mean_batch_size"] == 5
+
+def test_encode_from_many_threads():
+    """Test that each caller gets its own embeddings back"""
+    batcher = MicroBatcher(_fake_encode, max_batch_size=4, max_wait_ms=5)
+    results = {}
+    
+    def worker(i):
+        results[i] = batcher.encode(["x" * i, "y"])
+    
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    for i in range(20):
+        assert results[i][:, 0].tolist() == [i, 1]
+    assert batcher.stats()["max_batch_size"] <= 4
+
+def test_encode_errors_reach_callers():
+    """Test that a failed batch fails every waiting caller"""
+    def encode(texts):
+        raise RuntimeError("out of memory")
+    
+    batcher = MicroBatcher(encode, max_batch_size=8, max_wait_ms=1)
+    with pytest.raises(RuntimeError):
+        batcher.encode(["a", "b"])
@@ -0,0 +1,14 @@
+import asyncio
+import time
+from app.utils.rate_limiter import AsyncTokenBucket
+
+def test_bucket_limits_rate_after_burst():
+    """Test that requests beyond the burst capacity are spread at the configured rate"""
+    async def scenario():
+        bucket = AsyncTokenBucket(rate=50, capacity=5)
+        start = time.monotonic()
+        await asyncio.gather(*(bucket.acquire() for _ in range(15)))
+        return time.monotonic() - start
+    
+    # 5 immediately, the other 10 at 50/s
+    assert 0.18 <= asyncio.run(scenario()) < 0.5
@@ -0,0 +1,41 @@
+import numpy as np
+from app.utils import reranker
+
+def test_exact_similarities_fall_back_to_first_stage_scores():
+    """Test that candidates without a stored embedding keep their first-stage score"""
+    query = np.array([1.0, 0.0], dtype=np.float32)
+    vectors = [np.array([2.0, 0.0]), None, np.array([0.0, 3.0])]
+    
+    similarities = reranker.exact_similarities(query, vectors, np.array([0.1, 0.7, 0.2]))
+    
+    np.testing.assert_allclose(similarities, [1.0, 0.7, 0.0], atol=1e-6)
+
+def test_concept_overlap_counts_each_interest_once():
+    """Test that overlap is the share of interests matched, case-insensitively"""
+    concept_names = [
+        ["Machine Learning", "machine learning", "Biology"],
+        [],
+        ["Genomics"],
+    ]
+    
+    overlap = reranker.concept_overlap(concept_names, ["machine learning", "Genomics"])
+    
+    np.testing.assert_allclose(overlap, [0.5, 0.0, 0.5])
+    assert not reranker.concept_overlap(concept_names, []).any()
+
+def test_rerank_blends_similarity_with_profile_signals():
+    """Test that profile signals can lift a slightly less similar candidate"""
+    features = reranker.feature_matrix(
+        similarities=np.array([0.80, 0.78, 0.60]),
+        h_index=np.array([2, 60, 80]),
+        cited_by_count=np.array([10, 20000, 50000]),
+        works_count=np.array([5, 200, 300]),
+        overlap=np.array([0.0, 0.5, 0.0])
+    )
+    weights = np.array([1.0, 0.05, 0.05, 0.0, 0.1], dtype=np.float32)
+    
+    scores = reranker.rerank(features, weights)
+    
+    assert features.shape == (3, len(reranker.SIGNALS))
+    assert features[:, 1:4].max() <= 1.0
+    assert list(np.argsort(-scores)) == [1, 0, 2]
@@ -0,0 +1,36 @@
+import numpy as np
+from app.utils.text_prcessing import common_keywords, keyword_set, pool_idf
+
+def test_keyword_set_is_sorted_and_unique():
+    """Test that keywords are lowercased, deduplicated and short words dropped"""
+    assert keyword_set("Deep learning for Protein folding; deep LEARNING at scale") == [
+        "deep", "folding", "learning", "protein", "scale"
+    ]
+    assert keyword_set(None) == []
+
+def test_common_keywords_ranked_by_idf():
+    """Test that rare shared keywords come before common ones, for every document at once"""
+    documents = [
+        ["learning", "neural", "protein"],
+        ["learning", "neural"],
+        ["learning", "robotics"],
+        ["learning"],
+    ]
+    
+    shared = common_keywords(documents, ["protein", "learning", "neural", "robotics"], pool_idf(documents), limit=2)
+    
+    assert shared == [
+        ["protein", "neural"],
+        ["neural", "learning"],
+        ["robotics", "learning"],
+        ["learning"],
+    ]
+    assert common_keywords(documents, [], pool_idf(documents)) == [[], [], [], []]
+
+def test_pool_idf_weighs_unseen_terms_highest():
+    """Test that terms missing from the pool get the maximum weight"""
+    lookup = pool_idf([["learning"], ["learning", "neural"]])
+    
+    weights = lookup(np.array(["learning", "neural", "zebra"]))
+    
+    assert weights[0] < weights[1] < weights[2]
@@ -0,0 +1,270 @@
+import json
+import pytest
+import numpy as np
+import faiss
+from app.core.config import settings
+from app.utils.vector_db import IndexManager, VectorDatabase
+import app.utils.vector_db as vector_db_module
+
+@pytest.fixture
+def index_manager(tmp_path, monkeypatch):
+    """Isolated index manager writing to a temporary directory"""
+    monkeypatch.setattr(settings, "FAISS_INDEX_PATH", str(tmp_path / "professor_embeddings.index"))
+    monkeypatch.setattr(settings, "FAISS_MAPPING_PATH", str(tmp_path / "professor_mapping.json"))
+    monkeypatch.setattr(settings, "FAISS_INDEX_POINTER_PATH", str(tmp_path / "professor_embeddings.current"))
+    monkeypatch.setattr(settings, "FAISS_ATTRIBUTES_PATH", str(tmp_path / "professor_attributes.npz"))
+    monkeypatch.setattr(settings, "EMBEDDING_STORE_PATH", str(tmp_path / "professor_embeddings.store"))
+    manager = IndexManager()
+    monkeypatch.setattr(vector_db_module, "index_manager", manager)
+    return manager
+
+def _random_embeddings(count: int):
+    rng = np.random.default_rng(0)
+    return [
+        (f"A{i}", rng.random(settings.EMBEDDING_DIMENSION).tolist())
+        for i in range(count)
+    ]
+
+def test_rebuild_publishes_new_version(index_manager):
+    """Test that a rebuilt index is visible to other readers"""
+    professor_embeddings = _random_embeddings(10)
+    VectorDatabase().rebuild_index(professor_embeddings)
+    
+    results = VectorDatabase().search_similar(professor_embeddings[3][1], top_k=1)
+    assert results[0][0] == "A3"
+    assert index_manager.current().version > 0
+
+@pytest.mark.parametrize("index_type", ["flat", "ivf_flat", "hnsw"])
+def test_upsert_replaces_existing_vector(index_manager, index_type):
+    """Test that re-adding a professor does not leave a stale duplicate"""
+    professor_embeddings = _random_embeddings(500)
+    VectorDatabase().rebuild_index(professor_embeddings, index_type=index_type)
+    
+    writer = VectorDatabase()
+    new_embedding = professor_embeddings[20][1]
+    writer.add_embedding("A10", new_embedding)
+    writer.delete_embeddings(["A30"])
+    writer.save_index()
+    
+    vector_db = VectorDatabase()
+    assert len(vector_db_module.live_vectors(index_manager.current().index)[0]) == 499
+    results = vector_db.search_similar(new_embedding, top_k=2, nprobe=64, ef_search=64)
+    assert {professor_id for professor_id, _ in results} == {"A10", "A20"}
+    old_results = vector_db.search_similar(professor_embeddings[10][1], top_k=1, nprobe=64)
+    assert old_results[0][0] != "A10"
+    assert "A30" not in dict(vector_db.search_similar(professor_embeddings[30][1], top_k=5, nprobe=64))
+
+def test_hnsw_compacts_once_tombstones_pass_threshold(index_manager, monkeypatch):
+    """Test that replaced HNSW vectors are skipped by searches and only compacted past the threshold"""
+    monkeypatch.setattr(settings, "FAISS_COMPACTION_STALE_FRACTION", 0.05)
+    professor_embeddings = _random_embeddings(100)
+    VectorDatabase().rebuild_index(professor_embeddings, index_type="hnsw")
+    
+    writer = VectorDatabase()
+    writer.upsert_embeddings(professor_embeddings[:3])
+    writer.save_index()
+    assert index_manager.current().index.ntotal == 103
+    
+    results = VectorDatabase().search_similar(professor_embeddings[1][1], top_k=100, ef_search=200)
+    assert len({professor_id for professor_id, _ in results}) == 100
+    
+    writer = VectorDatabase()
+    writer.upsert_embeddings(professor_embeddings[3:6])
+    writer.save_index()
+    assert index_manager.current().index.ntotal == 100
+
+def _attributes(professor_embeddings):
+    """Every tenth professor is at I1 with many citations, the rest at I2"""
+    return {
+        professor_id: {
+            "institution_id": "I1" if i % 10 == 0 else "I2",
+            "works_count": i,
+            "cited_by_count": 1000 if i % 10 == 0 else 10,
+            "concepts": [{"id": f"https://openalex.org/C{i % 3}", "display_name": f"Topic {i % 3}"}],
+        }
+        for i, (professor_id, _) in enumerate(professor_embeddings)
+    }
+
+@pytest.mark.parametrize("index_type", ["flat", "ivf_flat", "hnsw"])
+@pytest.mark.parametrize("exact_max", [0, 20000])
+def test_filtered_search_returns_top_k(index_manager, monkeypatch, index_type, exact_max):
+    """Test that selective filters still yield top_k results, all passing the filter"""
+    monkeypatch.setattr(settings, "FAISS_FILTER_EXACT_MAX", exact_max)
+    professor_embeddings = _random_embeddings(1000)
+    VectorDatabase().rebuild_index(
+        professor_embeddings, index_type=index_type, attributes=_attributes(professor_embeddings)
+    )
+    
+    vector_db = VectorDatabase()
+    allowed_ids = vector_db.filter_ids(institution_ids={"I1"}, min_citations=500)
+    assert len(allowed_ids) == 100
+    
+    query = professor_embeddings[5][1]
+    results = vector_db.search_similar(query, top_k=20, nprobe=1, ef_search=16, allowed_ids=allowed_ids)
+    assert len(results) == 20
+    assert all(int(professor_id[1:]) % 10 == 0 for professor_id, _ in results)
+    
+    # Same ranking as scoring the allowed professors exactly
+    embeddings = np.array([vector for _, vector in professor_embeddings], dtype=np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    scores = embeddings[::10] @ (np.array(query) / np.linalg.norm(query))
+    expected = [f"A{i * 10}" for i in np.argsort(-scores)[:20]]
+    if index_type == "flat" or exact_max:
+        assert [professor_id for professor_id, _ in results] == expected
+
+def test_filter_attributes_follow_writes(index_manager):
+    """Test that attribute upserts and deletes are published with the index"""
+    professor_embeddings = _random_embeddings(50)
+    VectorDatabase().rebuild_index(professor_embeddings, attributes=_attributes(professor_embeddings))
+    
+    writer = VectorDatabase()
+    writer.add_embedding("A1", professor_embeddings[1][1], attributes={
+        "institution_id": "I3", "works_count": 5, "cited_by_count": 0,
+        "concepts": [{"id": "https://openalex.org/C9", "display_name": "Quantum Computing"}],
+    })
+    writer.delete_embeddings(["A10"])
+    writer.save_index()
+    
+    vector_db = VectorDatabase()
+    assert vector_db.filter_ids(institution_ids={"I3"}).tolist() == [1]
+    assert vector_db.filter_ids(concepts=["quantum"]).tolist() == [1]
+    assert 10 not in vector_db.filter_ids(institution_ids={"I1"}).tolist()
+    assert vector_db.filter_ids(min_works_count=48).tolist() == [48, 49]
+    assert vector_db.filter_ids(institution_ids=set()).tolist() == []
+
+@pytest.mark.parametrize("store_dtype", ["float16", "int8"])
+def test_mmap_backend_searches_embedding_store(index_manager, monkeypatch, store_dtype):
+    """Test that readers search the mapped embedding store, re-scored in float32, without loading the index"""
+    monkeypatch.setattr(settings, "VECTOR_SEARCH_BACKEND", "mmap")
+    monkeypatch.setattr(settings, "EMBEDDING_STORE_DTYPE", store_dtype)
+    professor_embeddings = _random_embeddings(1000)
+    VectorDatabase().rebuild_index(
+        professor_embeddings, index_type="ivf_flat", attributes=_attributes(professor_embeddings)
+    )
+    
+    writer = VectorDatabase()
+    writer.add_embedding("A10", professor_embeddings[20][1])
+    writer.delete_embeddings(["A30"])
+    writer.save_index()
+    
+    # A fresh worker process maps the published store
+    monkeypatch.setattr(vector_db_module, "index_manager", IndexManager())
+    snapshot = vector_db_module.index_manager.current()
+    assert isinstance(snapshot.embedding_store.codes, np.memmap)
+    vector_db = VectorDatabase()
+    
+    embeddings = np.array([vector for _, vector in professor_embeddings], dtype=np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    embeddings[10] = embeddings[20]
+    query = professor_embeddings[5][1]
+    scores = embeddings @ (np.array(query, dtype=np.float32) / np.linalg.norm(query))
+    scores[30] = -np.inf
+    expected = np.argsort(-scores)[:10]
+    
+    results = vector_db.search_similar(query, top_k=10)
+    assert [professor_id for professor_id, _ in results] == [f"A{i}" for i in expected]
+    assert np.allclose([score for _, score in results], scores[expected], atol=1e-5)
+    
+    allowed_ids = vector_db.filter_ids(institution_ids={"I1"})
+    filtered = vector_db.search_similar(query, top_k=5, allowed_ids=allowed_ids)
+    assert len(filtered) == 5
+    assert all(int(professor_id[1:]) % 10 == 0 for professor_id, _ in filtered)
+    assert "A30" not in dict(vector_db.search_similar(professor_embeddings[30][1], top_k=5))
+    
+    # Search-only workers never read the FAISS index
+    assert snapshot._index is None
+
+def test_writes_do_not_affect_readers_until_saved(index_manager):
+    """Test that readers keep the published snapshot during a write"""
+    VectorDatabase().rebuild_index(_random_embeddings(5))
+    reader = VectorDatabase()
+    version = index_manager.current().version
+    
+    writer = VectorDatabase()
+    writer.add_embedding("A99", [0.5] * settings.EMBEDDING_DIMENSION)
+    assert index_manager.current().index.ntotal == 5
+    
+    writer.save_index()
+    assert index_manager.current().version != version
+    assert index_manager.current().index.ntotal == 6
+    assert reader.search_similar([0.5] * settings.EMBEDDING_DIMENSION, top_k=1)[0][0] == "A99"
+
+def test_writers_publish_one_at_a_time(index_manager, monkeypatch):
+    """Test that a second writer waits for the first to publish, then builds on its version"""
+    monkeypatch.setattr(settings, "FAISS_WRITER_LOCK_TIMEOUT_SECONDS", 0.2)
+    professor_embeddings = _random_embeddings(20)
+    VectorDatabase().rebuild_index(professor_embeddings[:10])
+    
+    first, second = VectorDatabase(), VectorDatabase()
+    first.upsert_embeddings(professor_embeddings[10:15])
+    with pytest.raises(RuntimeError):
+        second.upsert_embeddings(professor_embeddings[15:])
+    first.save_index()
+    
+    second.upsert_embeddings(professor_embeddings[15:])
+    second.save_index()
+    assert index_manager.current().index.ntotal == 20
+
+def test_writer_keeps_its_copy_between_publishes(index_manager):
+    """Test that a writer goes on with its copy after publishing, unless another writer published since"""
+    professor_embeddings = _random_embeddings(20)
+    VectorDatabase().rebuild_index(professor_embeddings[:10])
+    
+    writer = VectorDatabase()
+    writer.upsert_embeddings(professor_embeddings[10:12])
+    writer.save_index()
+    copy = writer.index
+    writer.upsert_embeddings(professor_embeddings[12:14])
+    assert writer.index is copy
+    # Readers load the published file instead of sharing the copy being written
+    assert index_manager.current().index is not copy
+    assert index_manager.current().index.ntotal == 12
+    writer.save_index()
+    
+    other = VectorDatabase()
+    other.upsert_embeddings(professor_embeddings[14:16])
+    other.save_index()
+    
+    writer.upsert_embeddings(professor_embeddings[16:])
+    assert writer.index is not copy
+    writer.save_index()
+    assert index_manager.current().index.ntotal == 20
+
+@pytest.mark.parametrize("index_type", ["ivf_flat", "hnsw"])
+def test_rebuild_with_approximate_index(index_manager, index_type):
+    """Test that approximate index types are trained and searchable"""
+    professor_embeddings = _random_embeddings(500)
+    VectorDatabase().rebuild_index(professor_embeddings, index_type=index_type)
+    
+    vector_db = VectorDatabase()
+    results = vector_db.search_similar(professor_embeddings[7][1], top_k=5, nprobe=8, ef_search=32)
+    assert results[0][0] == "A7"
+
+def test_scores_are_cosine_similarity(index_manager):
+    """Test that scores match cosine similarity regardless of vector length"""
+    VectorDatabase().rebuild_index([("A1", [1.0, 0.0] + [0.0] * (settings.EMBEDDING_DIMENSION - 2))])
+    
+    query = [3.0, 3.0] + [0.0] * (settings.EMBEDDING_DIMENSION - 2)
+    results = VectorDatabase().search_similar(query, top_k=1)
+    assert results[0][1] == pytest.approx(np.sqrt(0.5), abs=1e-5)
+    assert VectorDatabase().search_similar(query, top_k=1, min_score=0.8) == []
+
+def test_migrate_legacy_index(index_manager):
+    """Test that legacy L2 positional index files are converted"""
+    embeddings = np.array([vector for _, vector in _random_embeddings(5)], dtype=np.float32)
+    legacy_index = faiss.IndexFlatL2(settings.EMBEDDING_DIMENSION)
+    legacy_index.add(embeddings * 10)
+    # A stale duplicate of A2 appended by an old sync
+    legacy_index.add(embeddings[4:5])
+    faiss.write_index(legacy_index, settings.FAISS_INDEX_PATH)
+    with open(settings.FAISS_MAPPING_PATH, 'w') as f:
+        json.dump({**{str(i): f"A{i}" for i in range(5)}, "5": "A2"}, f)
+    
+    assert index_manager.current().index.ntotal == 5
+    results = VectorDatabase().search_similar(embeddings[4].tolist(), top_k=2)
+    assert results[0][1] == pytest.approx(1.0, abs=1e-5)
+    assert {professor_id for professor_id, _ in results} == {"A2", "A4"}
+    
+    assert index_manager.migrate()
+    assert index_manager.current().index.metric_type == faiss.METRIC_INNER_PRODUCT
+    assert not index_manager.migrate()